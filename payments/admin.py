@@ -14,7 +14,7 @@ from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models.query import QuerySet
-from django.http import HttpResponseNotAllowed
+from django.http import HttpResponseNotAllowed, JsonResponse
 from django.shortcuts import render, redirect
 from django.template.response import TemplateResponse
 from django.urls import path
@@ -23,7 +23,7 @@ from django.views.decorators.cache import cache_page
 from django.views.generic import TemplateView
 from privex.helpers import empty, is_true
 
-from payments.models import Coin, Deposit, AddressAccountMap, CoinPair, Conversion, CryptoKeyPair
+from payments.models import Coin, Deposit, AddressAccountMap, CoinPair, Conversion, CryptoKeyPair, ScanCheckpoint
 
 """
     +===================================================+
@@ -39,7 +39,8 @@ from payments.models import Coin, Deposit, AddressAccountMap, CoinPair, Conversi
     |                                                   |
     +===================================================+
 """
-from payments.coin_handlers import reload_handlers, has_manager, get_manager
+from payments.coin_handlers import refresh_handlers, get_manager
+from payments.coin_handlers.base import health_monitor
 
 log = logging.getLogger(__name__)
 
@@ -156,6 +157,7 @@ class CustomAdmin(AdminSite):
         _urls = super(CustomAdmin, self).get_urls()
         urls = [
             path('coin_health/', CoinHealthView.as_view(), name='coin_health'),
+            path('coin_health/json/', coin_health_json, name='coin_health_json'),
             path('add_coin_pair/', AddCoinPairView.as_view(), name='easy_add_pair'),
             path('refund_deposits/', refund_deposits, name='refund_deposits'),
             path('_clear_cache/', clear_cache, name='clear_cache'),
@@ -227,9 +229,9 @@ class CoinAdmin(admin.ModelAdmin):
     )
 
     def get_fieldsets(self, request, obj=None):
-        # To ensure that the Coin Type dropdown is properly populated, we call reload_handlers() just before
+        # To ensure that the Coin Type dropdown is properly populated, we call refresh_handlers() just before
         # the create / update Coin page finishes loading it's data.
-        reload_handlers()
+        refresh_handlers()
         return super(CoinAdmin, self).get_fieldsets(request, obj)
 
 
@@ -266,6 +268,12 @@ class KeyPairAdmin(admin.ModelAdmin):
     ordering = ('network', 'account')
 
 
+class ScanCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('coin', 'loader', 'last_index', 'last_block', 'last_txid', 'updated_at')
+    list_filter = ('loader', 'coin')
+    ordering = ('coin', 'loader')
+
+
 # Because we've overridden the admin site, the default user/group admin doesn't register properly.
 # So we manually register them to their admin views.
 ctadmin.register(User, UserAdmin)
@@ -277,48 +285,36 @@ ctadmin.register(Conversion, ConversionAdmin)
 ctadmin.register(Deposit, DepositAdmin)
 ctadmin.register(AddressAccountMap, AddressAccountMapAdmin)
 ctadmin.register(CryptoKeyPair, KeyPairAdmin)
+ctadmin.register(ScanCheckpoint, ScanCheckpointAdmin)
 
 
 class CoinHealthView(TemplateView):
     """
     Admin view for viewing health/status information of all coins in the system.
 
-    Loads the coin handler manager for each coin, and uses the health() function to grab status info for the coin.
-
-    Uses caching API to avoid constant RPC queries, and displays results as a standard admin view.
+    Displays the latest health snapshot collected in the background by :class:`.HealthMonitor` (normally via
+    ``./manage.py refresh_health``), so loading the page never waits for RPC calls. If there's no snapshot yet, or
+    it's stale, a refresh is started in the background.
     """
     template_name = 'admin/coin_health.html'
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.coin_fails = []
+        self._snapshot = None
+
+    def snapshot(self) -> dict:
+        """View function to be called from template. The latest health snapshot, or an empty dict if there's none."""
+        if self._snapshot is None:
+            self._snapshot = health_monitor.snapshot(refresh_stale=True) or {}
+        return self._snapshot
 
     def get_fails(self):
         """View function to be called from template, for getting list of coin handler errors"""
-        return self.coin_fails
+        return self.snapshot().get('fails', [])
 
     def handler_dic(self):
-        """View function to be called from template. Loads and queries coin handlers for health, with caching."""
-        hdic = {}  # A dictionary of {handler_name: {headings:list, results:list[tuple/list]}
-        reload_handlers()
-        for coin in Coin.objects.all():
-            try:
-                if not has_manager(coin.symbol):
-                    self.coin_fails.append('Cannot check {} (no manager registered in coin handlers)'.format(coin))
-                    continue
-                # Try to load coin health data from cache.
-                # If it's not found, query the manager and cache it for up to 30 seconds to avoid constant RPC hits.
-                c_health = coin.symbol + '_health'
-                mname, mhead, mres = cache.get_or_set(c_health, get_manager(coin.symbol).health(), 30)
-                # Create the dict keys for the manager name if needed, then add the health results
-                d = hdic[mname] = dict(headings=list(mhead), results=[]) if mname not in hdic else hdic[mname]
-                d['results'].append(list(mres))
-            except:
-                log.exception('Something went wrong loading health data for coin %s', coin)
-                self.coin_fails.append(
-                    'Failed checking {} (something went wrong loading health data, check server logs)'.format(coin)
-                )
-        return hdic
+        """View function to be called from template. Returns the health results from the snapshot, by manager."""
+        return self.snapshot().get('handlers', {})
 
     def get(self, request, *args, **kwargs):
         r = self.request
@@ -328,6 +324,20 @@ class CoinHealthView(TemplateView):
         return super(CoinHealthView, self).get(request, *args, **kwargs)
 
 
+def coin_health_json(request):
+    """
+    JSON version of :class:`.CoinHealthView` - returns the latest coin health snapshot, including it's ``age`` in
+    seconds. Returns status 503 if no snapshot has been collected yet.
+    """
+    u = request.user
+    if not u.is_authenticated or not u.is_superuser:
+        raise PermissionDenied
+    snap = health_monitor.snapshot(refresh_stale=True)
+    if snap is None:
+        return JsonResponse(dict(error='No health snapshot yet, a refresh has been started.'), status=503)
+    return JsonResponse(snap)
+
+
 def clear_cache(request):
     """Allow admins to clear the Django cache system"""
     if request.method.upper() != 'POST':
@@ -361,7 +371,7 @@ class AddCoinPairView(TemplateView):
         u = r.user
         if not u.is_authenticated or not u.is_superuser:
             raise PermissionDenied
-        reload_handlers()
+        refresh_handlers()
         return super(AddCoinPairView, self).get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
@@ -24,7 +24,8 @@ from django.utils import timezone
 from privex.jsonrpc import BitcoinRPC
 from urllib3.exceptions import NewConnectionError
 from payments.coin_handlers.Bitcoin.BitcoinMixin import BitcoinMixin
-from payments.coin_handlers.base.BatchLoader import BatchLoader
+from payments.coin_handlers.base.AsyncBatchLoader import AsyncBatchLoader
+from payments.coin_handlers.base.RPCPool import RPCPool
 from payments.coin_handlers.base.decorators import retry_on_err
 from payments.coin_handlers.base.exceptions import DeadAPIError
 from steemengine.helpers import empty
@@ -33,12 +34,15 @@ from steemengine.helpers import empty
 log = logging.getLogger(__name__)
 
 
-class BitcoinLoader(BatchLoader, BitcoinMixin):
+class BitcoinLoader(AsyncBatchLoader, BitcoinMixin):
     """
     BitcoinLoader - Despite the name, loads TXs from any coin that has a bitcoind-compatible JsonRPC API
 
     Known to work with: bitcoind, litecoind, dogecoind
 
+    Pages of ``listtransactions`` are independent ``skip`` windows, so several pages are requested from the daemon
+    at once (see :class:`payments.coin_handlers.base.AsyncBatchLoader`).
+
     **Copyright**::
 
       +===================================================+
@@ -76,27 +80,40 @@ class BitcoinLoader(BatchLoader, BitcoinMixin):
 
     @property
     def settings(self) -> Dict[str, dict]:
-        """To ensure we always get fresh settings from the DB after a reload, self.settings gets _prep_settings()"""
+        """Cached per instance by _prep_settings(), which re-checks every coin's settings_key on each access"""
         return self._prep_settings()
 
-    @retry_on_err(fail_on=[DeadAPIError])
-    def load_batch(self, symbol, limit=100, offset=0, account=None):
+    async def load_batch(self, symbol, limit=100, offset=0, account=None) -> List[dict]:
         """
-        Loads a batch of transactions for `symbol` in their original format into `self.transactions`
+        Loads a batch of transactions for `symbol` in their original format, using a thread so that several batches
+        can be loaded at the same time
 
         :param str symbol: The coin symbol to load TXs for
         :param int limit:  The amount of transactions to load
         :param int offset: The amount of most recent TXs to skip (for pagination)
         :param str account: NOT USED BY THIS LOADER
+        :return list transactions: The raw transactions from ``listtransactions``
         """
+        return await self.run_sync(self._list_transactions, symbol, limit=limit, offset=offset)
 
-        log.debug('Loading batch of %d transactions for %s', int(limit), symbol)
-        rpc = self.rpcs[symbol]
+    @retry_on_err(fail_on=[DeadAPIError])
+    def _list_transactions(self, symbol, limit=100, offset=0) -> List[dict]:
+        """Calls ``listtransactions`` on the coin daemon for `symbol`, with automatic retry on error"""
+        log.debug('Loading batch of %d transactions for %s (offset %d)', int(limit), symbol, int(offset))
+        # Get the RPC from the pool on each call, so a failed daemon is switched away from
+        rpc = self._get_rpc(symbol)
         try:
-            self.transactions = rpc.listtransactions(count=int(limit), skip=int(offset))
+            with RPCPool.tracked(rpc):
+                return rpc.listtransactions(count=int(limit), skip=int(offset))
         except (ConnectionRefusedError, ConnectionError, NewConnectionError) as e:
             raise DeadAPIError("{} daemon is not responding! Original exception: {} {}".format(symbol, type(e), str(e)))
 
+    def tx_final(self, symbol: str, tx: dict) -> bool:
+        """Receive TXs with less confirmations than ``confirms_needed`` may still be imported by a later run"""
+        if tx.get('category') != 'receive':
+            return True
+        return int(tx.get('confirmations', 0)) >= self.settings[symbol]['confirms_needed']
+
     def clean_txs(self, symbol: str, transactions: Iterable[dict], account: str = None) -> Generator[dict, None, None]:
         """
         Filters a list of transactions `transactions` as required, yields dict's conforming with :class:`models.Deposit`
@@ -23,7 +23,7 @@ from privex.jsonrpc import BitcoinRPC
 
 from payments.coin_handlers.Bitcoin.BitcoinMixin import BitcoinMixin
 from payments.coin_handlers.base import exceptions
-from payments.coin_handlers.base import BaseManager
+from payments.coin_handlers.base import BaseManager, RPCPool
 
 getcontext().rounding = ROUND_DOWN
 
@@ -116,8 +116,11 @@ class BitcoinManager(BaseManager, BitcoinMixin):
         super().__init__(symbol.upper())
         # Get all RPCs
         self.rpcs = self._get_rpcs()
-        # Manager's only deal with one coin, so unwrap the generated dicts
-        self.rpc = self.rpcs[self.coin.symbol_id]   # type: BitcoinRPC
+
+    @property
+    def rpc(self) -> BitcoinRPC:
+        """Manager's only deal with one coin, so this is the RPC object for our coin, from the coin's RPC pool"""
+        return self._get_rpc(self.coin.symbol_id)
 
     def health_test(self) -> bool:
         """
@@ -135,7 +138,7 @@ class BitcoinManager(BaseManager, BitcoinMixin):
 
     @property
     def settings(self) -> Dict[str, dict]:
-        """To ensure we always get fresh settings from the DB after a reload, self.settings gets _prep_settings()"""
+        """Cached per instance by _prep_settings(), which re-checks every coin's settings_key on each access"""
         return self._prep_settings()
 
     @property
@@ -153,13 +156,17 @@ class BitcoinManager(BaseManager, BitcoinMixin):
         :return: Decimal(balance)
         """
 
-        return self.rpc.getreceivedbyaddress(address=address, confirmations=self.setting['confirms_needed'])
+        rpc = self.rpc
+        with RPCPool.tracked(rpc):
+            return rpc.getreceivedbyaddress(address=address, confirmations=self.setting['confirms_needed'])
 
     def address_valid(self, address) -> bool:
         """If `address` is determined to be valid by the coind RPC, will return True. Otherwise False."""
 
         try:
-            v = self.rpc.validateaddress(address)
+            rpc = self.rpc
+            with RPCPool.tracked(rpc):
+                v = rpc.validateaddress(address)
             if v['isvalid'] in [True, 'true', 1]:
                 return True
             return False
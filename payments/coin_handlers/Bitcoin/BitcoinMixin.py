@@ -16,18 +16,20 @@
 
 """
 import logging
-from typing import List, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.conf import settings
 from privex.jsonrpc import BitcoinRPC
 
+from payments.coin_handlers.base.RPCPool import RPCPool
+from payments.coin_handlers.base.SettingsMixin import SettingsMixin
 from payments.models import Coin
 from steemengine.helpers import empty
 
 log = logging.getLogger(__name__)
 
 
-class BitcoinMixin:
+class BitcoinMixin(SettingsMixin):
     """
     BitcoinMixin - shared code used by both :class:`Bitcoin.BitcoinLoader` and :class:`Bitcoin.BitcoinManager`
 
@@ -48,90 +50,46 @@ class BitcoinMixin:
 
     """
 
-    _settings = {}  # type: Dict[str, dict]
-
     # If a setting isn't specified, use these.
-    _bc_defaults = dict(
+    setting_defaults = dict(
         host='127.0.0.1', port=8332, user=None, password=None,
         confirms_needed=0, use_trusted=True, string_amt=True
     )
 
-    @property
-    def all_coins(self) -> Dict[str, Coin]:
+    def _settings_sources(self) -> List[Tuple[str, Optional[tuple], Optional[Coin]]]:
         """
-        Since this is a Mixin, it may be self.coin: Coin, or self.coins: List[Coin].
-        This property detects whether we have a single coin, or multiple, and returns them as a dict.
-
-        :return dict coins: A dict<str,Coin> of supported coins, mapped by symbol
+        As well as our coins, load settings for any extra symbols in ``settings.COIND_RPC``. COIND_RPC entries don't
+        change at runtime, so they're cached with the key None.
         """
-        if hasattr(self, 'coins'):
-            return dict(self.coins)
-        elif hasattr(self, 'coin'):
-            return {self.coin.symbol_id: self.coin}
-        raise Exception('Cannot load settings as neither self.coin nor self.coins exists...')
-
-    def _prep_settings(self, reset: bool =False) -> Dict[str, dict]:
-        """
-        Loads and caches coin daemon settings from both :class:`payments.models.Coin` objects, and from
-        ``settings.COIND_RPC`` (if it's defined).
-
-        :param bool reset:  Default: False; if true - force refresh coin settings into self._settings
-        :return dict _settings: {host:str, port:int, user:str, password:str, confirms_needed:int, use_trusted:bool}
+        coins = self.all_coins
+        coind = getattr(settings, 'COIND_RPC', {})
+        return [
+            (sym, None if sym in coind else coins[sym].settings_key, coins.get(sym))
+            for sym in list(coins.keys()) + [k for k in coind.keys() if k not in coins]
+        ]
+
+    def _load_settings(self, symbol: str, coin: Optional[Coin]) -> Dict[str, Any]:
         """
-        # If _settings isn't empty, and we aren't forcing a refresh, don't bother re-loading the coin settings
-        if len(self._settings) > 0 and not reset:
-            return self._settings
-
-        s = {}   # Temporary settings dict
-
-        # Load handler settings from Coin objects, combine the JSON dict into our settings dict
-        # log.debug('Loading Bitcoind handler settings from Coin objects')
-        for sym, c in self.all_coins.items():
-            sc = c.settings     # {host,port,user,password,json}
-            s[sym] = {k: v for k, v in sc.items() if k != 'json'}    # Don't include the 'json' key
-            s[sym] = {**s[sym], **sc['json']}                        # Merge contents of 'json' into our settings
-
-        # log.debug('Loading Bitcoind handler settings from settings.COIND_RPC (if it exists)')
-        # If COIND_RPC has been set in settings.py, they take precedence over database-level settings.
-        if hasattr(settings, 'COIND_RPC'):
-            for symbol, conn in settings.COIND_RPC.items():
-                s[symbol] = conn
-
-        # Finally, fill in any gaps with the default settings, and cast non-string settings to their correct type.
-        self._clean_settings(s)
-
-        # Store settings to the class attribute, and return them.
-        self._settings = s
-        return self._settings
+        Loads the cleaned settings for a single coin. If ``symbol`` is in ``settings.COIND_RPC``, those settings are
+        used instead of the database-level :class:`payments.models.Coin` settings.
 
-    def _clean_settings(self, d_settings: Dict[str, dict]) -> Dict[str, dict]:
+        :param str symbol:   The coin symbol
+        :param Coin coin:    The coin to load the settings from (may be None if ``symbol`` is in COIND_RPC)
+        :return dict settings: The cleaned settings for this coin
         """
-        Clean up ``d_settings`` by setting any missing/empty settings to default values, and cast non-string settings
-        to the correct types.
-
-        :param dict d_settings: The dict<str,dict> mapping symbol->settings to clean up
-        :return dict d_settings: The cleaned dictionary. Only needed if you passed a deep-copy for d_settings, as the
-                                 passed dict will be altered in-place unless it's a copy.
-        """
-
-        defs = self._bc_defaults
-        # Loop over each symbol and settings dict we were passed
-        for sym, conn in d_settings.items():  # coin symbol : str, settings: dict
-            # log.debug("Cleaning settings for symbol %s", sym)
-            z = d_settings[sym]   # Pointer to the settings dict for this symbol
-            # Loop over our default settings, compare to the user's settings
-            for def_key, def_val in defs.items():  # settings key : str, settings value : any
-                # Check if required setting key exists in user's settings
-                if def_key in z and not empty(z[def_key]):
-                    continue
-                # Setting doesn't exist, or was empty. Update user's setting to our default.
-                z[def_key] = def_val
-            # Cast settings keys to avoid casting errors
-            z['confirms_needed'] = int(z['confirms_needed'])
-            z['port'] = int(z['port'])
-            z['use_trusted'] = z['use_trusted'] in [True, 'true', 'True', 'TRUE', 1, 'yes']
-            z['string_amt'] = z['string_amt'] in [True, 'true', 'True', 'TRUE', 1, 'yes']
-        return d_settings
+        if symbol not in getattr(settings, 'COIND_RPC', {}):
+            return super()._load_settings(symbol, coin)
+        # Copy the dict, so cleaning doesn't alter settings.COIND_RPC itself
+        s = dict(settings.COIND_RPC[symbol])
+        # Fill in any gaps with the default settings, and cast non-string settings to their correct type.
+        return self._clean_settings({symbol: s})[symbol]
+
+    def _cast_settings(self, s: Dict[str, Any]):
+        """Cast the numeric and boolean Bitcoind settings to their correct types"""
+        s['confirms_needed'] = int(s['confirms_needed'])
+        s['port'] = int(s['port'])
+        s['use_trusted'] = s['use_trusted'] in [True, 'true', 'True', 'TRUE', 1, 'yes']
+        s['string_amt'] = s['string_amt'] in [True, 'true', 'True', 'TRUE', 1, 'yes']
 
     def _rpc_settings(self, symbol: str) -> dict:
         """Generate a dict that can be passed via BitcoinRPC's kwargs using the passed symbol's settings"""
@@ -144,11 +102,25 @@ class BitcoinMixin:
         """Returns a dict mapping coin symbols to their RPC objects"""
         rpcs = {}
 
-        for sym, conn in self._prep_settings().items():
-            rpcs[sym] = BitcoinRPC(
-                hostname=conn['host'],
-                port=conn['port'],
-                username=conn.get('user'),
-                password=conn.get('password')
-            )
+        for sym in self._prep_settings().keys():
+            rpcs[sym] = self._get_rpc(sym)
         return rpcs
+
+    def _get_rpc(self, symbol: str) -> BitcoinRPC:
+        """
+        Returns the RPC object for ``symbol``, using the shared :class:`.RPCPool` for the coin.
+
+        By default the pool only contains the daemon at ``host:port``. If the custom JSON setting ``rpc_nodes`` is
+        set to a list of ``"host:port"`` strings, the fastest healthy daemon in that list is used instead. As the
+        daemons hold the coin's wallet, every node in ``rpc_nodes`` must be running the same wallet.
+        """
+        conn = self._prep_settings()[symbol]
+        nodes = conn.get('rpc_nodes')
+        nodes = ['{}:{}'.format(conn['host'], conn['port'])] if empty(nodes, itr=True) else list(nodes)
+
+        def factory(node: str) -> BitcoinRPC:
+            host, port = node.rsplit(':', 1)
+            return BitcoinRPC(hostname=host, port=int(port), username=conn.get('user'), password=conn.get('password'))
+
+        pool = RPCPool.get_pool(f'bitcoin:{symbol}', nodes, factory, probe=lambda rpc: rpc.getblockcount())
+        return pool.get()
@@ -109,8 +109,6 @@ def reload():
     provides = Coin.objects.filter(enabled=True, coin_type='bitcoind').values_list('symbol', flat=True)
     BitcoinLoader.provides = provides
     BitcoinManager.provides = provides
-    # Since the handler is re-loading, we wipe the settings cache to ensure stale connection details aren't used.
-    BitcoinMixin._settings = {}
 
 
 # Only run the initialisation code once.
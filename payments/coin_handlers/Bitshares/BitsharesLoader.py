@@ -19,7 +19,8 @@
 import pytz
 import logging
 from decimal import Decimal
-from typing import Generator, Iterable, List
+from itertools import islice
+from typing import Dict, Generator, Iterable, List
 from datetime import datetime
 
 from django.core.cache import cache
@@ -67,10 +68,18 @@ class BitsharesLoader(BaseLoader, BitsharesMixin):
     This saves us from hard coding specific coin symbols. See __init__.py for populating code.
     """
 
+    page_size = 100
+    """Amount of transactions cleaned at a time, i.e. the amount of block timestamps loaded per batch"""
+
     def __init__(self, symbols):
         super().__init__(symbols=symbols)
         self.tx_count = 1000
         self.loaded = False
+        # Highest account history sequence seen per coin during list_txs, used for scan checkpoints
+        self._max_seq = {}
+        # Lowest sequence per coin of a deposit which was skipped during the current scan, the checkpoint is held
+        # below it so that the deposit is retried on the next run
+        self._held_seq = {}
 
     def clean_txs(self, account: Account, symbol: str, transactions: Iterable[dict]) -> Generator[dict, None, None]:
         """
@@ -82,6 +91,27 @@ class BitsharesLoader(BaseLoader, BitsharesMixin):
         :param list<dict> transactions:  A list<dict> of transactions to filter
         :return: A generator yielding ``dict`` s conforming to :class:`payments.models.Deposit`
         """
+        transactions = iter(transactions)
+        while True:
+            # Transactions are processed in pages, so the block timestamps for a whole page can be loaded at once
+            page = list(islice(transactions, self.page_size))
+            if len(page) == 0:
+                break
+            timestamps = self.get_block_timestamps(tx['block_num'] for tx in page if self._is_deposit(account, tx))
+            yield from self._clean_page(account, symbol, page, timestamps)
+
+    @staticmethod
+    def _is_deposit(account: Account, tx: dict) -> bool:
+        """Returns True if the transfer ``tx`` was sent to ``account`` by another account"""
+        try:
+            data = tx['op'][1]
+            return data['to'] == account['id'] and data['from'] != account['id']
+        except (KeyError, IndexError, TypeError):
+            return False
+
+    def _clean_page(self, account: Account, symbol: str, transactions: List[dict], timestamps: Dict[int, int]) \
+            -> Generator[dict, None, None]:
+        """Used by :meth:`.clean_txs` to clean a page of transactions, using the preloaded block ``timestamps``"""
         for tx in transactions:
             try:
                 data = tx['op'][1]   # unwrap the transaction structure to get at the data within
@@ -104,6 +134,15 @@ class BitsharesLoader(BaseLoader, BitsharesMixin):
                 if asset['symbol'] != symbol:
                     continue
 
+                # timestamp of the block containing this transaction, loaded in bulk by clean_txs
+                block_time = timestamps.get(int(tx['block_num']))
+                if block_time is None:
+                    log.warning('No timestamp for block %s, skipping TX %s until the next run',
+                                tx['block_num'], tx['id'])
+                    self._hold_sequence(self.coins[symbol], tx)
+                    continue
+                tx_datetime = timezone.make_aware(datetime.utcfromtimestamp(block_time), pytz.UTC)
+
                 raw_amount = Decimal(int(amount_info['amount']))
                 transfer_quantity = raw_amount / (10 ** asset['precision'])
 
@@ -131,11 +170,6 @@ class BitsharesLoader(BaseLoader, BitsharesMixin):
                         memo_msg = '--cannot decode memo--'
                         log.exception('Error decoding memo %s, got exception %s', memo['message'], e)
 
-                # fetch timestamp from the block containing this transaction
-                # (a hugely inefficient lookup but unfortunately no other way to do this)
-                tx_datetime = datetime.fromtimestamp(self.get_block_timestamp(tx['block_num']))
-                tx_datetime = timezone.make_aware(tx_datetime, pytz.UTC)
-
                 clean_tx = dict(
                     txid=tx['id'], coin=self.coins[symbol].symbol, tx_timestamp=tx_datetime,
                     from_account=from_account_name, to_account=account.name, memo=memo_msg,
@@ -161,13 +195,41 @@ class BitsharesLoader(BaseLoader, BitsharesMixin):
                 if acc is None:
                     log.error('Account %s not found while loading transactions for coin %s. Skipping for now.', acc_name, c)
                     continue
+                # If a previous run left a checkpoint, only load operations newer than the last one we saw.
+                last_seq = self.get_checkpoint(c).last_index or 0
+                self._held_seq.pop(c.symbol, None)
                 # history returns a generator with automatic batching, so we don't have to worry about batches.
-                txs = acc.history(only_ops = ['transfer'], limit=self.tx_count)
+                txs = acc.history(only_ops=['transfer'], limit=self.tx_count, last=last_seq)
+                txs = self._track_sequence(c, txs)
                 yield from self.clean_txs(symbol=symbol, transactions=txs, account=acc)
+                if c.symbol in self._max_seq:
+                    # Never move the checkpoint past a deposit which was skipped, so the next run loads it again
+                    held = self._held_seq.get(c.symbol)
+                    last_index = self._max_seq[c.symbol] if held is None else min(self._max_seq[c.symbol], held - 1)
+                    self.set_checkpoint(c, last_index=last_index)
             except:
                 log.exception('Error while loading transactions for coin %s. Skipping for now.', c)
                 continue
 
+    def _track_sequence(self, coin: Coin, transactions: Iterable[dict]) -> Generator[dict, None, None]:
+        """
+        Passes through ``transactions`` while recording the highest account history sequence number seen for ``coin``
+        (the ``N`` in the operation ID ``1.11.N``)
+        """
+        for tx in transactions:
+            seq = int(tx['id'].split('.')[2])
+            if seq > self._max_seq.get(coin.symbol, -1):
+                self._max_seq[coin.symbol] = seq
+            yield tx
+
+    def _hold_sequence(self, coin: Coin, tx: dict):
+        """
+        Records that the operation ``tx`` for ``coin`` was skipped (e.g. it's block timestamp couldn't be loaded), so
+        that :meth:`.list_txs` holds the coin's checkpoint below it
+        """
+        seq = int(tx['id'].split('.')[2])
+        self._held_seq[coin.symbol] = min(seq, self._held_seq.get(coin.symbol, seq))
+
     def load(self, tx_count=1000):
         log.info('Loading Bitshares transactions...')
         self.tx_count = tx_count
@@ -16,12 +16,16 @@
 
 """
 import logging
+from collections import OrderedDict
 from decimal import Decimal
+from threading import Lock
+
 from django.conf import settings
-from typing import List
+from django.core.cache import cache
+from typing import Dict, Iterable, List
 
 from payments.models import CryptoKeyPair
-from steemengine.helpers import decrypt_str
+from steemengine.helpers import decrypt_str, empty
 
 from bitshares import BitShares
 from bitshares.account import Account
@@ -33,6 +37,7 @@ from graphenecommon.exceptions import AccountDoesNotExistsException
 from graphenecommon.exceptions import AssetDoesNotExistsException
 from graphenecommon.exceptions import InvalidWifError
 from graphenecommon.exceptions import KeyAlreadyInStoreException
+from graphenecommon.utils import parse_time
 
 from payments.coin_handlers.base.exceptions import AuthorityMissing
 
@@ -72,6 +77,10 @@ class BitsharesMixin:
     _blockchain = None  # type: Blockchain
     """Shared instance of :py:class:`bitshares.blockchain.Blockchain` used across both the loader/manager."""
 
+    _block_times = OrderedDict()   # type: Dict[int, int]
+    """LRU cache of block number -> UNIX timestamp, shared across both the loader/manager."""
+    _block_lock = Lock()
+
     @property
     def bitshares(self) -> BitShares:
         """Returns an instance of BitShares and caches it in the attribute _bitshares after creation"""
@@ -119,10 +128,71 @@ class BitsharesMixin:
         :param block_number: block number to get data for
         :return int
         """
-        try:
-            return self.blockchain.block_timestamp(block_number)
-        except:
-            return 0
+        return self.get_block_timestamps([block_number]).get(int(block_number), 0)
+
+    def get_block_timestamps(self, block_numbers: Iterable[int]) -> Dict[int, int]:
+        """
+        Returns a dict mapping each of ``block_numbers`` to it's block timestamp (as a UNIX timestamp).
+
+        Timestamps are looked up in an in-memory LRU cache (``settings.BITSHARES_BLOCK_CACHE_SIZE``), then the Django
+        cache, and any which are still missing are loaded from the node using batched block header calls
+        (``get_block_header_batch``). Blocks which couldn't be loaded are left out of the result, and logged.
+
+        :param block_numbers: An iterable of block numbers to get timestamps for
+        :return dict timestamps: ``{block_number: timestamp}``
+        """
+        nums = set(int(n) for n in block_numbers)
+        found = {}   # type: Dict[int, int]
+        with self._block_lock:
+            for n in nums:
+                if n in self._block_times:
+                    self._block_times.move_to_end(n)
+                    found[n] = self._block_times[n]
+
+        missing = nums - set(found.keys())
+        if len(missing) > 0:
+            cached = cache.get_many([f'btsblock:{n}' for n in missing])
+            found.update({int(k.split(':')[1]): v for k, v in cached.items()})
+            missing -= set(found.keys())
+        if len(missing) > 0:
+            loaded = self._load_block_timestamps(sorted(missing))
+            cache.set_many({f'btsblock:{n}': t for n, t in loaded.items()}, settings.BITSHARES_BLOCK_CACHE_TIME)
+            found.update(loaded)
+            missing -= set(loaded.keys())
+        if len(missing) > 0:
+            log.warning('Could not load the timestamp for Bitshares blocks: %s', sorted(missing))
+
+        with self._block_lock:
+            for n, t in found.items():
+                self._block_times[n] = t
+                self._block_times.move_to_end(n)
+            while len(self._block_times) > settings.BITSHARES_BLOCK_CACHE_SIZE:
+                self._block_times.popitem(last=False)
+        return found
+
+    def _load_block_timestamps(self, block_numbers: List[int], batch: int = 100) -> Dict[int, int]:
+        """
+        Loads the timestamps of ``block_numbers`` from the node, using one ``get_block_header_batch`` call per
+        ``batch`` blocks. Falls back to a ``get_block_header`` call per block if the node doesn't support batches.
+        """
+        rpc = self.bitshares.rpc
+        res = {}
+        for i in range(0, len(block_numbers), batch):
+            chunk = block_numbers[i:i + batch]
+            try:
+                headers = rpc.get_block_header_batch(chunk)
+            except Exception as e:
+                log.debug('get_block_header_batch failed (%s: %s), loading headers one by one', type(e).__name__, e)
+                headers = []
+                for n in chunk:
+                    try:
+                        headers.append([n, rpc.get_block_header(n)])
+                    except Exception:
+                        log.exception('Error loading header for Bitshares block %s', n)
+            for n, header in headers:
+                if not empty(header):
+                    res[int(n)] = int(parse_time(header['timestamp']).timestamp())
+        return res
 
     def get_decimal_from_amount(self, amount_obj: Amount) -> Decimal:
         """Helper function to convert a Bitshares Amount object into a Decimal"""
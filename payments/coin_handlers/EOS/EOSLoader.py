@@ -3,13 +3,13 @@ from decimal import Decimal
 from typing import Generator, List, Iterable
 
 import pytz
-import requests
 from dateutil.parser import parse
 from django.core.cache import cache
 from django.utils import timezone
 
 from payments.coin_handlers.EOS.EOSMixin import EOSMixin
-from payments.coin_handlers.base import retry_on_err, AccountNotFound, BaseLoader
+from payments.coin_handlers.base import retry_on_err, AccountNotFound, BaseLoader, RPCPool
+from payments.coin_handlers.base.http import http_get
 from steemengine.helpers import empty
 
 log = logging.getLogger(__name__)
@@ -263,7 +263,8 @@ class EOSLoader(BaseLoader, EOSMixin):
             url = f"{history_url}/api/actions/?limit={count}&tx_to={account}"
             if not empty(symbol): url += f"&symbol={symbol}"
             if not empty(contract): url += f"&account={contract}"
-            req = requests.get(url)
+            req = http_get(url)
+            req.raise_for_status()
             actions = req.json()['results']
             # log.info('%s %s', url, actions)
             cache.set(cache_key, actions, timeout=60)
@@ -285,7 +286,8 @@ class EOSLoader(BaseLoader, EOSMixin):
         if empty(actions):
             log.info('Loading %s actions for %s from node %s', self.chain.upper(), account, self.url)
             c = self.eos
-            data = c.get_actions(account, pos=-1, offset=-count)
+            with RPCPool.tracked(c):
+                data = c.get_actions(account, pos=-1, offset=-count)
             actions = data['actions']
             cache.set(cache_key, actions, timeout=60)
 
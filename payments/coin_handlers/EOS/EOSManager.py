@@ -9,7 +9,7 @@ from requests import HTTPError
 from payments.coin_handlers import BaseManager
 from payments.coin_handlers.EOS.EOSMixin import EOSMixin
 from payments.coin_handlers.base import TokenNotFound, CoinHandlerException, AccountNotFound, AuthorityMissing, \
-    NotEnoughBalance
+    NotEnoughBalance, RPCPool
 from payments.models import CryptoKeyPair, Coin
 from steemengine.helpers import empty, decrypt_str
 
@@ -41,7 +41,9 @@ class EOSManager(BaseManager, EOSMixin):
         """
         for address in addresses:
             try:
-                acc = self.eos.get_account(address)
+                c = self.eos
+                with RPCPool.tracked(c, ignore=(HTTPError,)):
+                    acc = c.get_account(address)
                 if 'account_name' not in acc:
                     log.warning(f'"account_name" not in data returned by eos.get_account("{address}")...')
                     return False
@@ -79,7 +81,9 @@ class EOSManager(BaseManager, EOSMixin):
 
         contract = self.get_contract(sym)
 
-        bal = self.eos.get_currency_balance(address, code=contract, symbol=sym)
+        c = self.eos
+        with RPCPool.tracked(c):
+            bal = c.get_currency_balance(address, code=contract, symbol=sym)
         if len(bal) < 1:
             raise TokenNotFound(f'Balance list for {self.chain.upper()} symbol {sym} with '
                                 f'contract {contract} was empty...')
@@ -18,7 +18,7 @@
 import logging
 from typing import Dict, Any, List, Optional
 
-from payments.coin_handlers.base import SettingsMixin
+from payments.coin_handlers.base import SettingsMixin, RPCPool
 from eospy.cleos import Cleos
 
 from payments.coin_handlers.base.exceptions import TokenNotFound, MissingTokenMetadata
@@ -81,6 +81,9 @@ class EOSMixin(SettingsMixin):
     Default settings to use if any required values are empty, e.g. default to Greymass's RPC node
     
     ``load_method`` can be either ``pvx`` for Privex EOS History API, or ``actions`` to use v1/history from the RPC node.
+
+    ``rpc_nodes`` may optionally be set to a list of full API node URLs (e.g. ``["https://eos.greymass.com"]``),
+    in which case the fastest healthy node in the list is used (see :class:`.RPCPool`), instead of host/port/endpoint.
     """
     
     provides = ['EOS']  # type: List[str]
@@ -137,17 +140,6 @@ class EOSMixin(SettingsMixin):
             return c
         return c
 
-    @property
-    def settings(self) -> Dict[str, dict]:
-        """
-        Get all settings, mapped by coin symbol (each coin symbol dict contains custom json settings merged)
-
-        :return dict settings: A dictionary mapping coin symbols to settings
-        """
-        if len(self._settings) > 0:
-            return self._settings
-        return self._prep_settings()
-
     @property
     def eos_settings(self) -> Dict[str, Any]:
         """
@@ -160,6 +152,9 @@ class EOSMixin(SettingsMixin):
     @property
     def eos(self) -> Cleos:
         """Returns an instance of Cleos and caches it in the attribute _eos after creation"""
+        pooled = self._pooled_eos()
+        if pooled is not None:
+            return pooled
         if not self._eos:
             log.debug(f'Creating Cleos instance using {self.chain.upper()} API node: {self.url}')
             self.current_rpc = self.url
@@ -181,6 +176,8 @@ class EOSMixin(SettingsMixin):
             >>> eos.get_account('someguy123')
         
         
+        **Note:** If the setting ``rpc_nodes`` is set, :py:attr:`.eos` always uses the RPC pool instead.
+
         :param conn: Connection settings. Keys: endpoint, ssl, host, port, username, password
         :return Cleos eos: A :class:`.Cleos` instance with the modified connection settings.
         """
@@ -192,6 +189,21 @@ class EOSMixin(SettingsMixin):
         
         return self._eos
     
+    def _pooled_eos(self) -> Optional[Cleos]:
+        """
+        If the setting ``rpc_nodes`` is a list of API node URLs, returns the :class:`.Cleos` instance for the
+        fastest healthy node from the shared :class:`.RPCPool` for this chain, and updates :py:attr:`.current_rpc`.
+        Otherwise returns ``None``.
+        """
+        nodes = self.eos_settings.get('rpc_nodes')
+        if empty(nodes, itr=True):
+            return None
+        pool = RPCPool.get_pool(
+            f'{self.chain.lower()}:api', nodes, factory=lambda url: Cleos(url=url), probe=lambda c: c.get_info()
+        )
+        self.current_rpc = pool.best_url()
+        return pool.client(self.current_rpc)
+
     @property
     def url(self) -> str:
         """Creates a URL from the host settings on the EOS coin"""
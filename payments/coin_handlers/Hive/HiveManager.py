@@ -9,7 +9,7 @@ from payments.coin_handlers.Steem import SteemManager
 from beem.account import Account
 from beem.exceptions import AccountDoesNotExistsException, MissingKeyError
 
-from payments.coin_handlers.base import exceptions
+from payments.coin_handlers.base import exceptions, RPCPool
 from steemengine.helpers import empty
 
 log = logging.getLogger(__name__)
@@ -26,7 +26,6 @@ class HiveManager(BaseManager, HiveMixin):
     def __init__(self, symbol: str):
         super(HiveManager, self).__init__(symbol)
         self._rpc = self._asset = self._precision = None
-        self._rpcs = {}
 
     def health(self) -> Tuple[str, tuple, tuple]:
         """
@@ -91,8 +90,10 @@ class HiveManager(BaseManager, HiveMixin):
         :param address: Steem account to check existence of
         :return bool: True if account exists, False if it doesn't
         """
+        rpc = self.rpc
         try:
-            Account(address, steem_instance=self.rpc)
+            with RPCPool.tracked(rpc, ignore=(AccountDoesNotExistsException,)):
+                Account(address, steem_instance=rpc)
             return True
         except AccountDoesNotExistsException:
             return False
@@ -119,10 +120,12 @@ class HiveManager(BaseManager, HiveMixin):
         if not address:
             address = self.coin.our_account
     
-        acc = Account(address, steem_instance=self.rpc)
+        rpc = self.rpc
+        with RPCPool.tracked(rpc):
+            acc = Account(address, steem_instance=rpc)
     
         if not empty(memo):
-            hist = acc.get_account_history(-1, 10000, only_ops=['transfer'])
+            hist = RPCPool.tracked_iter(rpc, acc.get_account_history(-1, 10000, only_ops=['transfer']))
             total = Decimal(0)
             s = HiveLoader(symbols=[self.symbol])
             for h in hist:
@@ -132,7 +135,8 @@ class HiveManager(BaseManager, HiveMixin):
                 total += tx['amount']
             return total
     
-        bal = acc.get_balance('available', self.symbol)
+        with RPCPool.tracked(rpc):
+            bal = acc.get_balance('available', self.symbol)
         return Decimal(bal.amount)
 
     def send(self, amount: Decimal, address: str, from_address: str = None, memo=None, trigger_data=None) -> dict:
@@ -1,10 +1,12 @@
-from typing import Optional, Dict
+from typing import Optional
 
 from beem.asset import Asset
 from beem.blockchain import Blockchain
 from privex.helpers import empty
 
-from payments.coin_handlers.base import SettingsMixin
+from payments.coin_handlers.Steem.AssetCache import AssetCache
+from payments.coin_handlers.Steem.SteemMixin import custom_chains
+from payments.coin_handlers.base import SettingsMixin, RPCPool
 from beem.steem import Steem
 from django.conf import settings
 import logging
@@ -41,48 +43,58 @@ class HiveMixin(SettingsMixin):
         super(HiveMixin, self).__init__(*args, **kwargs)
         self._rpc = None
         
-        # List of Steem instances mapped by symbol
-        self._rpcs = {}  # type: Dict[str, Steem]
-        
         # Internal storage variables for the properties ``asset`` and ``precisions``
         self._asset = self._precision = None
     
     @property
     def rpc(self) -> Steem:
-        if not self._rpc:
-            # Use the symbol of the first coin for our settings.
-            symbol = list(self.all_coins.keys())[0]
-            _settings = self.all_coins[symbol].settings['json']
-            rpcs = _settings.get('rpcs', settings.HIVE_RPC_NODES)
-            
-            # If you've specified custom RPC nodes in the custom JSON, make a new instance with those
-            # Otherwise, use the global shared_steem_instance.
-            rpc_conf = dict(num_retries=5, num_retries_call=3, timeout=20, node=rpcs)
-            log.info('Getting BSteem instance for coin %s - settings: %s', symbol, rpc_conf)
-            
-            self._rpc = Steem(node=rpcs, **rpc_conf) if empty(rpcs, itr=True) else Steem(**rpc_conf)  # type: Steem
-            self._rpc.set_password_storage(_settings.get('pass_store', 'environment'))
-            self._rpcs[symbol] = self._rpc
-        return self._rpc
+        # Use the symbol of the first coin for our settings.
+        symbol = list(self.all_coins.keys())[0]
+        _settings = self.all_coins[symbol].settings['json']
+        rpcs = _settings.get('rpcs', settings.HIVE_RPC_NODES)
+
+        # If RPC nodes are specified in the custom JSON (or settings.HIVE_RPC_NODES), use the fastest one from
+        # the RPC pool. Otherwise, use an instance with the default Beem nodes.
+        if empty(rpcs, itr=True):
+            if not self._rpc:
+                log.info('Getting BSteem instance for coin %s using the default nodes', symbol)
+                self._rpc = Steem(num_retries=5, num_retries_call=3, timeout=20)  # type: Steem
+                self._rpc.set_password_storage(_settings.get('pass_store', 'environment'))
+            return self._rpc
+        return self._rpc_pool(symbol, rpcs, _settings).get()
     
     def get_rpc(self, symbol: str) -> Steem:
         """
-        Returns a Steem instance for querying data and sending TXs. By default, uses the BSteem shared_steem_instance.
+        Returns a Steem instance for querying data and sending TXs, connected to ``settings.HIVE_RPC_NODES``.
 
-        If a custom RPC list is specified in the Coin "custom json" settings, a new instance will be returned with the
-        RPCs specified in the json.
+        If a custom RPC list is specified in the Coin "custom json" settings, those nodes are used instead. The
+        instance for the fastest healthy node is returned (see :class:`payments.coin_handlers.base.RPCPool`).
 
         :param symbol: Coin symbol to get BSteem RPC instance for
         :return beem.steem.Steem: An instance of :class:`beem.steem.Steem` for querying
         """
-        if symbol not in self._rpcs:
-            _settings = self.settings[symbol]['json']
-            rpcs = _settings.get('rpcs', settings.HIVE_RPC_NODES)
-            rpc_conf = dict(num_retries=5, num_retries_call=3, timeout=20, node=rpcs)
+        _settings = self.settings[symbol]['json']
+        rpcs = _settings.get('rpcs', settings.HIVE_RPC_NODES)
+        return self.rpc if empty(rpcs, itr=True) else self._rpc_pool(symbol, rpcs, _settings).get()
+
+    def _rpc_pool(self, symbol: str, rpcs, _settings: dict) -> RPCPool:
+        """
+        Returns the shared :class:`.RPCPool` for the RPC nodes ``rpcs`` of ``symbol``. Each node's Steem instance
+        lists that node first, followed by the other nodes, so Beem can still fail over part way through a call.
+        """
+        rpcs = [rpcs] if isinstance(rpcs, str) else list(rpcs)
+
+        def factory(url: str) -> Steem:
+            nodes = [url] + [n for n in rpcs if n != url]
+            rpc_conf = dict(num_retries=5, num_retries_call=3, timeout=20, node=nodes)
             log.info('Getting BSteem instance for coin %s - settings: %s', symbol, rpc_conf)
-            self._rpcs[symbol] = self.rpc if empty(rpcs, itr=True) else Steem(**rpc_conf)
-            self._rpcs[symbol].set_password_storage(_settings.get('pass_store', 'environment'))
-        return self._rpcs[symbol]
+            rpc = Steem(**rpc_conf)
+            rpc.set_password_storage(_settings.get('pass_store', 'environment'))
+            return rpc
+
+        return RPCPool.get_pool(
+            f'hive:{symbol}', rpcs, factory, probe=lambda s: s.get_dynamic_global_properties(use_stored_data=False)
+        )
     
     @property
     def asset(self, symbol=None) -> Optional[Asset]:
@@ -101,9 +113,13 @@ class HiveMixin(SettingsMixin):
             return None
         """Easy reference to the precision for our current symbol"""
         if not self._precision:
-            self._precision = int(self.asset.precision)
+            self._precision = self.asset_cache(self.symbol).precision(self.symbol, lambda: self.rpc)
         return self._precision
     
+    def asset_cache(self, symbol: str = None) -> AssetCache:
+        """Returns the shared :class:`.AssetCache` for Hive, seeded from ``custom_chains`` in the Steem handler"""
+        return AssetCache.get_cache('hive', custom_chains['HIVE']['chain_assets'])
+    
     def find_steem_tx(self, tx_data, last_blocks=15) -> Optional[dict]:
         """
         Used internally to get the transaction ID after a transaction has been broadcasted
@@ -63,9 +63,12 @@ class HiveEngineMixin(SteemEngineMixin):
     
     @property
     def eng_rpc(self) -> SteemEngineToken:
+        # Use the symbol of the first coin for our settings.
+        symbol = list(self.all_coins.keys())[0]
+        pooled = self._pooled_rpc(symbol, mk_heng_rpc, 'heng')
+        if pooled is not None:
+            return pooled
         if not self._eng_rpc:
-            # Use the symbol of the first coin for our settings.
-            symbol = list(self.all_coins.keys())[0]
             _settings = self.all_coins[symbol].settings['json']
             
             # If you've specified custom RPC nodes in the custom JSON, make a new instance with those
@@ -86,6 +89,9 @@ class HiveEngineMixin(SteemEngineMixin):
         :param symbol: Coin symbol to get Beem RPC instance for
         :return beem.steem.Steem: An instance of :class:`beem.steem.Steem` for querying
         """
+        pooled = self._pooled_rpc(symbol, mk_heng_rpc, 'heng')
+        if pooled is not None:
+            return pooled
         if symbol not in self._eng_rpcs:
             _settings = self.all_coins[symbol].settings['json']
             log.info('Getting HiveEngine instance for coin %s - settings: %s', symbol, _settings)
@@ -0,0 +1,123 @@
+"""
+**Copyright**::
+
+    +===================================================+
+    |                 © 2019 Privex Inc.                |
+    |               https://www.privex.io               |
+    +===================================================+
+    |                                                   |
+    |        CryptoToken Converter                      |
+    |                                                   |
+    |        Core Developer(s):                         |
+    |                                                   |
+    |          (+)  Chris (@someguy123) [Privex]        |
+    |                                                   |
+    +===================================================+
+
+"""
+import logging
+from threading import Lock
+from typing import Callable, Dict, Iterable, Tuple
+
+from beem.asset import Asset
+from beem.steem import Steem
+
+log = logging.getLogger(__name__)
+
+
+class AssetCache:
+    """
+    A per-chain cache of asset metadata for Steem based chains (Steem / Hive), mapping asset NAIs
+    (e.g. ``@@000000021``) to their symbol and precision, and symbols to their precision.
+
+    Each chain's cache is seeded from a static list of chain assets (e.g. ``custom_chains`` in
+    :py:mod:`payments.coin_handlers.Steem.SteemMixin`), so the native assets never need a node lookup. Any other
+    asset is looked up once using a Beem :class:`beem.asset.Asset`, and then cached for the life of the process.
+
+    The RPC instance is passed as a function, so that it's only created / fetched when a lookup is actually needed:
+
+    >>> cache = AssetCache.get_cache('hive', custom_chains['HIVE']['chain_assets'])
+    >>> cache.by_nai('@@000000021', lambda: self.get_rpc('HIVE'))
+    ('HIVE', 3)
+    >>> cache.precision('HBD', lambda: self.get_rpc('HBD'))
+    3
+
+    **Copyright**::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+
+    """
+
+    _caches = {}   # type: Dict[str, AssetCache]
+    _caches_lock = Lock()
+
+    def __init__(self, chain: str, assets: Iterable[dict] = None):
+        """
+        :param str chain:    A name for the chain, e.g. ``steem`` or ``hive``
+        :param list assets:  Static chain assets, as dict's containing ``asset`` (the NAI), ``symbol`` and ``precision``
+        """
+        self.chain = chain
+        self.nais = {}         # type: Dict[str, Tuple[str, int]]
+        self.precisions = {}   # type: Dict[str, int]
+        self._lock = Lock()
+        for a in (assets or []):
+            self._store(a['asset'], a['symbol'], a['precision'])
+
+    @classmethod
+    def get_cache(cls, chain: str, assets: Iterable[dict] = None) -> 'AssetCache':
+        """Returns the shared cache for ``chain``, creating it (seeded with ``assets``) if it doesn't exist yet"""
+        with cls._caches_lock:
+            if chain not in cls._caches:
+                cls._caches[chain] = cls(chain, assets)
+            return cls._caches[chain]
+
+    def _store(self, nai: str, symbol: str, precision: int):
+        with self._lock:
+            if nai is not None:
+                self.nais[str(nai)] = (str(symbol), int(precision))
+            self.precisions[str(symbol)] = int(precision)
+
+    def _lookup(self, asset: str, get_rpc: Callable[[], Steem]):
+        """Load the metadata for the NAI / symbol ``asset`` from the network, and store it in the cache"""
+        log.debug('Asset %s is not cached for chain %s, looking it up', asset, self.chain)
+        a = Asset(asset, steem_instance=get_rpc())
+        nai = a.asset if str(a.asset).startswith('@@') else None
+        self._store(nai, a.symbol, a.precision)
+        return a
+
+    def by_nai(self, nai: str, get_rpc: Callable[[], Steem]) -> Tuple[str, int]:
+        """
+        Returns the ``(symbol, precision)`` of the asset ID ``nai`` (e.g. ``@@000000021``)
+
+        :param str nai:            The NAI asset ID from a transfer op
+        :param callable get_rpc:   A function returning a Beem instance, only called if ``nai`` isn't cached yet
+        :return tuple asset:       The symbol and precision, e.g. ``('STEEM', 3)``
+        """
+        if nai not in self.nais:
+            a = self._lookup(nai, get_rpc)
+            self.nais[nai] = (str(a.symbol), int(a.precision))
+        return self.nais[nai]
+
+    def precision(self, symbol: str, get_rpc: Callable[[], Steem]) -> int:
+        """
+        Returns the precision (decimal places) of the asset ``symbol``, raising an exception (from Beem) if the
+        asset doesn't exist on the chain.
+
+        :param str symbol:         The asset symbol, e.g. ``STEEM``
+        :param callable get_rpc:   A function returning a Beem instance, only called if ``symbol`` isn't cached yet
+        """
+        if symbol not in self.precisions:
+            a = self._lookup(symbol, get_rpc)
+            self.precisions[symbol] = int(a.precision)
+        return self.precisions[symbol]
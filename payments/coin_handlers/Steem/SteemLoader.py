@@ -16,24 +16,26 @@
 
 """
 import logging
+from itertools import islice
 from decimal import Decimal, getcontext, ROUND_DOWN
 from typing import Dict, List, Iterable, Generator, Union
 
 import pytz
 from beem.account import Account
-from beem.asset import Asset
 from dateutil.parser import parse
 from django.utils import timezone
 
 from payments.coin_handlers import BaseLoader
+from payments.coin_handlers.base import RPCPool
 from payments.coin_handlers.Steem.SteemMixin import SteemMixin
+from payments.coin_handlers.Steem.SteemStreamMixin import SteemStreamMixin
 from steemengine.helpers import empty
 
 log = logging.getLogger(__name__)
 getcontext().rounding = ROUND_DOWN
 
 
-class SteemLoader(BaseLoader, SteemMixin):
+class SteemLoader(BaseLoader, SteemMixin, SteemStreamMixin):
     """
     SteemLoader - Loads transactions from the Steem network
 
@@ -56,6 +58,9 @@ class SteemLoader(BaseLoader, SteemMixin):
 
     For **additional settings**, please see the module docstring in :py:mod:`coin_handlers.Steem`
 
+    Coins with ``"load_mode": "blocks"`` in their Custom JSON are loaded by streaming irreversible blocks, see
+    :class:`.SteemStreamMixin`
+
     """
 
     provides = ["STEEM", "SBD"]  # type: List[str]
@@ -69,7 +74,8 @@ class SteemLoader(BaseLoader, SteemMixin):
         self.tx_count = 100
         self.loaded = False
         self._rpc = None
-        self._rpcs = {}
+        # Highest account history index seen per coin during list_txs, used for scan checkpoints
+        self._max_index = {}
 
     @property
     def settings(self) -> Dict[str, dict]:
@@ -92,10 +98,36 @@ class SteemLoader(BaseLoader, SteemMixin):
             self.load()
         for symbol, c in self.coins.items():
             acc_name = c.our_account
-            acc = Account(acc_name, steem_instance=self.get_rpc(c.symbol_id))
-            # get_account_history returns a generator with automatic batching, so we don't have to worry about batches.
-            txs = acc.get_account_history(-1, self.tx_count, only_ops=['transfer'])
+            if self.use_block_stream(c):
+                # Read transfers from irreversible blocks instead of the account history, see SteemStreamMixin
+                yield from self.clean_txs(symbol=c.symbol_id, transactions=self.stream_txs(c), account=acc_name)
+                continue
+            rpc = self.get_rpc(c.symbol_id)
+            with RPCPool.tracked(rpc):
+                acc = Account(acc_name, steem_instance=rpc)
+            last_index = self.get_checkpoint(c).last_index
+            if last_index is None:
+                # get_account_history returns a generator with automatic batching, so we don't have to worry
+                # about batches.
+                txs = acc.get_account_history(-1, self.tx_count, only_ops=['transfer'])
+            else:
+                # Only walk back through history until we reach the last op index seen by the previous run
+                txs = islice(
+                    acc.history_reverse(stop=last_index + 1, use_block_num=False, only_ops=['transfer']),
+                    self.tx_count
+                )
+            txs = self._track_index(c, RPCPool.tracked_iter(rpc, txs))
             yield from self.clean_txs(symbol=c.symbol_id, transactions=txs, account=acc_name)
+            if c.symbol in self._max_index:
+                self.set_checkpoint(c, last_index=self._max_index[c.symbol])
+
+    def _track_index(self, coin, transactions: Iterable[dict]) -> Generator[dict, None, None]:
+        """Passes through ``transactions`` while recording the highest account history ``index`` seen for ``coin``"""
+        for tx in transactions:
+            idx = tx.get('index')
+            if idx is not None and idx > self._max_index.get(coin.symbol, -1):
+                self._max_index[coin.symbol] = idx
+            yield tx
 
     def clean_txs(self, symbol: str, transactions: Iterable[dict], account: str = None) -> Generator[dict, None, None]:
         """
@@ -128,11 +160,14 @@ class SteemLoader(BaseLoader, SteemMixin):
                     continue
                 # Re-write the coin symbol into the database symbol
                 t['coin'] = self.coins[symbol].symbol
-                yield t
             except (AttributeError, KeyError) as e:
                 log.warning('Steem TX missing important key? %s', str(e))
+                continue
             except:
                 log.exception('Error filtering Steem TX, skipping... TX data: %s', tx)
+                continue
+            # Yielded outside of the try, so the bare except can't swallow GeneratorExit when the caller stops early
+            yield t
 
     def clean_tx(self, tx: dict, symbol: str, account: str, memo: str = None, memo_case: bool = False) -> Union[dict, None]:
         """Filters an individual transaction. See :meth:`.clean_txs` for info"""
@@ -145,18 +180,20 @@ class SteemLoader(BaseLoader, SteemMixin):
 
         _am = tx['amount']  # Transfer ops contain a dict 'amount', containing amount:int, nai:str, precision:int
 
+        # Asset metadata comes from the shared per-chain cache, so the RPC is only used for an unknown asset
+        assets, get_rpc = self.asset_cache(symbol), lambda: self.get_rpc(symbol)
         if type(_am) is str:   # Extract and validate asset 'ABC' from '12.345 ABC'
             amt, _symbol = _am.split()
-            _asset = Asset(symbol, steem_instance=self.get_rpc(symbol))
+            # Validate the asset exists on the chain, and use the TX's own asset (not the coin we were passed)
+            assets.precision(_symbol, get_rpc)
+            amt_sym = str(_symbol)
         else:  # Conv asset ID (e.g. @@000000021) to symbol, i.e. "STEEM"
-            _asset = Asset(_am['nai'], steem_instance=self.get_rpc(symbol))
+            amt_sym, _ = assets.by_nai(_am['nai'], get_rpc)
             # Convert integer amount/precision to Decimal's, preventing floating point issues
             amt_int = Decimal(_am['amount'])
             amt_prec = Decimal(_am['precision'])
 
             amt = amt_int / (Decimal(10) ** amt_prec)  # Use precision value to convert from integer amt to decimal amt
-        # Get validated symbol from beem Asset
-        amt_sym = str(_asset.symbol)
         if amt_sym != symbol:  # If the symbol doesn't match the symbol we were passed, skip this TX
             return None
 
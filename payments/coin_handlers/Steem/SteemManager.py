@@ -25,7 +25,7 @@ from beem.exceptions import AccountDoesNotExistsException, MissingKeyError
 from payments.coin_handlers import BaseManager
 from payments.coin_handlers.Steem.SteemLoader import SteemLoader
 from payments.coin_handlers.Steem.SteemMixin import SteemMixin
-from payments.coin_handlers.base import exceptions
+from payments.coin_handlers.base import exceptions, RPCPool
 from steemengine.helpers import empty
 
 log = logging.getLogger(__name__)
@@ -71,7 +71,6 @@ class SteemManager(BaseManager, SteemMixin):
     def __init__(self, symbol: str):
         super(SteemManager, self).__init__(symbol)
         self._rpc = self._asset = self._precision = None
-        self._rpcs = {}
 
     def health(self) -> Tuple[str, tuple, tuple]:
         """
@@ -136,8 +135,10 @@ class SteemManager(BaseManager, SteemMixin):
         :param address: Steem account to check existence of
         :return bool: True if account exists, False if it doesn't
         """
+        rpc = self.rpc
         try:
-            Account(address, steem_instance=self.rpc)
+            with RPCPool.tracked(rpc, ignore=(AccountDoesNotExistsException,)):
+                Account(address, steem_instance=rpc)
             return True
         except AccountDoesNotExistsException:
             return False
@@ -164,10 +165,12 @@ class SteemManager(BaseManager, SteemMixin):
         if not address:
             address = self.coin.our_account
 
-        acc = Account(address, steem_instance=self.rpc)
+        rpc = self.rpc
+        with RPCPool.tracked(rpc):
+            acc = Account(address, steem_instance=rpc)
 
         if not empty(memo):
-            hist = acc.get_account_history(-1, 10000, only_ops=['transfer'])
+            hist = RPCPool.tracked_iter(rpc, acc.get_account_history(-1, 10000, only_ops=['transfer']))
             total = Decimal(0)
             s = SteemLoader(symbols=[self.symbol])
             for h in hist:
@@ -177,7 +180,8 @@ class SteemManager(BaseManager, SteemMixin):
                 total += tx['amount']
             return total
 
-        bal = acc.get_balance('available', self.symbol)
+        with RPCPool.tracked(rpc):
+            bal = acc.get_balance('available', self.symbol)
         return Decimal(bal.amount)
 
     def send(self, amount: Decimal, address: str, from_address: str = None, memo=None, trigger_data=None) -> dict:
@@ -1,10 +1,12 @@
-from typing import Optional, Dict
+from typing import Optional
 
 from beem.asset import Asset
 from beem.blockchain import Blockchain
+from beemgraphenebase.chains import known_chains
 from privex.helpers import empty
 
-from payments.coin_handlers.base import SettingsMixin
+from payments.coin_handlers.Steem.AssetCache import AssetCache
+from payments.coin_handlers.base import SettingsMixin, RPCPool
 from beem.steem import Steem
 from beem.instance import shared_steem_instance
 import logging
@@ -51,49 +53,58 @@ class SteemMixin(SettingsMixin):
 
         self._rpc = None
 
-        # List of Steem instances mapped by symbol
-        self._rpcs = {}   # type: Dict[str, Steem]
-
         # Internal storage variables for the properties ``asset`` and ``precisions``
         self._asset = self._precision = None
         super(SteemMixin, self).__init__(*args, **kwargs)
 
     @property
     def rpc(self) -> Steem:
-        if not self._rpc:
-            # Use the symbol of the first coin for our settings.
-            symbol = list(self.all_coins.keys())[0]
-            settings = self.all_coins[symbol].settings['json']
-            rpcs = settings.get('rpcs')
-
-            # If you've specified custom RPC nodes in the custom JSON, make a new instance with those
-            # Otherwise, use the global shared_steem_instance.
-            rpc_conf = dict(num_retries=5, num_retries_call=3, timeout=20, node=rpcs, custom_chains=custom_chains)
-            log.info('Getting Beem instance for coin %s - settings: %s', symbol, rpc_conf)
-
-            self._rpc = shared_steem_instance() if empty(rpcs, itr=True) else Steem(**rpc_conf)  # type: Steem
-            self._rpc.set_password_storage(settings.get('pass_store', 'environment'))
-            self._rpcs[symbol] = self._rpc
-        return self._rpc
+        # Use the symbol of the first coin for our settings.
+        symbol = list(self.all_coins.keys())[0]
+        settings = self.all_coins[symbol].settings['json']
+        rpcs = settings.get('rpcs')
+
+        # If you've specified custom RPC nodes in the custom JSON, use the fastest one from the RPC pool.
+        # Otherwise, use the global shared_steem_instance.
+        if empty(rpcs, itr=True):
+            if not self._rpc:
+                self._rpc = shared_steem_instance()  # type: Steem
+                self._rpc.set_password_storage(settings.get('pass_store', 'environment'))
+            return self._rpc
+        return self._rpc_pool(symbol, rpcs, settings).get()
 
     def get_rpc(self, symbol: str) -> Steem:
         """
         Returns a Steem instance for querying data and sending TXs. By default, uses the Beem shared_steem_instance.
 
-        If a custom RPC list is specified in the Coin "custom json" settings, a new instance will be returned with the
-        RPCs specified in the json.
+        If a custom RPC list is specified in the Coin "custom json" settings, the instance for the fastest healthy
+        node in that list is returned (see :class:`payments.coin_handlers.base.RPCPool`).
 
         :param symbol: Coin symbol to get Beem RPC instance for
         :return beem.steem.Steem: An instance of :class:`beem.steem.Steem` for querying
         """
-        if symbol not in self._rpcs:
-            settings = self.settings[symbol]['json']
-            rpcs = settings.get('rpcs')
-            rpc_conf = dict(num_retries=5, num_retries_call=3, timeout=20, node=rpcs, custom_chains=custom_chains)
+        settings = self.settings[symbol]['json']
+        rpcs = settings.get('rpcs')
+        return self.rpc if empty(rpcs, itr=True) else self._rpc_pool(symbol, rpcs, settings).get()
+
+    def _rpc_pool(self, symbol: str, rpcs, settings: dict) -> RPCPool:
+        """
+        Returns the shared :class:`.RPCPool` for the RPC nodes ``rpcs`` of ``symbol``. Each node's Steem instance
+        lists that node first, followed by the other nodes, so Beem can still fail over part way through a call.
+        """
+        rpcs = [rpcs] if isinstance(rpcs, str) else list(rpcs)
+
+        def factory(url: str) -> Steem:
+            nodes = [url] + [n for n in rpcs if n != url]
+            rpc_conf = dict(num_retries=5, num_retries_call=3, timeout=20, node=nodes, custom_chains=custom_chains)
             log.info('Getting Beem instance for coin %s - settings: %s', symbol, rpc_conf)
-            self._rpcs[symbol] = self.rpc if empty(rpcs, itr=True) else Steem(**rpc_conf)
-            self._rpcs[symbol].set_password_storage(settings.get('pass_store', 'environment'))
-        return self._rpcs[symbol]
+            rpc = Steem(**rpc_conf)
+            rpc.set_password_storage(settings.get('pass_store', 'environment'))
+            return rpc
+
+        return RPCPool.get_pool(
+            f'steem:{symbol}', rpcs, factory, probe=lambda s: s.get_dynamic_global_properties(use_stored_data=False)
+        )
 
     @property
     def asset(self, symbol=None) -> Optional[Asset]:
@@ -112,9 +123,20 @@ class SteemMixin(SettingsMixin):
             return None
         """Easy reference to the precision for our current symbol"""
         if not self._precision:
-            self._precision = int(self.asset.precision)
+            self._precision = self.asset_cache(self.symbol).precision(self.symbol, lambda: self.rpc)
         return self._precision
 
+    def asset_cache(self, symbol: str) -> AssetCache:
+        """
+        Returns the shared :class:`.AssetCache` for the chain that ``symbol`` is on. Coins using a Hive asset
+        (see ``custom_chains``) share the Hive cache with :class:`coin_handlers.Hive.HiveMixin`, anything else
+        uses the Steem cache, seeded from Beem's known chains.
+        """
+        hive_assets = custom_chains['HIVE']['chain_assets']
+        if symbol in [a['symbol'] for a in hive_assets]:
+            return AssetCache.get_cache('hive', hive_assets)
+        return AssetCache.get_cache('steem', known_chains['STEEM']['chain_assets'])
+
     def find_steem_tx(self, tx_data, last_blocks=15) -> Optional[dict]:
         """
         Used internally to get the transaction ID after a transaction has been broadcasted
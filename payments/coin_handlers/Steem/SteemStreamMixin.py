@@ -0,0 +1,179 @@
+"""
+**Copyright**::
+
+    +===================================================+
+    |                 © 2019 Privex Inc.                |
+    |               https://www.privex.io               |
+    +===================================================+
+    |                                                   |
+    |        CryptoToken Converter                      |
+    |                                                   |
+    |        Core Developer(s):                         |
+    |                                                   |
+    |          (+)  Chris (@someguy123) [Privex]        |
+    |                                                   |
+    +===================================================+
+
+"""
+import logging
+from datetime import datetime
+from threading import Lock
+from typing import Dict, FrozenSet, Generator, List, Tuple
+
+from beem.block import Block
+from beem.blockchain import Blockchain
+
+from payments.coin_handlers.base.RPCPool import RPCPool
+from payments.models import Coin
+from steemengine.helpers import empty
+
+log = logging.getLogger(__name__)
+
+
+class SteemStreamMixin:
+    """
+    SteemStreamMixin - Block streaming mode for Steem-based loaders (:class:`.SteemLoader` and
+    :class:`coin_handlers.Hive.HiveLoader`)
+
+    Instead of walking the account history of each coin's ``our_account``, transfers are read directly from the
+    irreversible blocks after the coin's scan checkpoint, using batched block fetches. While reading blocks, we keep
+    the transfers sent to ANY of the enabled coins' ``our_account`` on this chain, and cache them in memory per block,
+    so one pass over a range of blocks serves STEEM, SBD and every deposit account.
+
+    To enable block streaming for a coin, add ``"load_mode": "blocks"`` to it's Custom JSON settings.
+
+    Optional Custom JSON settings:
+
+    - ``stream_start_blocks`` - When a coin has no checkpoint yet, start this many blocks behind the last
+      irreversible block (Default: 1200 = 1 hour)
+    - ``stream_max_blocks`` - Read at most this many blocks per run, the rest is picked up by the next run
+      (Default: 10000)
+
+    **Copyright**::
+
+      +===================================================+
+      |                 © 2019 Privex Inc.                |
+      |               https://www.privex.io               |
+      +===================================================+
+      |                                                   |
+      |        CryptoToken Converter                      |
+      |                                                   |
+      |        Core Developer(s):                         |
+      |                                                   |
+      |          (+)  Chris (@someguy123) [Privex]        |
+      |                                                   |
+      +===================================================+
+
+    """
+
+    chain_type = 'steembase'
+    """The :class:`models.Coin` ``coin_type`` of the chain being streamed, used to find all deposit accounts"""
+
+    stream_batch_size = 50
+    """The amount of blocks to request per batch RPC call"""
+
+    _block_cache = {}   # type: Dict[Tuple[str, FrozenSet[str]], Dict[int, List[dict]]]
+    """Transfers to our accounts per block, keyed by (chain_type, accounts). Shared by all instances."""
+
+    _block_lock = Lock()
+
+    def use_block_stream(self, coin: Coin) -> bool:
+        """Returns ``True`` if ``coin`` has block streaming enabled in it's Custom JSON (``load_mode``)"""
+        return coin.settings['json'].get('load_mode') == 'blocks'
+
+    def stream_accounts(self) -> FrozenSet[str]:
+        """Returns the ``our_account`` of every enabled coin on this chain (``chain_type``)"""
+        accs = Coin.objects.filter(enabled=True, coin_type=self.chain_type).values_list('our_account', flat=True)
+        return frozenset(a for a in accs if not empty(a))
+
+    def stream_txs(self, coin: Coin) -> Generator[dict, None, None]:
+        """
+        Yields raw transfer operations sent to ``coin.our_account``, from the irreversible blocks after the coin's
+        scan checkpoint. The operations are in the same format as account history, so they can be passed straight
+        into ``clean_txs``.
+
+        After the last operation has been yielded, the checkpoint (``last_block``) is moved to the last block read.
+
+        :param Coin coin: The :class:`models.Coin` to stream transfers for
+        """
+        js = coin.settings['json']
+        start_blocks, max_blocks = int(js.get('stream_start_blocks', 1200)), int(js.get('stream_max_blocks', 10000))
+
+        rpc = self.get_rpc(coin.symbol_id)
+        with RPCPool.tracked(rpc):
+            chain = Blockchain(steem_instance=rpc, mode='irreversible')
+            head = chain.get_current_block_num()
+        last_block = self.get_checkpoint(coin).last_block
+        start = head - start_blocks if last_block is None else last_block + 1
+        stop = min(head, start + max_blocks - 1)
+        if start > stop:
+            log.debug('No new irreversible blocks for %s (checkpoint: %s, head: %s)', coin, last_block, head)
+            return
+
+        log.debug('Streaming blocks %d to %d for %s', start, stop, coin)
+        with RPCPool.tracked(rpc):
+            blocks = self._load_blocks(chain, start, stop, max_blocks)
+        for num in range(start, stop + 1):
+            for op in blocks.get(num, []):
+                # Coins such as STEEM and SBD may share our_account, so only yield transfers of this coin's asset
+                if op['to'] == coin.our_account and self._op_asset(op, coin.symbol_id) == coin.symbol_id:
+                    yield op
+        self.set_checkpoint(coin, last_block=stop)
+
+    def _op_asset(self, op: dict, symbol: str) -> str:
+        """
+        Returns the asset symbol of a transfer op's ``amount``, which is either a legacy string (``"1.000 SBD"``)
+        or a NAI dict (``{"amount": "1000", "precision": 3, "nai": "@@000000013"}``)
+
+        :param dict op:     A transfer op, as yielded by :py:meth:`._block_transfers`
+        :param str symbol:  The coin symbol being loaded, used to pick the asset cache / RPC for NAI lookups
+        :return str asset:  The asset symbol, e.g. ``SBD``
+        """
+        amount = op['amount']
+        if isinstance(amount, str):
+            return amount.split()[1]
+        return self.asset_cache(symbol).by_nai(amount['nai'], lambda: self.get_rpc(symbol))[0]
+
+    def _load_blocks(self, chain: Blockchain, start: int, stop: int, max_blocks: int) -> Dict[int, List[dict]]:
+        """
+        Makes sure that blocks ``start`` to ``stop`` are present in the block cache, fetching only the ranges which
+        are missing, then returns the cache for the current set of deposit accounts.
+        """
+        accounts = self.stream_accounts()
+        with self._block_lock:
+            cache = SteemStreamMixin._block_cache.setdefault((self.chain_type, accounts), {})
+            missing = [n for n in range(start, stop + 1) if n not in cache]
+            # Group the missing block numbers into contiguous ranges, so each range is one batched stream of blocks
+            ranges = []
+            for n in missing:
+                if len(ranges) > 0 and ranges[-1][1] == n - 1:
+                    ranges[-1][1] = n
+                else:
+                    ranges.append([n, n])
+            for r_start, r_stop in ranges:
+                for block in chain.blocks(start=r_start, stop=r_stop, max_batch_size=self.stream_batch_size):
+                    cache[block.block_num] = list(self._block_transfers(block, accounts))
+
+            # Keep the cache bounded for long running processes, by dropping the oldest blocks
+            if len(cache) > max_blocks * 2:
+                for n in sorted(cache.keys())[:len(cache) - max_blocks]:
+                    del cache[n]
+        return cache
+
+    @staticmethod
+    def _block_transfers(block: Block, accounts: FrozenSet[str]) -> Generator[dict, None, None]:
+        """Yields transfer ops from ``block`` which were sent to any of ``accounts``, in account history format"""
+        ts = block['timestamp']
+        ts = ts.strftime('%Y-%m-%dT%H:%M:%S') if isinstance(ts, datetime) else ts
+        for tx in block.transactions:
+            for op_num, op in enumerate(tx.get('operations', [])):
+                if isinstance(op, list):
+                    op_type, data = op
+                else:
+                    op_type, data = op['type'], op['value']
+                if op_type not in ['transfer', 'transfer_operation'] or data.get('to') not in accounts:
+                    continue
+                yield dict(
+                    data, type='transfer', trx_id=tx['transaction_id'], op_in_trx=op_num,
+                    block=block.block_num, timestamp=ts
+                )
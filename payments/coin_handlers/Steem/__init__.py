@@ -24,6 +24,9 @@ It will automatically handle any :class:`payments.models.Coin` which has it's ty
       will automatically try to use the best available RPC node for the Steem network.
     - ``pass_store`` - Generally you do not need to touch this. It controls where Beem will look for the wallet
       password. It defaults to ``environment``
+    - ``load_mode`` - Set this to ``blocks`` to load deposits by streaming irreversible blocks, instead of
+      scanning the account history. One pass over the blocks serves every coin and deposit account on the chain.
+      See :class:`.SteemStreamMixin` for the related ``stream_*`` options.
 
     Example JSON custom config::
 
@@ -26,19 +26,23 @@ from django.core.cache import cache
 from privex.steemengine import SETransaction
 
 from payments.coin_handlers.SteemEngine.SteemEngineMixin import SteemEngineMixin
-from payments.coin_handlers.base.BaseLoader import BaseLoader
-from payments.models import Coin
+from payments.coin_handlers.base.AsyncBatchLoader import AsyncBatchLoader
+from payments.coin_handlers.base.RPCPool import RPCPool
 from privex.helpers import convert_datetime
 from steemengine.helpers import empty
 
 log = logging.getLogger(__name__)
 
 
-class SteemEngineLoader(BaseLoader, SteemEngineMixin):
+class SteemEngineLoader(AsyncBatchLoader, SteemEngineMixin):
     """
     This class handles loading transactions for the **SteemEngine** network, and can support almost any token
     on SteemEngine.
 
+    Pages of account history are independent offset windows, so several pages are requested at once
+    (see :class:`payments.coin_handlers.base.AsyncBatchLoader`). Paging stops early once we reach the page containing
+    the scan checkpoint TXID left by the previous run.
+
     **Copyright**::
 
         +===================================================+
@@ -65,31 +69,15 @@ class SteemEngineLoader(BaseLoader, SteemEngineMixin):
     def __init__(self, symbols):
         self._eng_rpc = None
         self._eng_rpcs = {}
+        # Coins without `our_account` can't be loaded, see BatchLoader.load / self.load
+        self.need_account = True
         super(SteemEngineLoader, self).__init__(symbols=symbols)
         self.tx_count = 1000
         self.loaded = False
 
-    def _list_txs(self, coin: Coin, batch=100) -> Generator[dict, None, None]:
-        """
-        Loads transactions for an individual token in batches of `batch`, conforms them to Deposit, then
-        yields each one as a dict
-        """
-        finished = False
-        offset = txs_loaded = 0
-        while not finished:
-            self.load_batch(account=coin.our_account, symbol=coin.symbol_id, limit=batch, offset=offset)
-            txs_loaded += len(self.transactions)
-            # If there are less remaining TXs than batch size - this usually means we've hit the end of the results.
-            # If that happens, or we've hit the transaction limit, then yield the remaining txs and exit.
-            if len(self.transactions) < batch or txs_loaded >= self.tx_count:
-                finished = True
-            # Convert the transactions to Deposit format (clean_txs is generator, so must iterate it into list)
-            txs = list(self.clean_txs(account=coin.our_account, symbol=coin.symbol_id, transactions=self.transactions))
-            del self.transactions   # For RAM optimization, destroy the original transaction list, as it's not needed.
-            offset += batch
-            for tx in txs:
-                yield tx
-            del txs     # At this point, the current batch is exhausted. Destroy the tx array to save memory.
+    def tx_id(self, tx: SETransaction) -> str:
+        """SteemEngine transactions store their ID in either ``txid`` or ``transactionId``"""
+        return tx.raw_data.get('txid', tx.raw_data.get('transactionId'))
 
     def clean_txs(self, account: str, symbol: str, transactions: Iterable[SETransaction]) -> Generator[dict, None, None]:
         """
@@ -130,10 +118,16 @@ class SteemEngineLoader(BaseLoader, SteemEngineMixin):
                 log.exception('Error parsing transaction data. Skipping this TX. tx = %s', tx)
                 continue
 
-    def load_batch(self, account, symbol, limit=100, offset=0, retry=0):
-        """Load SteemEngine transactions for account/symbol into self.transactions with automatic retry on error"""
+    async def load_batch(self, symbol, limit=100, offset=0, account=None) -> List[SETransaction]:
+        """Load SteemEngine transactions for account/symbol using a thread, so several pages can load at once"""
+        return await self.run_sync(self._list_transactions, account, symbol, limit, offset)
+
+    def _list_transactions(self, account, symbol, limit=100, offset=0, retry=0) -> List[SETransaction]:
+        """Load SteemEngine transactions for account/symbol with automatic retry on error"""
         try:
-            self.transactions = self.get_rpc(symbol).list_transactions(account, symbol, limit=limit, offset=offset)
+            rpc = self.get_rpc(symbol)
+            with RPCPool.tracked(rpc):
+                return rpc.list_transactions(account, symbol, limit=limit, offset=offset)
         except:
             log.exception('Something went wrong while loading transactions for symbol %s account %s', account, symbol)
             if retry >= 3:
@@ -141,7 +135,7 @@ class SteemEngineLoader(BaseLoader, SteemEngineMixin):
                 raise Exception('Failed to load TX data for {}:{} after 3 tries.'.format(account, symbol))
             log.error('Will try again in a few seconds.')
             sleep(3)
-            self.load_batch(account, symbol, limit, offset, retry=retry+1)
+            return self._list_transactions(account, symbol, limit, offset, retry=retry+1)
 
     def list_txs(self, batch=100) -> Generator[dict, None, None]:
         """
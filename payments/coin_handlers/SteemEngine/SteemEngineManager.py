@@ -22,7 +22,7 @@ from beem.exceptions import MissingKeyError
 from decimal import Decimal, getcontext, ROUND_DOWN
 
 from payments.coin_handlers.SteemEngine.SteemEngineMixin import SteemEngineMixin
-from payments.coin_handlers.base import exceptions, BaseManager
+from payments.coin_handlers.base import exceptions, BaseManager, RPCPool
 from privex.steemengine import SteemEngineToken
 from steemengine.helpers import empty
 
@@ -148,9 +148,10 @@ class SteemEngineManager(BaseManager, SteemEngineMixin):
         if memo is not None:
             memo = str(memo).strip()
         rpc = self.get_rpc(self.symbol)
-        if empty(memo):
-            return rpc.get_token_balance(user=address, symbol=self.symbol)
-        txs = rpc.list_transactions(user=address, symbol=self.symbol, limit=1000)
+        with RPCPool.tracked(rpc):
+            if empty(memo):
+                return rpc.get_token_balance(user=address, symbol=self.symbol)
+            txs = rpc.list_transactions(user=address, symbol=self.symbol, limit=1000)
         bal = Decimal(0)
         for t in txs:
             if t['to'] == address and t['symbol'] == self.symbol:
@@ -173,7 +174,9 @@ class SteemEngineManager(BaseManager, SteemEngineMixin):
         """If an account ( ``address`` param) exists on Steem, will return True. Otherwise False."""
 
         try:
-            return self.eng_rpc.account_exists(address)
+            rpc = self.eng_rpc
+            with RPCPool.tracked(rpc):
+                return rpc.account_exists(address)
         except:
             log.exception('Something went wrong while running %s.address_valid. Returning NOT VALID.', type(self))
             return False
@@ -16,12 +16,12 @@
 
 """
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 
 from django.conf import settings
 from privex.steemengine import SteemEngineToken
 
-from payments.coin_handlers.base import SettingsMixin
+from payments.coin_handlers.base import SettingsMixin, RPCPool
 
 
 log = logging.getLogger(__name__)
@@ -45,6 +45,8 @@ def mk_seng_rpc(rpc_settings: dict = None, **kwargs) -> SteemEngineToken:
     :param kwargs:                 Alternatively, specify the settings as keyword args
     
     :keyword str rpc_node:         The hostname for the contract API server, e.g. ``api.steem-engine.com``
+    :keyword list rpc_nodes:       (Optional) A list of contract API hostnames. If set, the fastest healthy node is
+                                   used by :class:`.SteemEngineMixin` (see :class:`.RPCPool`), instead of ``rpc_node``
     :keyword str rpc_url:          The URL for the contract API e.g. ``/rpc/contracts``
     :keyword str history_node:     The hostname for the history API server, e.g. ``api.steem-engine.com``
     :keyword str history_url:      The URL for the history API e.g. ``accounts/history``
@@ -82,9 +84,12 @@ class SteemEngineMixin(SettingsMixin):
 
     @property
     def eng_rpc(self) -> SteemEngineToken:
+        # Use the symbol of the first coin for our settings.
+        symbol = list(self.all_coins.keys())[0]
+        pooled = self._pooled_rpc(symbol, mk_seng_rpc, 'seng')
+        if pooled is not None:
+            return pooled
         if not self._eng_rpc:
-            # Use the symbol of the first coin for our settings.
-            symbol = list(self.all_coins.keys())[0]
             _settings = self.all_coins[symbol].settings['json']
         
             # If you've specified custom RPC nodes in the custom JSON, make a new instance with those
@@ -105,6 +110,9 @@ class SteemEngineMixin(SettingsMixin):
         :param symbol: Coin symbol to get Beem RPC instance for
         :return beem.steem.Steem: An instance of :class:`beem.steem.Steem` for querying
         """
+        pooled = self._pooled_rpc(symbol, mk_seng_rpc, 'seng')
+        if pooled is not None:
+            return pooled
         if symbol not in self._eng_rpcs:
             _settings = self.all_coins[symbol].settings['json']
             log.info('Getting SteemEngine instance for coin %s - settings: %s', symbol, _settings)
@@ -112,3 +120,25 @@ class SteemEngineMixin(SettingsMixin):
             self._eng_rpcs[symbol] = mk_seng_rpc(rpc_settings=_settings)
         return self._eng_rpcs[symbol]
 
+    def _pooled_rpc(self, symbol: str, make_rpc: Callable[..., SteemEngineToken], chain: str) \
+            -> Optional[SteemEngineToken]:
+        """
+        If the coin ``symbol`` has a list of contract API nodes in the custom JSON setting ``rpc_nodes``, returns the
+        instance for the fastest healthy node from the shared :class:`.RPCPool`. Otherwise returns ``None``.
+
+        :param str symbol:         The coin symbol to get an RPC instance for
+        :param callable make_rpc:  Creates the RPC instance from settings, e.g. :func:`.mk_seng_rpc`
+        :param str chain:          Used for the pool key, e.g. ``seng``
+        """
+        _settings = self.all_coins[symbol].settings['json']
+        nodes = _settings.get('rpc_nodes')
+        if not nodes:
+            return None
+
+        def factory(host: str) -> SteemEngineToken:
+            log.info('Getting %s contract API instance for coin %s using node %s', chain, symbol, host)
+            return make_rpc(rpc_settings={**_settings, 'rpc_node': host})
+
+        pool = RPCPool.get_pool(f'{chain}:{symbol}', nodes, factory, probe=lambda rpc: rpc.get_token(symbol))
+        return pool.get()
+
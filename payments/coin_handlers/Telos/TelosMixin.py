@@ -34,6 +34,9 @@ class TelosMixin(EOSMixin):
     @property
     def eos(self) -> Cleos:
         """Returns an instance of Cleos and caches it in the attribute :py:attr:`._telos` after creation"""
+        pooled = self._pooled_eos()
+        if pooled is not None:
+            return pooled
         if not self._telos:
             log.debug(f'Creating Cleos instance using Telos API node: {self.url}')
             self.current_rpc = self.url
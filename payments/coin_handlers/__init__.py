@@ -70,18 +70,76 @@ For an example of how to layout your coin handler module, check out the pre-incl
 """
 import logging
 from decimal import Decimal
+from functools import partial
 from importlib import import_module
+from threading import RLock
+from typing import Callable, Dict, Iterable, List, Tuple
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.recorder import MigrationRecorder
 from django.db import connections, DEFAULT_DB_ALIAS
 from payments.coin_handlers.base import BaseLoader, BaseManager
+from payments.coin_handlers.base.exceptions import CoinHandlerException
 from privex import coin_handlers as ch
 
 from payments.coin_handlers.extras import EncryptedKeyStore
 
-handlers = {}
+
+class HandlerEntry(dict):
+    """
+    The ``handlers`` entry for a single coin symbol. It behaves like a dict of ``loaders`` / ``managers`` lists,
+    but each loader / manager is only instantiated the first time that list is accessed, and then kept.
+
+    Creating a handler can open RPC connections, so this means a process which only needs one or two coins (e.g. a
+    web worker, or ``convert_coins --coins X``) doesn't pay for every chain. Use :py:meth:`.count` to find out how
+    many handlers are registered without instantiating them.
+
+    Each entry (and handler type) has it's own lock, so a handler whose constructor is slow or stuck (e.g. on an RPC
+    call) only holds up other threads which need that same coin's handlers.
+    """
+
+    def __init__(self):
+        super(HandlerEntry, self).__init__(loaders=[], managers=[])
+        self.pending = dict(loaders=[], managers=[])   # type: Dict[str, List[Tuple[str, Callable]]]
+        self._locks = dict(loaders=RLock(), managers=RLock())   # type: Dict[str, RLock]
+
+    def add(self, handler_type: str, name: str, factory: Callable):
+        """Register a handler to be instantiated by calling ``factory()`` the first time ``handler_type`` is used"""
+        self.pending.setdefault(handler_type, []).append((name, factory))
+
+    def count(self, handler_type: str) -> int:
+        """
+        Amount of handlers of ``handler_type`` (``loaders`` / ``managers``), including ones not created yet. Handlers
+        which failed to instantiate are dropped, so they're no longer counted once the list has been accessed.
+        """
+        return len(super(HandlerEntry, self).get(handler_type, [])) + len(self.pending.get(handler_type, []))
+
+    def names(self, handler_type: str) -> List[str]:
+        """Class names of the handlers of ``handler_type``, without instantiating them"""
+        built = [type(h).__name__ for h in super(HandlerEntry, self).get(handler_type, [])]
+        return built + [name for name, _ in self.pending.get(handler_type, [])]
+
+    def __getitem__(self, handler_type: str) -> list:
+        with self._locks.setdefault(handler_type, RLock()):
+            for name, factory in self.pending.get(handler_type, []):
+                try:
+                    log.debug('Instantiating %s handler %s', handler_type, name)
+                    super(HandlerEntry, self).__getitem__(handler_type).append(factory())
+                except:
+                    log.exception('Something went wrong instantiating the %s handler %s', handler_type, name)
+            self.pending[handler_type] = []
+            return super(HandlerEntry, self).__getitem__(handler_type)
+
+    def get(self, handler_type: str, default=None):
+        return self[handler_type] if handler_type in self else default
+
+
+handlers = {}   # type: Dict[str, HandlerEntry]
 """
-A dictionary of coin symbols, containing instantiated managers (BaseManager) and loaders (BaseLoader)
+A dictionary of coin symbols, containing managers (BaseManager) and loaders (BaseLoader). Each entry is a
+:class:`.HandlerEntry`, which instantiates the handlers the first time they're accessed.
 
 Example layout::
 
@@ -102,6 +160,26 @@ Example layout::
 handlers_loaded = False
 """Used to track whether the Coin Handlers have been initialized, so reload_handlers can be auto-called."""
 
+generation = 0
+"""
+The registry generation that ``handlers`` is up to date with. Every change to a coin's handlers (see
+:py:func:`.reload_coin`) increments a counter shared between processes through the Django cache, and long running
+processes call :py:func:`.refresh_handlers` to cheaply catch up with changes made by other processes (e.g. the
+admin panel). This only works across processes if a shared cache backend (e.g. memcached / redis) is configured.
+"""
+
+migrating = False
+"""
+Set to True while the ``migrate`` command is running (see :py:mod:`payments.management.commands.migrate`). The
+handlers are never loaded while migrating, and :py:func:`.is_database_synchronized` always runs it's full check.
+"""
+
+_sync_state = {}
+"""Memoized results of :py:func:`.is_database_synchronized` - ``{database: (applied_migrations, result)}``"""
+
+GENERATION_KEY = 'coin_handlers:generation'
+"""Django cache key holding the shared registry generation. ``<key>:<generation>`` holds the symbols it changed."""
+
 ch_base = settings.COIN_HANDLERS_BASE
 """Base module path to where the coin handler modules are located. E.g. payments.coin_handlers"""
 
@@ -113,6 +191,10 @@ def is_database_synchronized(database: str) -> bool:
     Check if all migrations have been ran. Useful for preventing auto-running code accessing models before the
     tables even exist, thus preventing you from migrating...
 
+    Building the migration plan is slow, so the result is memoized per process, keyed on the set of applied
+    migrations - later calls only need one query against the migrations table, unless a migration has been applied
+    (or un-applied) since. The memo is bypassed while :py:data:`.migrating` is True.
+
     >>> from django.db import DEFAULT_DB_ALIAS
     >>> if not is_database_synchronized(DEFAULT_DB_ALIAS):
     >>>     log.warning('Cannot run reload_handlers because there are unapplied migrations!')
@@ -123,9 +205,23 @@ def is_database_synchronized(database: str) -> bool:
     """
     connection = connections[database]
     connection.prepare_database()
+    applied = None
+    if not migrating:
+        applied = frozenset(MigrationRecorder(connection).applied_migrations())
+        memo = _sync_state.get(database)
+        if memo is not None and memo[0] == applied:
+            return memo[1]
     executor = MigrationExecutor(connection)
     targets = executor.loader.graph.leaf_nodes()
-    return False if executor.migration_plan(targets) else True
+    synced = False if executor.migration_plan(targets) else True
+    if applied is not None:
+        _sync_state[database] = (applied, synced)
+    return synced
+
+
+def clear_sync_cache():
+    """Forget the memoized results of :py:func:`.is_database_synchronized`, e.g. after running migrations"""
+    _sync_state.clear()
 
 
 def get_loaders(symbol: str = None) -> list:
@@ -141,15 +237,25 @@ def get_loaders(symbol: str = None) -> list:
 
 
 def has_manager(symbol: str) -> bool:
-    """Helper function - does this symbol have a manager class?"""
+    """
+    Helper function - does this symbol have a manager class? (Doesn't instantiate the manager)
+
+    A manager which hasn't been created yet is counted, even if it later fails to initialise, in which case
+    :py:func:`.get_manager` raises :class:`.CoinHandlerException` and this returns False from then on.
+    """
     if not handlers_loaded: reload_handlers()
-    return symbol.upper() in handlers and len(handlers[symbol].get('managers', [])) > 0
+    return symbol.upper() in handlers and handlers[symbol].count('managers') > 0
 
 
 def has_loader(symbol: str) -> bool:
-    """Helper function - does this symbol have a loader class?"""
+    """
+    Helper function - does this symbol have a loader class? (Doesn't instantiate the loader)
+
+    A loader which hasn't been created yet is counted, even if it later fails to initialise, in which case
+    :py:func:`.get_loader` raises :class:`.CoinHandlerException` and this returns False from then on.
+    """
     if not handlers_loaded: reload_handlers()
-    return symbol.upper() in handlers and len(handlers[symbol].get('loaders', [])) > 0
+    return symbol.upper() in handlers and handlers[symbol].count('loaders') > 0
 
 
 def get_managers(symbol: str = None) -> list:
@@ -175,7 +281,11 @@ def get_manager(symbol: str) -> BaseManager:
     :return BaseManager:   An instance implementing :class:`base.BaseManager`
     """
     if not handlers_loaded: reload_handlers()
-    return handlers[symbol]['managers'][0]
+    managers = handlers[symbol]['managers']
+    if len(managers) == 0:
+        # has_manager counts managers before they're created, so this is usually a manager which failed to initialise
+        raise CoinHandlerException(f'No working manager for {symbol} - check the logs for initialisation errors')
+    return managers[0]
 
 
 def get_loader(symbol: str) -> BaseLoader:
@@ -189,20 +299,27 @@ def get_loader(symbol: str) -> BaseLoader:
     :return BaseLoader:   An instance implementing :class:`base.BaseLoader`
     """
     if not handlers_loaded: reload_handlers()
-    return handlers[symbol]['loaders'][0]
+    loaders = handlers[symbol]['loaders']
+    if len(loaders) == 0:
+        # has_loader counts loaders before they're created, so this is usually a loader which failed to initialise
+        raise CoinHandlerException(f'No working loader for {symbol} - check the logs for initialisation errors')
+    return loaders[0]
 
 
-def add_handler(handler, handler_type):
+def add_handler(handler, handler_type, symbols: Iterable[str] = None):
     global handlers
     # `handler` is an un-instantiated class extending BaseLoader / BaseManager
     for symbol in handler.provides:
+        # When updating individual coins (see reload_coin), only instantiate the handler for those coins
+        if symbols is not None and symbol not in symbols:
+            continue
         if symbol not in handlers:
-            handlers[symbol] = dict(loaders=[], managers=[])
-        h = handler(symbol=symbol) if handler_type == 'managers' else handler(symbols=[symbol])
-        handlers[symbol][handler_type].append(h)
+            handlers[symbol] = HandlerEntry()
+        factory = partial(handler, symbol=symbol) if handler_type == 'managers' else partial(handler, symbols=[symbol])
+        handlers[symbol].add(handler_type, handler.__name__, factory)
 
 
-def init_privex_handler(name: str):
+def init_privex_handler(name: str, symbols: Iterable[str] = None):
     """
     Attempt to import a :py:mod:`privex.coin_handlers` handler module, adapting it for SteemEngine's older
     Coin Handler system.
@@ -214,6 +331,7 @@ def init_privex_handler(name: str):
        the global handlers dictionary
      
     :param str name: The name of a :py:mod:`privex.coin_handlers` handler module, e.g. ``Golos``
+    :param symbols:  (Optional) Only configure / register these coin symbols
     """
     from payments.models import Coin
 
@@ -231,6 +349,8 @@ def init_privex_handler(name: str):
     # Find any coins which are already configured to use this handler, then register the Privex coin handler with
     # the global handler storage
     hcoins = Coin.objects.filter(coin_type=ctype)
+    if symbols is not None:
+        hcoins = hcoins.filter(symbol__in=list(symbols))
     for coin in hcoins:  # type: Coin
         ch.configure_coin(
             coin.symbol_id, our_account=coin.our_account, display_name=coin.display_name,
@@ -238,26 +358,132 @@ def init_privex_handler(name: str):
         )
         ch.add_handler_coin(name, coin.symbol_id)
         if coin.symbol not in handlers:
-            handlers[coin.symbol] = dict(loaders=[], managers=[])
-        # After re-configuring each coin, we need to reload Privex's coin handlers before getting the manager/loader
+            handlers[coin.symbol] = HandlerEntry()
+        # We hand off to privex.coin_handlers.get_manager/loader to initialise the handler's classes (when they're
+        # first used), rather than trying to do it ourselves. Then we register them with the global handler store.
+        handlers[coin.symbol].add('managers', f'{name} manager', partial(ch.get_manager, coin.symbol_id))
+        handlers[coin.symbol].add('loaders', f'{name} loader', partial(ch.get_loader, coin.symbol_id))
+    # After re-configuring the coins, we need to reload Privex's coin handlers before getting the manager/loader.
+    # As the managers / loaders are only created on first use, this only needs to happen once per handler.
+    if len(hcoins) > 0:
         ch.reload_handlers()
-        # We hand off to privex.coin_handlers.get_manager/loader to initialise the handler's classes, rather than
-        # trying to do it ourselves. Then we register them with the global handler store.
-        handlers[coin.symbol]['managers'].append(ch.get_manager(coin.symbol_id))
-        handlers[coin.symbol]['loaders'].append(ch.get_loader(coin.symbol_id))
         
 
+def _shared_generation() -> int:
+    """Returns the registry generation from the Django cache (0 if it's not set)"""
+    try:
+        return int(cache.get(GENERATION_KEY, 0))
+    except Exception:
+        log.exception('Error reading the coin handler generation from the cache')
+        return 0
+
+
+def _bump_generation(symbols: Iterable[str]) -> int:
+    """Increments the shared registry generation, recording which ``symbols`` were changed. Returns the generation."""
+    global generation
+    try:
+        cache.add(GENERATION_KEY, 0, None)
+        gen = cache.incr(GENERATION_KEY)
+        cache.set(f'{GENERATION_KEY}:{gen}', sorted(symbols), 86400)
+    except Exception:
+        log.exception('Error updating the coin handler generation in the cache')
+        return generation
+    # If other processes made changes since we last synced, leave those for refresh_handlers() to pick up.
+    if gen == generation + 1:
+        generation = gen
+    return gen
+
+
+def reload_coin(*symbols: str, bump=True):
+    """
+    Updates the handlers of only the given coin symbols, instead of rebuilding the whole registry like
+    :py:func:`.reload_handlers`. The handler modules' ``provides`` lists are refreshed, then the loaders / managers
+    are re-created for ``symbols`` only, and removed for any symbols which no longer have a handler (e.g. the coin
+    was disabled or deleted).
+
+    Called automatically when a :class:`payments.models.Coin` is saved with changes to it's handler configuration.
+
+    >>> reload_coin('BTC')
+
+    :param symbols:    The coin symbol(s) which have been added / changed / removed
+    :param bool bump:  If True (default), increment the shared generation so other processes pick up the change
+    """
+    symbols = set(str(s).upper() for s in symbols)
+    # If the registry hasn't been loaded in this process yet, it'll be loaded with the new settings on first use.
+    if handlers_loaded and not migrating and len(symbols) > 0:
+        log.debug('Reloading coin handlers for symbols: %s', symbols)
+        for symbol in symbols:
+            handlers.pop(symbol, None)
+
+        for chnd in settings.COIN_HANDLERS:
+            try:
+                i = import_module('.'.join([ch_base, chnd]))
+                if hasattr(i, 'reload'):
+                    i.reload()
+                ex = i.exports
+                if 'loader' in ex:
+                    add_handler(ex['loader'], 'loaders', symbols)
+                if 'manager' in ex:
+                    add_handler(ex['manager'], 'managers', symbols)
+            except:
+                log.exception("Something went wrong reloading the handler %s for %s", chnd, symbols)
+
+        for chnd in settings.PRIVEX_HANDLERS:
+            try:
+                init_privex_handler(chnd, symbols)
+            except:
+                log.exception("Something went wrong reloading the privex.coin_handler %s for %s", chnd, symbols)
+
+    if bump:
+        _bump_generation(symbols)
+
+
+def refresh_handlers() -> bool:
+    """
+    Brings ``handlers`` up to date with changes made by other processes, using the shared generation counter
+    (a single cache read when nothing has changed). Long running processes such as ``run_converter`` should call
+    this periodically. Loads the handlers if they haven't been loaded yet.
+
+    Only the changed coins are reloaded (see :py:func:`.reload_coin`), unless the list of changes has expired from
+    the cache, in which case the whole registry is reloaded.
+
+    :return bool: True if any handlers were reloaded
+    """
+    global generation
+    if not handlers_loaded:
+        reload_handlers()
+        return True
+    shared = _shared_generation()
+    if shared == generation:
+        return False
+    changes = [cache.get(f'{GENERATION_KEY}:{g}') for g in range(generation + 1, shared + 1)]
+    if shared < generation or any(c is None for c in changes):
+        log.debug('Coin handler generation %d -> %d, reloading all handlers', generation, shared)
+        reload_handlers()
+        return True
+    symbols = set(s for c in changes for s in c)
+    log.debug('Coin handler generation %d -> %d, reloading handlers for %s', generation, shared, symbols)
+    reload_coin(*symbols, bump=False)
+    generation = shared
+    return True
+
+
 def reload_handlers():
     """
     Resets `handlers` to an empty dict, then loads all `settings.COIN_HANDLER` classes into the dictionary `handlers`
     using `settings.COIN_HANDLERS_BASE` as the base module path to load from
     """
-    global handlers, handlers_loaded
+    global handlers, handlers_loaded, generation
     handlers = {}
+    # Everything is being reloaded, so we're up to date with all changes made before now
+    generation = _shared_generation()
     log.debug('--- Starting reload_handlers() ---')
 
     # To avoid a chicken and the egg problem where you can't run migrations because our handlers are using the DB
     # we make sure the DB is migrated before we allow any handlers to be loaded.
+    if migrating:
+        log.debug('Not loading coin handlers while migrations are running.')
+        return
     if not is_database_synchronized(DEFAULT_DB_ALIAS):
         log.warning('Cannot run reload_handlers because there are unapplied migrations!')
         return
@@ -303,8 +529,8 @@ def reload_handlers():
     handlers_loaded = True
     log.debug('All handlers:')
     for sym, hdic in handlers.items():
-        for l in hdic.get('loaders', []):
-            log.debug('Symbol %s - Loader: %s', sym, type(l).__name__)
-        for l in hdic.get('managers', []):
-            log.debug('Symbol %s - Manager: %s', sym, type(l).__name__)
+        for l in hdic.names('loaders'):
+            log.debug('Symbol %s - Loader: %s', sym, l)
+        for l in hdic.names('managers'):
+            log.debug('Symbol %s - Manager: %s', sym, l)
     log.debug('--- End of reload_handlers() ---')
@@ -0,0 +1,159 @@
+"""
+**Copyright**::
+
+    +===================================================+
+    |                 © 2019 Privex Inc.                |
+    |               https://www.privex.io               |
+    +===================================================+
+    |                                                   |
+    |        CryptoToken Converter                      |
+    |                                                   |
+    |        Core Developer(s):                         |
+    |                                                   |
+    |          (+)  Chris (@someguy123) [Privex]        |
+    |                                                   |
+    +===================================================+
+
+"""
+import asyncio
+import functools
+import logging
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Generator, List, Tuple
+
+from payments.coin_handlers.base.BatchLoader import BatchLoader
+from payments.models import Coin
+
+log = logging.getLogger(__name__)
+
+
+class AsyncBatchLoader(BatchLoader, ABC):
+    """
+    AsyncBatchLoader - A variant of :class:`.BatchLoader` for data sources where each page of transactions is an
+    independent offset window (e.g. Bitcoin's ``listtransactions``, or SteemEngine's account history API).
+
+    Instead of requesting one page, processing it, and only then requesting the next page, up to
+    :py:attr:`.prefetch_pages` pages ahead of the page being processed are requested concurrently using asyncio, so
+    the loader overlaps it's network waits instead of idling on each page.
+
+    To the outside, it behaves exactly like :class:`.BatchLoader` - :meth:`.list_txs` is still a normal generator,
+    and checkpoints / ``tx_count`` / ``clean_txs`` work the same way. Pages are still yielded newest first, in order.
+
+    The only difference when implementing one, is that :meth:`.load_batch` is a coroutine which **returns** the
+    transactions, rather than storing them in ``self.transactions`` (as several pages are loaded at the same time).
+    RPC libraries which aren't asyncio aware can be called in a thread using :meth:`.run_sync`:
+
+    >>> async def load_batch(self, symbol, limit=100, offset=0, account=None) -> List[dict]:
+    ...     return await self.run_sync(self.rpcs[symbol].listtransactions, count=limit, skip=offset)
+
+    **Copyright**::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+
+    """
+
+    prefetch = True
+    """
+    Async loaders request pages ahead by default. Set ``"prefetch": false`` in a coin's custom JSON to load one page
+    at a time (see :meth:`.use_prefetch`).
+    """
+
+    prefetch_pages = 3
+    """The maximum amount of pages to request ahead of the page currently being processed"""
+
+    async def run_sync(self, func: Callable, *args, **kwargs):
+        """Run the blocking function ``func(*args, **kwargs)`` in the event loop's thread pool, and return the result"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    def _load_pages(self, coin: Coin, batch: int, account: str = None) -> Generator[Tuple[int, list], None, None]:
+        """
+        Yields ``(offset, transactions)`` for each page of raw transactions for ``coin``, newest page first, while
+        keeping up to :py:attr:`.prefetch_pages` of the following pages loading in the background.
+
+        No more pages are requested than needed to reach ``self.tx_count``, and none after a page shorter than
+        ``batch`` (the end of the results) - any later pages which are still loading are cancelled before the short
+        page is yielded. When the caller stops iterating (e.g. the checkpoint was found), any pages still loading
+        are cancelled.
+
+        If :meth:`.use_prefetch` is False for the coin (e.g. ``"prefetch": false`` in it's custom JSON), only one page
+        is loaded at a time.
+        """
+        max_pages = max(1, math.ceil(self.tx_count / batch))
+        prefetch = self.prefetch_pages if self.use_prefetch(coin) else 0
+        loop = asyncio.new_event_loop()
+        pending = {}     # type: Dict[int, asyncio.Task]
+        cancelled = []   # type: List[asyncio.Task]
+
+        def fetch(page: int):
+            pending[page] = loop.create_task(
+                self.load_batch(symbol=coin.symbol_id, limit=batch, offset=page * batch, account=account)
+            )
+
+        def cancel_after(page: int):
+            for p in [p for p in pending.keys() if p > page]:
+                task = pending.pop(p)
+                task.cancel()
+                cancelled.append(task)
+
+        def is_short(task: asyncio.Task) -> bool:
+            return task.done() and not task.cancelled() and task.exception() is None and len(task.result()) < batch
+
+        try:
+            for page in range(max_pages):
+                # A prefetched page which already came back short is the last page, so don't request past it.
+                last = min([p for p, t in pending.items() if is_short(t)], default=max_pages - 1)
+                cancel_after(last)
+                # Keep the current page, plus up to `prefetch_pages` following pages in flight. The first page is
+                # loaded alone, as most incremental runs find the previous checkpoint on it and need no more pages.
+                ahead = prefetch if page > 0 else 0
+                for p in range(page, min(page + ahead, last) + 1):
+                    if p not in pending:
+                        fetch(p)
+                transactions = list(loop.run_until_complete(pending.pop(page)))
+                if len(transactions) < batch:
+                    # End of the results. Don't keep later pages loading while the caller processes this one.
+                    cancel_after(page)
+                    if len(cancelled) > 0:
+                        loop.run_until_complete(asyncio.gather(*cancelled, return_exceptions=True))
+                        cancelled.clear()
+                    yield page * batch, transactions
+                    return
+                yield page * batch, transactions
+                del transactions
+        finally:
+            for task in pending.values():
+                task.cancel()
+            waiting = list(pending.values()) + cancelled
+            if len(waiting) > 0:
+                log.debug('Cancelling %d prefetched pages for %s', len(waiting), coin)
+                loop.run_until_complete(asyncio.gather(*waiting, return_exceptions=True))
+            loop.close()
+
+    @abstractmethod
+    async def load_batch(self, symbol, limit=100, offset=0, account=None) -> List[dict]:
+        """
+        This coroutine should load `limit` transactions in their raw format from your data source, skipping
+        the `offset` newest TXs, and **return** them as a list.
+
+        Several calls may be running at the same time (for different offsets), so don't store anything on ``self``.
+
+        :param symbol:   The symbol to load a batch of transactions for
+        :param limit:    The amount of transactions to load
+        :param offset:   Skip this many transactions (most recent first)
+        :param account:  An account name, or coin address to filter transactions using
+        :return list transactions: The raw transactions, newest first
+        """
+        raise NotImplemented('{}.load_batch is not implemented!'.format(type(self).__name__))
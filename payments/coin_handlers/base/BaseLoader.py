@@ -1,8 +1,8 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Generator, Dict
+from typing import Generator, Dict, Iterable
 from django.conf import settings
-from payments.models import Coin
+from payments.models import Coin, ScanCheckpoint
 
 """
     +===================================================+
@@ -81,6 +81,65 @@ class BaseLoader(ABC):
 
         # For your convenience, self.transactions is pre-defined as a list, for loading into by your functions.
         self.transactions = []
+        # Scan checkpoints loaded from the DB, and new checkpoint positions waiting for :meth:`.save_checkpoints`
+        self._checkpoints = {}          # type: Dict[str, ScanCheckpoint]
+        self._pending_checkpoints = {}  # type: Dict[str, dict]
+
+    @property
+    def checkpoint_name(self) -> str:
+        """The name used to key this loader's :class:`models.ScanCheckpoint` rows. Defaults to the class name."""
+        return type(self).__name__
+
+    def get_checkpoint(self, coin: Coin) -> ScanCheckpoint:
+        """
+        Returns the :class:`models.ScanCheckpoint` for ``coin`` and this loader, creating an empty one if it doesn't
+        exist yet. An empty checkpoint has ``None`` for all of it's position fields, meaning no resume point is known
+        and the loader should scan it's normal ``tx_count`` worth of history.
+
+        >>> cp = self.get_checkpoint(coin)
+        >>> if cp.last_index is not None:
+        >>>     txs = self.history_after(cp.last_index)
+
+        :param Coin coin: The :class:`models.Coin` to get the checkpoint for
+        :return ScanCheckpoint: The checkpoint for this coin + loader
+        """
+        if coin.symbol not in self._checkpoints:
+            cp, _ = ScanCheckpoint.objects.get_or_create(coin=coin, loader=self.checkpoint_name)
+            self._checkpoints[coin.symbol] = cp
+        return self._checkpoints[coin.symbol]
+
+    def set_checkpoint(self, coin: Coin, **position):
+        """
+        Records a new scan position for ``coin``, e.g. ``self.set_checkpoint(coin, last_index=1234)``
+
+        The position is NOT written to the database until :meth:`.save_checkpoints` is called, which ``load_txs`` does
+        only once every transaction yielded by :meth:`.list_txs` has been imported. Loaders should call this after
+        they've yielded the last transaction for a coin, so an error part way through a scan never moves the
+        checkpoint past transactions which weren't stored.
+
+        :param Coin coin: The :class:`models.Coin` the position applies to
+        :param position:  Keyword args matching the fields ``last_index``, ``last_block`` and/or ``last_txid``
+        """
+        self._pending_checkpoints[coin.symbol] = {**self._pending_checkpoints.get(coin.symbol, {}), **position}
+
+    def save_checkpoints(self, skip: Iterable[str] = ()):
+        """
+        Writes any positions recorded by :meth:`.set_checkpoint` to their :class:`models.ScanCheckpoint` rows
+
+        :param skip: Symbols of coins which had transactions that couldn't be stored. Their pending positions are
+                     discarded, so the next run scans them again from the previous checkpoint.
+        """
+        for symbol in set(skip) & set(self._pending_checkpoints.keys()):
+            self.log.warning('Not moving %s checkpoint for %s, as some of it\'s transactions failed to import',
+                             self.checkpoint_name, symbol)
+            del self._pending_checkpoints[symbol]
+        for symbol, position in self._pending_checkpoints.items():
+            cp = self.get_checkpoint(self.orig_coins[symbol])
+            for k, v in position.items():
+                setattr(cp, k, v)
+            cp.save()
+            self.log.debug('Saved %s checkpoint for %s: %s', self.checkpoint_name, symbol, position)
+        self._pending_checkpoints = {}
 
     @abstractmethod
     def list_txs(self, batch=100) -> Generator[dict, None, None]:
@@ -4,6 +4,7 @@ from decimal import Decimal
 from typing import Tuple, Union
 
 from django.conf import settings
+from django.core.cache import cache
 
 from payments.coin_handlers.base import exceptions
 from payments.models import Coin
@@ -86,6 +87,49 @@ class BaseManager(ABC):
         """
         return True
 
+    @property
+    def _health_keys(self) -> Tuple[str, str]:
+        """Django cache keys used by :meth:`.cached_health` and :meth:`.cached_health_test`"""
+        return self.orig_symbol + '_health', self.orig_symbol + '_health_test'
+
+    def cached_health(self, ttl: int = None) -> Tuple[str, tuple, tuple]:
+        """
+        Returns the result of :meth:`.health` from the Django cache if it's less than ``ttl`` seconds old, otherwise
+        calls :meth:`.health` and caches the result.
+
+        :param int ttl: Seconds to cache the health data for (default: ``settings.HEALTH_CACHE_TTL``)
+        :return tuple health_data: (manager_name:str, headings:list/tuple, health_data:list/tuple,)
+        """
+        ttl = settings.HEALTH_CACHE_TTL if ttl is None else ttl
+        return cache.get_or_set(self._health_keys[0], self.health, ttl)
+
+    def cached_health_test(self, ttl: int = None) -> bool:
+        """
+        Returns the result of :meth:`.health_test` from the Django cache if it's less than ``ttl`` seconds old,
+        otherwise calls :meth:`.health_test` and caches the result.
+
+        This allows code which sends many transactions in a row, such as ``convert_coins``, to only check the
+        coin's health once every ``ttl`` seconds, instead of once per transaction. Call :meth:`.invalidate_health`
+        if sending fails, so the next call re-checks the coin's health.
+
+            >>> if not mgr.cached_health_test():
+            >>>     return  # Try again later
+            >>> try:
+            >>>     mgr.send(amount=Decimal(1), address='someguy123')
+            >>> except Exception:
+            >>>     mgr.invalidate_health()
+            >>>     raise
+
+        :param int ttl: Seconds to cache the health test result for (default: ``settings.HEALTH_CACHE_TTL``)
+        :return bool: True if the coin daemon / API appears to be working, False if it's not
+        """
+        ttl = settings.HEALTH_CACHE_TTL if ttl is None else ttl
+        return cache.get_or_set(self._health_keys[1], self.health_test, ttl)
+
+    def invalidate_health(self):
+        """Removes any cached :meth:`.health` / :meth:`.health_test` results for this coin"""
+        cache.delete_many(list(self._health_keys))
+
     @abstractmethod
     def address_valid(self, address) -> bool:
         """
@@ -1,13 +1,16 @@
 import logging
 from abc import abstractmethod, ABC
-from typing import Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Generator, Iterable, List, Optional, Set, Tuple
 
 from django.conf import settings
+from privex.helpers import is_true
 
 from payments.coin_handlers import BaseLoader
 from payments.coin_handlers.base.decorators import retry_on_err
 from payments.coin_handlers.base.exceptions import DeadAPIError
-from payments.models import Coin
+from payments.coin_handlers.base.TxIndex import tx_index
+from payments.models import Coin, ScanCheckpoint
 from steemengine.helpers import empty
 
 log = logging.getLogger(__name__)
@@ -72,6 +75,18 @@ class BatchLoader(BaseLoader, ABC):
 
     """
 
+    prefetch = False
+    """
+    If True, load the next page of transactions in a background thread while the current page is being processed
+    (see :meth:`._prefetch_pages`). Can also be enabled per coin with ``"prefetch": true`` in the coin's custom JSON.
+    """
+
+    stop_on_known = True
+    """
+    If True, stop paging a coin once a full page of transactions has been found which are all already in the
+    Deposit table (see :meth:`.page_known`), as long as the coin's previous scan wasn't interrupted
+    """
+
     def __init__(self, symbols: list = None):
         super(BatchLoader, self).__init__(symbols)
         self.tx_count = 1000
@@ -87,27 +102,198 @@ class BatchLoader(BaseLoader, ABC):
         and conforms them to Deposit using :meth:`.clean_txs`, then yields each one as a dict using a generator for
         memory efficiency.
 
+        If a scan checkpoint exists for this coin (see :meth:`.get_checkpoint`), paging stops after the first page
+        which contains the checkpoint TXID, as everything older than it was imported by a previous run. Once all pages
+        have been yielded, the checkpoint is moved to a TXID from the newest page - unless that page still contains
+        transactions which aren't final yet (see :meth:`.tx_final`), in which case the old checkpoint is kept.
+
+        Paging also stops (if :py:attr:`.stop_on_known` is True) after a full page where every cleaned TX is already
+        in the Deposit table (see :meth:`.known_txs`), whether or not the checkpoint has been reached. This is only
+        done if the coin's previous scan finished (``ScanCheckpoint.complete``), as a scan which was interrupted part
+        way through may have left a gap of TXs which weren't imported below the ones it did import. The checkpoint is
+        marked incomplete before the first new TX is yielded, and complete again once the scan has finished.
+
+        Cleaned transactions which are already in the Deposit table are not yielded, so that ``load_txs`` doesn't
+        have to check them again.
+
         :param models.Coin   coin:    The coin to list TXs for - as an individual coin object from the database
         :param         int  batch:    The amount of transactions to load per iteration
         """
 
-        finished = False
-        offset = txs_loaded = 0
-        while not finished:
-            account = coin.our_account if self.need_account else None
-            self.load_batch(symbol=coin.symbol_id, limit=batch, offset=offset, account=account)
-            txs_loaded += len(self.transactions)
+        account = coin.our_account if self.need_account else None
+        txs_loaded = 0
+        cp = self.get_checkpoint(coin)
+        last_txid = cp.last_txid
+        # Known pages only prove that everything older was imported if the last scan wasn't interrupted
+        trust_known = self.stop_on_known and cp.complete
+        new_txid = None
+        for offset, transactions in self._load_pages(coin, batch, account):
+            txs_loaded += len(transactions)
             # If there are less remaining TXs than batch size - this usually means we've hit the end of the results.
             # If that happens, or we've hit the transaction limit, then yield the remaining txs and exit.
-            if len(self.transactions) < batch or txs_loaded >= self.tx_count:
+            finished = len(transactions) < batch or txs_loaded >= self.tx_count
+            page_ids = [self.tx_id(tx) for tx in transactions]
+            # If we've reached the checkpoint from the last run, then this is the last page we need to load.
+            if not empty(last_txid) and last_txid in page_ids:
+                log.debug('Found checkpoint TX %s for %s at offset %d, stopping.', last_txid, coin, offset)
                 finished = True
+            # The checkpoint is only moved forward if every TX on the newest page is final, otherwise we'd skip
+            # e.g. unconfirmed TXs on the next run.
+            if offset == 0 and len(page_ids) > 0 and all(self.tx_final(coin.symbol_id, tx) for tx in transactions):
+                new_txid = page_ids[0]
             # Convert the transactions to Deposit format (clean_txs is generator, so must iterate it into list)
-            txs = list(self.clean_txs(account=account, symbol=coin.symbol_id, transactions=self.transactions))
-            del self.transactions  # For RAM optimization, destroy the original transaction list, as it's not needed.
-            offset += batch
+            txs = list(self.clean_txs(account=account, symbol=coin.symbol_id, transactions=transactions))
+            known = self.known_txs(coin, txs)
+            # A full page of deposits which we've already imported means everything older was imported too.
+            if trust_known and not finished and len(transactions) >= batch and self.page_known(txs, known):
+                log.debug('All TXs for %s at offset %d are already known, stopping.', coin, offset)
+                finished = True
+            txs = [tx for tx in txs if self._tx_key(tx) not in known]
+            del transactions  # For RAM optimization, destroy the original transaction list, as it's not needed.
+            if len(txs) > 0 and cp.complete:
+                self._mark_incomplete(cp)
             for tx in txs:
                 yield tx
             del txs  # At this point, the current batch is exhausted. Destroy the tx array to save memory.
+            if finished:
+                break
+        position = dict(complete=True)
+        if not empty(new_txid):
+            position['last_txid'] = new_txid
+        self.set_checkpoint(coin, **position)
+
+    @staticmethod
+    def _mark_incomplete(cp: ScanCheckpoint):
+        """
+        Marks the scan checkpoint ``cp`` as incomplete in the database, before any of the scan's TXs are imported.
+        ``load_txs`` imports TXs inside of a transaction, so this is only committed along with the first of them.
+        """
+        cp.complete = False
+        ScanCheckpoint.objects.filter(pk=cp.pk).update(complete=False)
+
+    @staticmethod
+    def _tx_key(tx: dict) -> Tuple[str, int]:
+        """Returns the ``(txid, vout)`` key of a cleaned transaction"""
+        return str(tx['txid']), int(tx.get('vout', 0))
+
+    def known_txs(self, coin: Coin, txs: Iterable[dict]) -> Set[Tuple[str, int]]:
+        """
+        Returns the ``(txid, vout)`` keys of the cleaned transactions ``txs`` which already exist in the Deposit table
+        for ``coin``. Keys are looked up in the shared :class:`.KnownTxIndex` first, and any it doesn't know are
+        checked using a single query.
+
+        :param models.Coin coin:  The coin that the transactions belong to
+        :param Iterable txs:      Transactions in the format yielded by :meth:`.clean_txs`
+        :return set known:        A set of ``(txid, vout)`` tuples
+        """
+        keys = [self._tx_key(tx) for tx in txs]
+        if len(keys) == 0:
+            return set()
+        return tx_index.known(coin, keys)
+
+    def page_known(self, txs: List[dict], known: Set[Tuple[str, int]]) -> bool:
+        """
+        Returns True if the page of cleaned transactions ``txs`` contains at least one deposit, and every deposit in
+        it is in ``known`` (as returned by :meth:`.known_txs`).
+
+        Pages with no deposits on them (e.g. only outgoing transactions) don't tell us anything, so they return False.
+        """
+        if len(txs) == 0:
+            return False
+        return all(self._tx_key(tx) in known for tx in txs)
+
+    def use_prefetch(self, coin: Coin) -> bool:
+        """
+        Returns True if pages for ``coin`` should be loaded in double-buffered mode (see :meth:`._prefetch_pages`),
+        either because :py:attr:`.prefetch` is True for this loader, or the coin's custom JSON has ``"prefetch": true``
+        """
+        return is_true(coin.settings['json'].get('prefetch', self.prefetch))
+
+    def _load_pages(self, coin: Coin, batch: int, account: str = None) -> Generator[Tuple[int, list], None, None]:
+        """
+        Yields ``(offset, transactions)`` for each page of raw transactions for ``coin``, newest page first, using
+        :meth:`.load_batch`. Pages are loaded lazily - the next page is only requested once the caller asks for it,
+        and :meth:`._list_txs` stops iterating once it has all the pages it needs.
+
+        If :meth:`.use_prefetch` is True for the coin, pages are loaded by :meth:`._prefetch_pages` instead.
+
+        :param models.Coin coin:  The coin to load pages of transactions for
+        :param int batch:         The amount of transactions per page
+        :param str account:       The account / address to pass to :meth:`.load_batch` (if ``need_account``)
+        """
+        if self.use_prefetch(coin):
+            yield from self._prefetch_pages(coin, batch, account)
+            return
+        offset = 0
+        while True:
+            self.load_batch(symbol=coin.symbol_id, limit=batch, offset=offset, account=account)
+            transactions = self.transactions
+            del self.transactions
+            yield offset, transactions
+            offset += batch
+
+    def _prefetch_pages(self, coin: Coin, batch: int, account: str = None) -> Generator[Tuple[int, list], None, None]:
+        """
+        Double-buffered version of :meth:`._load_pages`. While the caller is cleaning / importing page N, page N+1 is
+        loaded by :meth:`.load_batch` in a background thread, so network waits overlap with processing.
+
+        At most two pages are held at once (the page being processed, and the one being loaded). The next page isn't
+        requested after a short page (less than ``batch`` TXs, i.e. the end of the results), or once ``tx_count``
+        TXs have been loaded. If the coin has a scan checkpoint, page 1 isn't requested until page 0 has been
+        processed, as most incremental runs find the checkpoint on the first page.
+
+        Your :meth:`.load_batch` runs in a different thread to the caller, so it shouldn't use the database.
+        """
+        def fetch(offset: int) -> list:
+            self.load_batch(symbol=coin.symbol_id, limit=batch, offset=offset, account=account)
+            transactions = self.transactions
+            del self.transactions
+            return transactions
+
+        has_checkpoint = not empty(self.get_checkpoint(coin).last_txid)
+        pool = ThreadPoolExecutor(max_workers=1)
+        offset = loaded = 0
+        future = pool.submit(fetch, 0)   # type: Optional[Future]
+        try:
+            while future is not None:
+                transactions = future.result()
+                loaded += len(transactions)
+                more = len(transactions) >= batch and loaded < self.tx_count
+                future = None
+                if more and not (has_checkpoint and offset == 0):
+                    future = pool.submit(fetch, offset + batch)
+                yield offset, transactions
+                del transactions
+                if more and future is None:
+                    future = pool.submit(fetch, offset + batch)
+                offset += batch
+        finally:
+            # If the caller stopped early (e.g. found the checkpoint), don't wait for a page nobody needs
+            if future is not None:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def tx_id(self, tx: dict) -> str:
+        """
+        Returns the transaction ID of a raw transaction loaded by :meth:`.load_batch`, used for scan checkpoints.
+        Override this if your raw transactions don't store their ID in the ``txid`` key.
+
+        :param dict tx: A raw transaction, in the format returned by your data source
+        :return str: The transaction ID
+        """
+        return tx.get('txid')
+
+    def tx_final(self, symbol: str, tx: dict) -> bool:
+        """
+        Returns ``True`` if a raw transaction will never change in a way that affects :meth:`.clean_txs`, e.g. it has
+        enough confirmations. Loaders for coins with unconfirmed transactions should override this, to prevent the
+        scan checkpoint from moving past a transaction that may need to be imported on a later run.
+
+        :param str symbol: The native symbol of the coin being scanned
+        :param dict tx:    A raw transaction, in the format returned by your data source
+        :return bool:      Whether the transaction is final
+        """
+        return True
 
     def list_txs(self, batch=100) -> Generator[dict, None, None]:
         """
@@ -0,0 +1,251 @@
+"""
+**Copyright**::
+
+    +===================================================+
+    |                 © 2019 Privex Inc.                |
+    |               https://www.privex.io               |
+    +===================================================+
+    |                                                   |
+    |        CryptoToken Converter                      |
+    |                                                   |
+    |        Core Developer(s):                         |
+    |                                                   |
+    |          (+)  Chris (@someguy123) [Privex]        |
+    |                                                   |
+    +===================================================+
+
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Thread
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from payments.models import Coin
+
+log = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """
+    Collects the :meth:`.BaseManager.health` data of every coin in the background, and stores it as a single
+    snapshot in the Django cache, so that the admin Coin Health page (and it's JSON endpoint) never have to wait for
+    RPC calls.
+
+    Coins are probed at the same time using a thread pool (``settings.HEALTH_WORKERS``). A coin which hasn't
+    responded within ``settings.HEALTH_TIMEOUT`` seconds of the refresh starting is reported as timed out, without
+    holding up the rest of the snapshot. This includes coins which are still waiting for a free worker, so
+    ``HEALTH_WORKERS`` should be at least the amount of coins.
+
+    The snapshot is normally refreshed by ``./manage.py refresh_health``. If it's missing or stale (e.g. the
+    command isn't running), :py:meth:`.snapshot` can start a one-off refresh in a daemon thread instead.
+
+    Use the shared instance :py:data:`.health_monitor` rather than creating your own:
+
+    >>> from payments.coin_handlers.base.HealthMonitor import health_monitor
+    >>> health_monitor.refresh()
+    >>> snap = health_monitor.snapshot()
+    >>> snap['age'], snap['coins']['BTC']
+    (0.2, {'status': 'ok', 'handler': 'BitcoinManager', 'elapsed': 0.15, 'error': None})
+
+    **Copyright**::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+
+    """
+
+    cache_key = 'coin_health:snapshot'
+    """Django cache key holding the latest snapshot"""
+
+    lock_key = 'coin_health:refreshing'
+    """Django cache key held while a background refresh started by :py:meth:`.refresh_async` is running"""
+
+    def __init__(self, timeout: float = None, workers: int = None):
+        self._timeout = timeout
+        self._workers = workers
+
+    @property
+    def timeout(self) -> float:
+        """Seconds to wait for a single coin's health data"""
+        return float(settings.HEALTH_TIMEOUT) if self._timeout is None else self._timeout
+
+    @property
+    def workers(self) -> int:
+        """Maximum amount of coins probed at the same time"""
+        return int(settings.HEALTH_WORKERS) if self._workers is None else self._workers
+
+    @property
+    def stale_after(self) -> float:
+        """A snapshot older than this many seconds is considered stale (the refresher has likely stopped)"""
+        return float(settings.HEALTH_REFRESH_INTERVAL) * 2 + self.timeout
+
+    @staticmethod
+    def _probe(symbol: str) -> Tuple[str, tuple, tuple]:
+        """Returns the health data for ``symbol`` from it's manager. Runs in a pool thread."""
+        # Imported here, as payments.coin_handlers imports this package while it's being initialised
+        from payments.coin_handlers import get_manager
+        try:
+            mname, mhead, mres = get_manager(symbol).health()
+            return str(mname), tuple(mhead), tuple(mres)
+        finally:
+            # Each pool thread has it's own DB connections, which would otherwise be left open
+            connections.close_all()
+
+    def collect(self, coins: Iterable[Coin] = None) -> dict:
+        """
+        Probes the health of ``coins`` (default: all coins) concurrently, and returns a snapshot dict (without
+        storing it). See :py:meth:`.refresh`.
+
+        :param coins:       An iterable of :class:`models.Coin` to check, or None for all coins
+        :return dict snap:  dict(updated:float, duration:float, handlers:dict, coins:dict, fails:list)
+        """
+        from payments.coin_handlers import has_manager, refresh_handlers
+        refresh_handlers()
+        coins = list(Coin.objects.all() if coins is None else coins)
+        started, timeout = time.time(), self.timeout
+
+        results = {}   # type: Dict[str, Tuple[str, tuple, tuple]]
+        status, fails = {}, []
+        starts = {}    # type: Dict[str, float]
+
+        def probe(symbol: str):
+            starts[symbol] = time.time()
+            return self._probe(symbol)
+
+        def finish(coin: Coin, state: str, handler: str = None, error: str = None):
+            start = starts.get(coin.symbol)
+            elapsed = None if start is None else round(time.time() - start, 3)
+            status[coin.symbol] = dict(status=state, handler=handler, elapsed=elapsed, error=error)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, self.workers))
+        futures = {}
+        for c in coins:
+            if not has_manager(c.symbol):
+                fails.append('Cannot check {} (no manager registered in coin handlers)'.format(c))
+                finish(c, 'no_manager')
+                continue
+            futures[pool.submit(probe, c.symbol)] = c
+
+        pending = set(futures.keys())
+        # Every coin is submitted up front, so each coin's deadline (counted from it's submission) is also the
+        # deadline of the whole refresh. Coins still waiting for a free worker (e.g. behind probes which are hung on
+        # an RPC call) time out as well, so hung probes can't hold up every later refresh.
+        deadline = started + timeout
+        try:
+            while len(pending) > 0:
+                done, pending = wait(pending, timeout=max(min(0.5, deadline - time.time()), 0),
+                                     return_when=FIRST_COMPLETED)
+                for f in done:
+                    c = futures[f]
+                    try:
+                        results[c.symbol] = f.result()
+                        finish(c, 'ok', handler=results[c.symbol][0])
+                    except Exception as e:
+                        log.exception('Something went wrong loading health data for coin %s', c)
+                        fails.append(
+                            'Failed checking {} (something went wrong loading health data, check server logs)'.format(c)
+                        )
+                        finish(c, 'error', error=f'{type(e).__name__}: {str(e)}')
+                if time.time() < deadline:
+                    continue
+                # Give up on the remaining coins. Their threads can't be killed, but they no longer hold up the
+                # snapshot.
+                for f in pending:
+                    c = futures[f]
+                    queued = '' if c.symbol in starts else ', still waiting for a free worker'
+                    log.warning('Health check for coin %s timed out after %.1f seconds%s', c, timeout, queued)
+                    fails.append('Failed checking {} (no response within {:.1f} seconds{})'.format(c, timeout, queued))
+                    finish(c, 'timeout', error=f'Timed out after {timeout:.1f} seconds{queued}')
+                pending = set()
+        finally:
+            for f in futures:
+                f.cancel()
+            pool.shutdown(wait=False)
+
+        # Group the results by manager, in the same order as ``coins``
+        handlers = {}
+        for c in coins:
+            if c.symbol not in results:
+                continue
+            mname, mhead, mres = results[c.symbol]
+            d = handlers[mname] = dict(headings=list(mhead), results=[]) if mname not in handlers else handlers[mname]
+            d['results'].append(list(mres))
+
+        return dict(
+            updated=time.time(), duration=round(time.time() - started, 3), handlers=handlers, coins=status,
+            fails=fails
+        )
+
+    def refresh(self, coins: Iterable[Coin] = None) -> dict:
+        """
+        Collects the health of all coins (see :py:meth:`.collect`), and stores it as the latest snapshot.
+
+        The snapshot doesn't expire from the cache, so the last known health is still shown (along with it's age)
+        if the refresher stops.
+
+        :return dict snap: The new snapshot
+        """
+        snap = self.collect(coins)
+        cache.set(self.cache_key, snap, None)
+        log.debug('Refreshed health of %d coins in %.2f seconds', len(snap['coins']), snap['duration'])
+        return snap
+
+    def refresh_async(self) -> bool:
+        """
+        Starts :py:meth:`.refresh` in a daemon thread, unless a background refresh is already running (in any
+        process sharing the Django cache).
+
+        :return bool started: True if a refresh was started
+        """
+        # cache.add only succeeds if the key doesn't exist. The timeout ensures a crashed refresh releases it.
+        if not cache.add(self.lock_key, time.time(), int(self.timeout * 2) + 30):
+            return False
+
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                log.exception('Background coin health refresh failed')
+            finally:
+                cache.delete(self.lock_key)
+                connections.close_all()
+
+        Thread(target=run, name='coin-health-refresh', daemon=True).start()
+        return True
+
+    def snapshot(self, refresh_stale: bool = False) -> Optional[dict]:
+        """
+        Returns the latest snapshot from the cache, with it's ``age`` in seconds, and whether it's ``stale``.
+        Never makes any RPC calls.
+
+        :param bool refresh_stale: If True, and the snapshot is missing or stale, start a background refresh
+        :return dict snap:         dict(updated, age, stale, duration, handlers, coins, fails), or None if there's
+                                   no snapshot yet.
+        """
+        snap = cache.get(self.cache_key)
+        if snap is not None:
+            snap = dict(snap)
+            snap['age'] = round(time.time() - snap['updated'], 3)
+            snap['stale'] = snap['age'] > self.stale_after
+        if refresh_stale and (snap is None or snap['stale']):
+            self.refresh_async()
+        return snap
+
+
+health_monitor = HealthMonitor()
+"""The shared :class:`.HealthMonitor` used by the admin Coin Health page and ``refresh_health``"""
@@ -0,0 +1,397 @@
+"""
+**Copyright**::
+
+    +===================================================+
+    |                 © 2019 Privex Inc.                |
+    |               https://www.privex.io               |
+    +===================================================+
+    |                                                   |
+    |        CryptoToken Converter                      |
+    |                                                   |
+    |        Core Developer(s):                         |
+    |                                                   |
+    |          (+)  Chris (@someguy123) [Privex]        |
+    |                                                   |
+    +===================================================+
+
+"""
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from threading import Lock, Thread
+from typing import Any, Callable, Deque, Dict, Generator, Iterable, List, Optional, Tuple, Type
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+
+class RPCNode:
+    """
+    Rolling latency / error statistics for a single RPC node in an :class:`.RPCPool`
+    """
+
+    def __init__(self, url: str, window: int):
+        self.url = url
+        self.latencies = deque(maxlen=window)   # type: Deque[float]
+        self.errors = deque(maxlen=window)      # type: Deque[bool]
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    @property
+    def latency(self) -> float:
+        """Average latency (seconds) of recent successful calls. Nodes we haven't measured yet are tried first."""
+        return sum(self.latencies) / len(self.latencies) if len(self.latencies) > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction (0 to 1) of recent calls to this node which failed"""
+        return sum(self.errors) / len(self.errors) if len(self.errors) > 0 else 0.0
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > time.time()
+
+    def __repr__(self):
+        return f'<RPCNode {self.url} latency={self.latency:.3f}s errors={self.error_rate:.0%} ejected={self.ejected}>'
+
+
+class RPCPool:
+    """
+    A pool of RPC nodes for a coin, which routes to the fastest healthy node, based on the rolling latency and
+    error rate of each node.
+
+    Each node's latency is measured by running ``probe`` against every node (at most once per ``probe_interval``
+    seconds), and from any calls made through :py:meth:`.call` or inside of :py:meth:`.tracked`. A node whose error
+    rate reaches ``max_error_rate`` is ejected from the pool for ``eject_time`` seconds (doubling each time it's
+    ejected again), after which it's re-admitted with a clean error history.
+
+    Probes never hold up a caller - :py:meth:`.get` / :py:meth:`.call` start them in a background thread, where all
+    nodes are probed at the same time, and a node which doesn't answer within ``probe_timeout`` seconds counts as
+    a failed call.
+
+    Pools are shared between all loaders / managers in this process - use :py:meth:`.get_pool` rather than creating
+    them directly.
+
+    Basic usage:
+
+    >>> pool = RPCPool.get_pool(
+    ...     'eos:EOS', ['https://eos.greymass.com', 'https://eos.example.com'],
+    ...     factory=lambda url: Cleos(url=url), probe=lambda c: c.get_info()
+    ... )
+    >>> pool.get().get_account('someguy123')     # Client for the fastest healthy node
+    >>> pool.call(lambda c: c.get_account('someguy123'))   # Same, but failing over to the next node on error
+    >>> c = pool.get()
+    >>> with RPCPool.tracked(c):                 # Record the latency / errors of calls made with a client
+    ...     c.get_account('someguy123')
+
+    **Copyright**::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+
+    """
+
+    _pools = {}    # type: Dict[str, RPCPool]
+    _pools_lock = Lock()
+
+    def __init__(self, nodes: List[str], factory: Callable[[str], Any], probe: Callable[[Any], Any] = None,
+                 **kwargs):
+        """
+        :param list nodes:        A list of node URLs / hostnames, in order of preference
+        :param callable factory:  Called with a node URL, must return a client object for that node
+        :param callable probe:    (Optional) Called with a client, should make a cheap RPC call (e.g. get_info)
+
+        :keyword int window:            Amount of recent calls per node used for latency / error rate
+        :keyword float max_error_rate:  Eject a node once this fraction of it's recent calls have failed
+        :keyword int min_calls:         Don't eject a node until it has at least this many calls in it's window
+        :keyword int eject_time:        Seconds that a node is ejected for (doubles on each repeat ejection)
+        :keyword int probe_interval:    Minimum seconds between probes of every node
+        :keyword float probe_timeout:   A node which doesn't answer a probe within this many seconds has failed it
+        """
+        if len(nodes) == 0:
+            raise ValueError('RPCPool requires at least one node')
+        self.window = int(kwargs.get('window', settings.RPC_POOL_WINDOW))
+        self.max_error_rate = float(kwargs.get('max_error_rate', settings.RPC_POOL_MAX_ERROR_RATE))
+        self.min_calls = int(kwargs.get('min_calls', 3))
+        self.eject_time = int(kwargs.get('eject_time', settings.RPC_POOL_EJECT_TIME))
+        self.probe_interval = int(kwargs.get('probe_interval', settings.RPC_POOL_PROBE_INTERVAL))
+        self.probe_timeout = float(kwargs.get('probe_timeout', settings.RPC_POOL_PROBE_TIMEOUT))
+
+        self.nodes = [RPCNode(url, self.window) for url in nodes]
+        self.factory = factory
+        self.probe = probe
+        self.last_probe = 0.0
+        self._probing = False
+        self._clients = {}   # type: Dict[str, Any]
+        # Clients dropped after an error may still be held by a loader / manager, so we keep track of who owns them
+        self._retired = deque(maxlen=len(self.nodes) * 4)   # type: Deque[Tuple[str, Any]]
+        self._lock = Lock()
+
+    @classmethod
+    def get_pool(cls, key: str, nodes: List[str], factory: Callable[[str], Any],
+                 probe: Callable[[Any], Any] = None, **kwargs) -> 'RPCPool':
+        """
+        Returns the shared pool stored under ``key`` (e.g. ``steem:STEEM``), creating it if it doesn't exist yet,
+        or if the list of nodes has changed since it was created (e.g. the coin's settings were edited).
+
+        Arguments are the same as the constructor :py:meth:`.__init__`
+        """
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None or [n.url for n in pool.nodes] != list(nodes):
+                log.debug('Creating RPC pool %s with nodes: %s', key, nodes)
+                pool = cls._pools[key] = cls(list(nodes), factory, probe, **kwargs)
+            return pool
+
+    @classmethod
+    def clear_pools(cls):
+        """Remove all shared pools, e.g. when the coin handlers are reloaded"""
+        with cls._pools_lock:
+            cls._pools = {}
+
+    @classmethod
+    @contextmanager
+    def tracked(cls, client: Any, ignore: Tuple[Type[Exception], ...] = ()):
+        """
+        Context manager which records the latency of the RPC calls made with ``client`` inside of it, or an error
+        against it's node if they raise an exception. Use this for clients obtained from :py:meth:`.get`, where the
+        call can't simply be retried on another node with :py:meth:`.call` (e.g. sending a transaction).
+
+        Does nothing if ``client`` doesn't belong to a pool (e.g. a coin with only the default RPC node).
+
+        >>> rpc = self.get_rpc('STEEM')
+        >>> with RPCPool.tracked(rpc, ignore=(AccountDoesNotExistsException,)):
+        ...     acc = Account('someguy123', steem_instance=rpc)
+
+        :param client:        A client object returned by a pool
+        :param tuple ignore:  Exceptions which are a normal response from the node (e.g. account not found), and
+                              shouldn't be counted as an error
+        """
+        pool, url = cls.owner(client)
+        start = time.time()
+        try:
+            yield client
+        except ignore:
+            if pool is not None:
+                pool.record(url, latency=time.time() - start)
+            raise
+        except Exception:
+            if pool is not None:
+                pool.record(url, error=True)
+            raise
+        if pool is not None:
+            pool.record(url, latency=time.time() - start)
+
+    @classmethod
+    def tracked_iter(cls, client: Any, iterable: Iterable) -> Generator[Any, None, None]:
+        """
+        Passes through ``iterable`` (e.g. a lazily loaded account history), recording an error against the node of
+        ``client`` if loading the next item raises an exception. Only the loading is tracked, not the caller's
+        handling of each item.
+
+        >>> txs = RPCPool.tracked_iter(rpc, acc.get_account_history(-1, 1000, only_ops=['transfer']))
+        """
+        pool, url = cls.owner(client)
+        try:
+            yield from iterable
+        except Exception:
+            if pool is not None:
+                pool.record(url, error=True)
+            raise
+
+    @classmethod
+    def owner(cls, client: Any) -> Tuple[Optional['RPCPool'], Optional[str]]:
+        """Returns the shared pool which created ``client``, and it's node URL, or ``(None, None)`` if not pooled"""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+        for pool in pools:
+            with pool._lock:
+                for url, c in list(pool._clients.items()) + list(pool._retired):
+                    if c is client:
+                        return pool, url
+        return None, None
+
+    def client(self, url: str) -> Any:
+        """Returns the (cached) client object for the node ``url``, creating it with ``factory`` if needed"""
+        with self._lock:
+            if url in self._clients:
+                return self._clients[url]
+        # Clients may connect to their node when they're created, so don't hold up other threads while we wait
+        c = self.factory(url)
+        with self._lock:
+            return self._clients.setdefault(url, c)
+
+    def record(self, url: str, latency: float = None, error: bool = False):
+        """
+        Record the outcome of a call to the node ``url``. Ejects the node if it's error rate is too high.
+
+        :param str url:        The node URL which was called
+        :param float latency:  How long the call took (in seconds), only used for successful calls
+        :param bool error:     True if the call failed
+        """
+        node = self._node(url)
+        if node is None:
+            return
+        with self._lock:
+            node.errors.append(error)
+            if not error and latency is not None:
+                node.latencies.append(latency)
+            if error:
+                # Drop the client, in case it's connection is what's broken
+                if url in self._clients:
+                    self._retired.append((url, self._clients.pop(url)))
+            if len(node.errors) >= self.min_calls and node.error_rate >= self.max_error_rate and not node.ejected:
+                node.ejections += 1
+                eject_for = self.eject_time * (2 ** (node.ejections - 1))
+                node.ejected_until = time.time() + eject_for
+                node.errors.clear()
+                log.warning('Ejecting RPC node %s for %d seconds (ejection #%d)', url, eject_for, node.ejections)
+
+    def ranked(self) -> List[RPCNode]:
+        """
+        Returns the nodes which aren't ejected, fastest first (nodes with the same latency keep their configured
+        order). If every node is ejected, returns the node which will be re-admitted soonest.
+        """
+        healthy = [n for n in self.nodes if not n.ejected]
+        if len(healthy) == 0:
+            return [min(self.nodes, key=lambda n: n.ejected_until)]
+        return sorted(healthy, key=lambda n: n.latency)
+
+    def get(self) -> Any:
+        """
+        Returns the client for the fastest healthy node, starting a background probe of the nodes if one is due.
+        Errors from calls made with the client are only recorded inside of :py:meth:`.tracked`.
+        """
+        self.probe_async()
+        return self.client(self.ranked()[0].url)
+
+    def best_url(self) -> str:
+        """Returns the URL of the node that :py:meth:`.get` would use"""
+        self.probe_async()
+        return self.ranked()[0].url
+
+    def call(self, fn: Callable[[Any], Any], attempts: int = None) -> Any:
+        """
+        Run ``fn(client)`` against the fastest healthy node, recording it's latency. If it raises an exception, the
+        error is recorded against that node, and the call is retried on the next fastest node.
+
+        :param callable fn:   A function which takes a client object, and makes the RPC call(s)
+        :param int attempts:  Maximum amount of nodes to try (Default: every node in the pool)
+        :raises Exception:    The exception raised by the last node tried, if every attempt failed
+        """
+        self.probe_async()
+        nodes = self.ranked()
+        nodes += [n for n in self.nodes if n not in nodes]   # Ejected nodes are a last resort
+        last_exc = None
+        for node in nodes[:attempts]:
+            try:
+                res, _ = self._timed(node.url, fn)
+                return res
+            except Exception as e:
+                log.warning('RPC call to node %s failed (%s: %s), trying next node', node.url, type(e).__name__, e)
+                last_exc = e
+        raise last_exc
+
+    @property
+    def probe_due(self) -> bool:
+        """True if the pool has a probe function and multiple nodes, and hasn't probed them in ``probe_interval``"""
+        return self.probe is not None and len(self.nodes) > 1 and time.time() - self.last_probe >= self.probe_interval
+
+    def probe_async(self) -> bool:
+        """
+        Starts :py:meth:`.probe_nodes` in a daemon thread if a probe is due, and one isn't already running, so that
+        the caller doesn't have to wait for slow or dead nodes.
+
+        :return bool started: True if a probe was started
+        """
+        with self._lock:
+            if self._probing or not self.probe_due:
+                return False
+            self._probing = True
+
+        def run():
+            try:
+                self.probe_nodes()
+            except Exception:
+                log.exception('Unexpected error while probing RPC nodes')
+            finally:
+                self._probing = False
+
+        Thread(target=run, name='rpc-pool-probe', daemon=True).start()
+        return True
+
+    def probe_nodes(self, force=False):
+        """
+        Run ``probe`` against every node at the same time to measure it's latency, at most once per
+        ``probe_interval``. A node which doesn't answer within ``probe_timeout`` seconds is recorded as an error.
+        Does nothing if the pool has no probe function, or only one node.
+
+        This blocks for up to ``probe_timeout`` seconds - use :py:meth:`.probe_async` from request paths.
+        """
+        if self.probe is None or len(self.nodes) < 2:
+            return
+        with self._lock:
+            if not force and time.time() - self.last_probe < self.probe_interval:
+                return
+            self.last_probe = time.time()
+        # Ejected nodes aren't probed until they're due to be re-admitted
+        nodes = [n for n in self.nodes if not n.ejected]
+        if len(nodes) == 0:
+            return
+        executor = ThreadPoolExecutor(max_workers=len(nodes))
+        futures = {executor.submit(self._probe_node, n.url): n for n in nodes}
+        done, pending = wait(futures.keys(), timeout=self.probe_timeout)
+        # Threads stuck on a dead node can't be killed, but we don't wait for them.
+        executor.shutdown(wait=False)
+        for f in done:
+            url = futures[f].url
+            try:
+                self.record(url, latency=f.result())
+            except Exception as e:
+                log.warning('RPC node %s failed health probe: %s %s', url, type(e).__name__, e)
+                self.record(url, error=True)
+        for f in pending:
+            log.warning('RPC node %s failed health probe: no response within %.0f seconds', futures[f].url,
+                        self.probe_timeout)
+            self.record(futures[f].url, error=True)
+        log.debug('Probed RPC nodes: %s', self.nodes)
+
+    def _probe_node(self, url: str) -> float:
+        """Run ``probe`` against the node ``url`` (in a probe thread), returning how long it took in seconds"""
+        start = time.time()
+        self.probe(self.client(url))
+        return time.time() - start
+
+    def _timed(self, url: str, fn: Callable[[Any], Any]) -> Tuple[Any, float]:
+        """Run ``fn`` with the client for ``url``, recording the latency or error. Returns ``(result, latency)``"""
+        start = time.time()
+        try:
+            res = fn(self.client(url))
+        except Exception:
+            self.record(url, error=True)
+            raise
+        latency = time.time() - start
+        self.record(url, latency=latency)
+        return res, latency
+
+    def _node(self, url: str) -> Optional[RPCNode]:
+        for n in self.nodes:
+            if n.url == url:
+                return n
+        return None
+
+    def __repr__(self):
+        return f'<RPCPool nodes={self.nodes}>'
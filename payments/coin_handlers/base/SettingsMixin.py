@@ -16,7 +16,7 @@
 
 """
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 from django.conf import settings
 
@@ -48,7 +48,11 @@ class SettingsMixin:
 
     """
 
-    _settings = {}  # type: Dict[str, dict]
+    _settings = None  # type: Dict[str, dict]
+    """Merged settings for all of our coins, cached per instance. ``None`` until loaded, or after invalidation."""
+
+    _symbol_settings = None  # type: Dict[str, Tuple[Optional[tuple], dict]]
+    """Per instance cache mapping symbol -> (:py:attr:`.Coin.settings_key`, merged settings for that coin)"""
 
     setting_defaults = dict(host='127.0.0.1', user=None, password=None)
     """If a setting isn't specified, use this dict for defaults, include both RPC defaults and custom json defaults"""
@@ -81,45 +85,98 @@ class SettingsMixin:
 
         :return dict settings: A dictionary mapping coin symbols to settings
         """
-        if len(self._settings) > 0:
-            return self._settings
         return self._prep_settings()
 
+    def invalidate_settings(self, *symbols: str):
+        """
+        Drop the cached settings for ``symbols`` (or all symbols if none are passed), so they're re-loaded from
+        the :class:`payments.models.Coin` objects on the next access to :py:attr:`.settings`.
+
+        Every access to :py:attr:`.settings` compares each coin's :py:attr:`.Coin.settings_key` against the cached
+        copy, and re-loads any coin whose settings have changed, so this is only needed when the settings changed
+        somewhere the key can't see, e.g. ``settings.COIND_RPC``.
+
+        >>> self.invalidate_settings('ENG')
+
+        :param str symbols: Zero or more coin symbols to invalidate
+        """
+        if self._symbol_settings is not None:
+            if len(symbols) == 0:
+                self._symbol_settings = {}
+            for sym in symbols:
+                self._symbol_settings.pop(sym, None)
+        self._settings = None
+
     def _prep_settings(self, reset: bool = False) -> Dict[str, dict]:
         """
         Loads and caches coin daemon settings from both :class:`payments.models.Coin` objects, and from
         ``settings.COIND_RPC`` (if it's defined).
 
+        Settings are cached on this instance per symbol. On each call, every coin's :py:attr:`.Coin.settings_key`
+        is compared with the one its settings were cached under (cheap, as it's just a tuple of the coin's fields),
+        and only new / changed / invalidated coins are re-loaded using :py:meth:`._load_settings`. If nothing has
+        changed, the same dict as the previous call is returned.
+
         :param bool reset:  Default: False; if true - force refresh coin settings into self._settings
         :return dict _settings: {host:str, port:int, user:str, password:str, confirms_needed:int, use_trusted:bool}
         """
-        # If _settings isn't empty, and we aren't forcing a refresh, don't bother re-loading the coin settings
-        if len(self._settings) > 0 and not reset:
-            return self._settings
+        if reset:
+            self.invalidate_settings()
+        # Never modify the class attribute, as it'd be shared between all handler instances
+        if self._symbol_settings is None:
+            self._symbol_settings = {}
 
         s = {}  # Temporary settings dict
+        changed = self._settings is None
+
+        # Only load the settings for coins which aren't cached, or whose settings have changed since they were cached
+        for sym, key, coin in self._settings_sources():
+            cached = self._symbol_settings.get(sym)
+            if cached is None or cached[0] != key:
+                cached = self._symbol_settings[sym] = (key, self._load_settings(sym, coin))
+                changed = True
+            s[sym] = cached[1]
+
+        # Store settings to the instance (unless they're identical to the ones we already have), and return them.
+        if changed or s.keys() != self._settings.keys():
+            self._settings = s
+        return self._settings
 
-        # Load handler settings from Coin objects, combine the JSON dict into our settings dict
-        # log.debug('Loading handler settings from Coin objects')
-        for sym, c in self.all_coins.items():
-            sc = c.settings  # {host,port,user,password,json}
-            s[sym] = {k: v for k, v in sc.items() if k != 'json'}  # Don't include the 'json' key
-            s[sym] = {**s[sym], **sc['json']}  # Merge contents of 'json' into our settings
+    def _settings_sources(self) -> List[Tuple[str, Optional[tuple], Optional[Coin]]]:
+        """
+        Returns the symbols that :py:meth:`._prep_settings` should load settings for, as a list of
+        ``(symbol, cache_key, coin)`` tuples. The settings for a symbol are re-loaded whenever its ``cache_key``
+        differs from the one they were cached under.
+
+        By default, this is each coin in :py:attr:`.all_coins`, keyed by its :py:attr:`.Coin.settings_key`.
+        Child classes may override this to add symbols which aren't backed by a :class:`payments.models.Coin`
+        (with ``coin`` set to None).
+        """
+        return [(sym, c.settings_key, c) for sym, c in self.all_coins.items()]
+
+    def _load_settings(self, symbol: str, coin: Optional[Coin]) -> Dict[str, Any]:
+        """
+        Builds the settings dict for a single coin: the :class:`payments.models.Coin` connection settings, with the
+        custom JSON settings merged in, then ``settings.COIND_RPC`` (if it's defined), then defaults for any gaps.
 
-        # log.debug('Loading Bitcoind handler settings from settings.COIND_RPC (if it exists)')
+        Child classes can override this to change where a coin's settings come from, while re-using the caching
+        in :py:meth:`._prep_settings`.
+
+        :param str symbol:   The symbol the coin is mapped to in :py:attr:`.all_coins`
+        :param Coin coin:    The coin to load the settings from
+        :return dict settings: The cleaned settings for this coin
+        """
+        sc = coin.settings  # {host,port,user,password,json}
+        s = {k: v for k, v in sc.items() if k != 'json'}  # Don't include the 'json' key
+        s = {**s, **sc['json']}  # Merge contents of 'json' into our settings
 
         # If COIND_RPC has been set in settings.py, they take precedence over database-level settings.
         # The attribute ``use_coind_settings`` can be overridden to False by child classes to disable this
-        if self.use_coind_settings and hasattr(settings, 'COIND_RPC'):
-            for symbol, conn in settings.COIND_RPC.items():
-                s[symbol] = {**s[symbol], **conn}
+        if self.use_coind_settings and symbol in getattr(settings, 'COIND_RPC', {}):
+            s = {**s, **settings.COIND_RPC[symbol]}
 
         # Finally, fill in any gaps with the default settings, and cast non-string settings to their correct type.
-        self._clean_settings(s)
-
-        # Store settings to the class attribute, and return them.
-        self._settings = s
-        return self._settings
+        return self._clean_settings({symbol: s})[symbol]
 
     def _cast_settings(self, s: Dict[str, Any]):
         """
@@ -0,0 +1,151 @@
+"""
+**Copyright**::
+
+    +===================================================+
+    |                 © 2019 Privex Inc.                |
+    |               https://www.privex.io               |
+    +===================================================+
+    |                                                   |
+    |        CryptoToken Converter                      |
+    |                                                   |
+    |        Core Developer(s):                         |
+    |                                                   |
+    |          (+)  Chris (@someguy123) [Privex]        |
+    |                                                   |
+    +===================================================+
+
+"""
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, Set, Tuple, Union
+
+from django.conf import settings
+from django.db.models.signals import post_delete
+
+from payments.models import Coin, Deposit
+
+log = logging.getLogger(__name__)
+
+TxKey = Tuple[str, int]
+
+
+class KnownTxIndex:
+    """
+    An in-process index of ``(txid, vout)`` keys per coin which are known to exist in the Deposit table, used to drop
+    duplicate transactions before they're cleaned / inserted, without querying the database for each one.
+
+    Each coin keeps at most ``size`` keys (``settings.KNOWN_TX_INDEX_SIZE``), evicting the least recently used. The
+    first time a coin is used, it's index is warmed from that coin's most recent deposits.
+
+    The index only ever answers "definitely known" - a key which isn't in the index may still exist in the
+    database, so callers must check those against the DB (see :py:meth:`.known`), and the Deposit unique constraint
+    remains the source of truth. Deposits deleted from this process are removed from the index by a signal.
+
+    Use the shared instance :py:data:`.tx_index` rather than creating your own:
+
+    >>> from payments.coin_handlers.base.TxIndex import tx_index
+    >>> tx_index.known(coin, [('abcd123', 0), ('def456', 1)])
+    {('abcd123', 0)}
+    >>> tx_index.add(coin, [('def456', 1)])
+
+    **Copyright**::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+
+    """
+
+    def __init__(self, size: int = None):
+        self._size = size
+        self._coins = {}   # type: Dict[str, OrderedDict]
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        """Maximum amount of keys kept per coin"""
+        return int(settings.KNOWN_TX_INDEX_SIZE) if self._size is None else self._size
+
+    @staticmethod
+    def _symbol(coin: Union[Coin, str]) -> str:
+        return coin.symbol if isinstance(coin, Coin) else str(coin)
+
+    def _keys(self, coin: Union[Coin, str]) -> OrderedDict:
+        """Returns the LRU dict for ``coin``, warming it from the database on first use. Must hold ``self._lock``"""
+        symbol = self._symbol(coin)
+        if symbol not in self._coins:
+            recent = Deposit.objects.filter(coin_id=symbol).order_by('-id').values_list('txid', 'vout')[:self.size]
+            # Oldest first, so the most recent deposits are the last to be evicted
+            self._coins[symbol] = OrderedDict((key, None) for key in reversed(list(recent)))
+            log.debug('Warmed known TX index for %s with %d deposits', symbol, len(self._coins[symbol]))
+        return self._coins[symbol]
+
+    def known(self, coin: Union[Coin, str], keys: Iterable[TxKey], check_db=True) -> Set[TxKey]:
+        """
+        Returns the keys from ``keys`` which already exist as deposits for ``coin``.
+
+        Keys found in the index are returned without touching the database. If ``check_db`` is True, any remaining
+        keys are checked using a single query, and those found are added to the index.
+
+        :param coin:           A :class:`models.Coin` or it's symbol
+        :param keys:           An iterable of ``(txid, vout)`` tuples
+        :param bool check_db:  If False, only the index is checked (keys missing from it may still be in the DB)
+        :return set known:     The ``(txid, vout)`` tuples which are known
+        """
+        keys = set((str(txid), int(vout)) for txid, vout in keys)
+        with self._lock:
+            idx = self._keys(coin)
+            found = set(k for k in keys if k in idx)
+            for k in found:
+                idx.move_to_end(k)
+        missing = keys - found
+        if check_db and len(missing) > 0:
+            in_db = Deposit.objects.filter(coin_id=self._symbol(coin), txid__in=set(k[0] for k in missing))
+            in_db = set(in_db.values_list('txid', 'vout')) & missing
+            self.add(coin, in_db)
+            found |= in_db
+        return found
+
+    def add(self, coin: Union[Coin, str], keys: Iterable[TxKey]):
+        """Mark the ``(txid, vout)`` keys as known deposits for ``coin``, evicting the least recently used keys"""
+        with self._lock:
+            idx = self._keys(coin)
+            for txid, vout in keys:
+                k = (str(txid), int(vout))
+                idx[k] = None
+                idx.move_to_end(k)
+            while len(idx) > self.size:
+                idx.popitem(last=False)
+
+    def discard(self, coin: Union[Coin, str], txid: str, vout: int = 0):
+        """Remove a key from the index, e.g. because the deposit was deleted"""
+        with self._lock:
+            idx = self._coins.get(self._symbol(coin))
+            if idx is not None:
+                idx.pop((str(txid), int(vout)), None)
+
+    def clear(self):
+        """Empty the index for all coins. They'll be warmed from the database again on next use."""
+        with self._lock:
+            self._coins = {}
+
+
+tx_index = KnownTxIndex()
+"""The shared :class:`.KnownTxIndex` used by the loaders and ``load_txs``"""
+
+
+def _deposit_deleted(sender, instance: Deposit, **kwargs):
+    tx_index.discard(instance.coin_id, instance.txid, instance.vout)
+
+
+post_delete.connect(_deposit_deleted, sender=Deposit, dispatch_uid='known_tx_index_deposit_deleted')
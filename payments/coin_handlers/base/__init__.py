@@ -1,6 +1,9 @@
 from payments.coin_handlers.base.BaseLoader import BaseLoader
 from payments.coin_handlers.base.BaseManager import BaseManager
 from payments.coin_handlers.base.SettingsMixin import SettingsMixin
+from payments.coin_handlers.base.RPCPool import RPCPool, RPCNode
+from payments.coin_handlers.base.TxIndex import KnownTxIndex, tx_index
+from payments.coin_handlers.base.HealthMonitor import HealthMonitor, health_monitor
 from payments.coin_handlers.base.decorators import retry_on_err
 import payments.coin_handlers.base.exceptions
 from payments.coin_handlers.base.exceptions import *
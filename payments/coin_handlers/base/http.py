@@ -0,0 +1,105 @@
+"""
+Shared HTTP session layer for coin handlers which talk to REST APIs (e.g. the Privex EOS History API).
+
+Instead of calling ``requests.get`` directly (which opens a new TCP + TLS connection for every request, with no
+timeout), handlers should use :func:`.http_get` / :func:`.http_session`, which provide:
+
+ - Pooled keep-alive connections per host (one session per thread, as :class:`requests.Session` isn't thread safe)
+ - A default timeout (``settings.HTTP_TIMEOUT``) unless one is passed
+ - gzip / deflate compressed responses
+ - Automatic retries with exponential backoff on connection errors / resets and 5xx responses
+
+Usage:
+
+>>> from payments.coin_handlers.base.http import http_get
+>>> r = http_get('https://eos-history.privex.io/api/actions/', params=dict(limit=10))
+>>> r.raise_for_status()
+>>> r.json()
+
+**Copyright**::
+
+    +===================================================+
+    |                 © 2019 Privex Inc.                |
+    |               https://www.privex.io               |
+    +===================================================+
+    |                                                   |
+    |        CryptoToken Converter                      |
+    |                                                   |
+    |        Core Developer(s):                         |
+    |                                                   |
+    |          (+)  Chris (@someguy123) [Privex]        |
+    |                                                   |
+    +===================================================+
+
+"""
+import logging
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class TimeoutSession(requests.Session):
+    """A :class:`requests.Session` which applies ``settings.HTTP_TIMEOUT`` to any request without a timeout"""
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_TIMEOUT)
+        return super(TimeoutSession, self).request(method, url, **kwargs)
+
+
+def make_session() -> requests.Session:
+    """
+    Creates a new :class:`.TimeoutSession` with keep-alive connection pooling, gzip, and retries configured from
+    ``settings.HTTP_RETRIES``, ``settings.HTTP_BACKOFF`` and ``settings.HTTP_POOL_SIZE``.
+
+    Most code should use the per-thread shared session from :func:`.http_session` instead.
+    """
+    retry = Retry(
+        total=settings.HTTP_RETRIES, connect=settings.HTTP_RETRIES, read=settings.HTTP_RETRIES,
+        backoff_factor=settings.HTTP_BACKOFF, status_forcelist=(500, 502, 503, 504), raise_on_status=False
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=settings.HTTP_POOL_SIZE,
+                          pool_maxsize=settings.HTTP_POOL_SIZE)
+    s = TimeoutSession()
+    s.mount('https://', adapter)
+    s.mount('http://', adapter)
+    s.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+    return s
+
+
+def http_session() -> requests.Session:
+    """Returns the shared HTTP session for the current thread, creating it on first use"""
+    s = getattr(_local, 'session', None)
+    if s is None:
+        log.debug('Creating HTTP session for thread %s', threading.current_thread().name)
+        s = _local.session = make_session()
+    return s
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """
+    Make a GET request using the shared HTTP session from :func:`.http_session`. Takes the same arguments
+    as :func:`requests.get`
+
+    :param str url: The URL to request
+    :return requests.Response r: The response object
+    """
+    return http_session().get(url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    """
+    Make a POST request using the shared HTTP session from :func:`.http_session`. Takes the same arguments
+    as :func:`requests.post`
+
+    Note: POST requests are not automatically retried on 5xx responses, only on connection errors before the
+    request was sent.
+    """
+    return http_session().post(url, **kwargs)
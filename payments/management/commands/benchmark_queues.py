@@ -0,0 +1,118 @@
+"""
+Copyright::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+"""
+import logging
+import time
+from decimal import Decimal
+from typing import Callable, Dict
+
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import transaction
+
+from payments.management.commands.convert_coins import Command as ConvertCommand
+from payments.models import Coin, Deposit
+
+log = logging.getLogger(__name__)
+
+
+class Rollback(Exception):
+    """Raised at the end of the benchmark to roll back the generated deposits"""
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the converter's deposit queue queries (``new`` deposits per coin, ``mapped`` deposits per destination
+    coin, and the mapped count used for low balance emails) as the amount of deposits in a final state grows.
+
+    Fake deposits in the states ``conv``, ``inv`` and ``refund`` are inserted in steps (e.g. ``--rows 0,10000,100000``)
+    and each query is timed after every step. Everything runs inside of a transaction which is rolled back at the end,
+    so no data is left behind. With the ``Deposit`` status indexes in place, the query times should stay roughly flat.
+
+    Example::
+
+        ./manage.py benchmark_queues --rows 0,10000,100000,500000 --explain
+
+    """
+
+    help = 'Times the converter queue queries as the Deposit table fills with converted / invalid deposits'
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--rows', type=str, default='0,10000,100000',
+                            help='Comma separated amounts of final state deposits to benchmark with')
+        parser.add_argument('--repeat', type=int, default=5, help='Run each query this many times, keep the fastest')
+        parser.add_argument('--explain', action='store_true', help='Print the query plans after the last step')
+
+    def queries(self, coin: Coin) -> Dict[str, Callable]:
+        return {
+            'new_deposits': lambda: list(ConvertCommand.new_deposits([coin.symbol]).values_list('id', flat=True)),
+            'mapped_queues': lambda: ConvertCommand().mapped_queues(),
+            'mapped_counts': lambda: ConvertCommand.mapped_counts(),
+            'low_bal_waiting': lambda: Deposit.objects.filter(status='mapped', convert_to=coin).count(),
+        }
+
+    def fill(self, coin: Coin, total: int, start: int):
+        """Inserts fake final state deposits for ``coin`` until there are ``total`` of them"""
+        statuses = ['conv', 'inv', 'refund']
+        for i in range(start, total, 5000):
+            Deposit.objects.bulk_create([
+                Deposit(
+                    txid=f'benchmark_{n}', coin=coin, status=statuses[n % 3], amount=Decimal('1'),
+                    convert_to=coin, memo='benchmark'
+                ) for n in range(i, min(i + 5000, total))
+            ])
+
+    def handle(self, *args, **options):
+        steps = sorted(int(r) for r in options['rows'].split(','))
+        repeat = max(1, int(options['repeat']))
+        coin = Coin.objects.first()
+        if coin is None:
+            self.stderr.write('You must have at least one Coin in the database to run this benchmark.')
+            return
+
+        try:
+            with transaction.atomic():
+                # Leave a handful of deposits in the queues, so the queries have something to find
+                self.stdout.write(f'Using coin {coin.symbol}. All generated deposits will be rolled back.\n')
+                for n, status in enumerate(['new', 'mapped'] * 10):
+                    Deposit.objects.create(
+                        txid=f'benchmark_queue_{n}', coin=coin, status=status, amount=Decimal('1'), convert_to=coin
+                    )
+
+                filled = 0
+                self.stdout.write(f'{"final rows":>12} ' + ' '.join(f'{q:>16}' for q in self.queries(coin)))
+                for total in steps:
+                    self.fill(coin, total, filled)
+                    filled = max(filled, total)
+                    timings = []
+                    for name, query in self.queries(coin).items():
+                        best = None
+                        for _ in range(repeat):
+                            t = time.perf_counter()
+                            query()
+                            t = time.perf_counter() - t
+                            best = t if best is None else min(best, t)
+                        timings.append(best)
+                    self.stdout.write(f'{total:>12} ' + ' '.join(f'{t * 1000:>14.2f}ms' for t in timings))
+
+                if options['explain']:
+                    self.stdout.write('\nQuery plans:')
+                    self.stdout.write(ConvertCommand.new_deposits([coin.symbol]).explain())
+                    self.stdout.write(Deposit.objects.filter(status='mapped', convert_to=coin).explain())
+                raise Rollback()
+        except Rollback:
+            self.stdout.write('\nBenchmark finished, generated deposits have been rolled back.')
@@ -0,0 +1,110 @@
+"""
+Copyright::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+"""
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import DEFAULT_DB_ALIAS
+
+from payments import coin_handlers
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Measures how long a fresh process takes from running ``manage.py`` until the first coin handler is available,
+    which is paid by every cron run, gunicorn worker boot etc.
+
+    Each run starts a new ``manage.py benchmark_startup --child`` process, which reports when Django was ready, how
+    long the migration check took (first call, and a second memoized call), and when the first handler was loaded.
+    The fastest and median times of all runs are printed.
+
+    Example::
+
+        ./manage.py benchmark_startup --runs 10
+
+    """
+
+    help = 'Times a fresh process from manage.py startup until the first coin handler is available'
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--runs', type=int, default=5, help='Amount of fresh processes to time')
+        parser.add_argument('--child', action='store_true', help='(Internal) Time this process and print JSON')
+
+    def child(self):
+        """Runs inside of each benchmark process, timing the migration check and first handler load"""
+        ready = time.time()
+        t = time.perf_counter()
+        coin_handlers.is_database_synchronized(DEFAULT_DB_ALIAS)
+        sync_cold = time.perf_counter() - t
+        t = time.perf_counter()
+        coin_handlers.is_database_synchronized(DEFAULT_DB_ALIAS)
+        sync_warm = time.perf_counter() - t
+
+        coin_handlers.reload_handlers()
+        symbol = next(iter(coin_handlers.handlers), None)
+        if symbol is not None:
+            if coin_handlers.has_manager(symbol):
+                coin_handlers.get_manager(symbol)
+            else:
+                coin_handlers.get_loader(symbol)
+        self.stdout.write(json.dumps(dict(
+            ready=ready, sync_cold=sync_cold, sync_warm=sync_warm, handler=time.time(), symbol=symbol
+        )))
+
+    def handle(self, *args, **options):
+        if options['child']:
+            return self.child()
+
+        manage = os.path.join(settings.BASE_DIR, 'manage.py')
+        results = []
+        for n in range(max(1, int(options['runs']))):
+            start = time.time()
+            proc = subprocess.run(
+                [sys.executable, manage, 'benchmark_startup', '--child'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=settings.BASE_DIR, env=os.environ.copy()
+            )
+            try:
+                res = json.loads(proc.stdout.decode().strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                self.stderr.write(f'Run {n + 1} failed (exit code {proc.returncode}), skipping.')
+                continue
+            results.append(dict(
+                django=res['ready'] - start, sync_cold=res['sync_cold'], sync_warm=res['sync_warm'],
+                handler=res['handler'] - start
+            ))
+            self.stdout.write(f"Run {n + 1}: first handler ({res['symbol']}) after {results[-1]['handler']:.3f}s")
+
+        if len(results) == 0:
+            self.stderr.write('No successful runs.')
+            return
+        self.stdout.write(f'\n{"":<30} {"fastest":>10} {"median":>10}')
+        labels = dict(
+            django='manage.py -> Django ready', sync_cold='Migration check (first)',
+            sync_warm='Migration check (memoized)', handler='manage.py -> first handler'
+        )
+        for key, label in labels.items():
+            times = [r[key] for r in results]
+            self.stdout.write(f'{label:<30} {min(times):>9.3f}s {statistics.median(times):>9.3f}s')
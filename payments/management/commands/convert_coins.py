@@ -16,19 +16,24 @@ Copyright::
 """
 import logging
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
 from decimal import Decimal
-from typing import Tuple, Union
+from threading import Lock
+from typing import Tuple, Union, Dict, List, Optional, Set
 
 from django.conf import settings
 from django.core.mail import mail_admins
 from django.core.management import BaseCommand
-from django.db import transaction
+from django.db import transaction, connection, close_old_connections
+from django.db.models import Count, F, Q, QuerySet
+from django.db.models.signals import post_save, post_delete
 from django.template.loader import render_to_string
 from django.utils import timezone
 from privex.helpers import is_true
 
 from payments.coin_handlers import get_manager
-from payments.coin_handlers.base import SettingsMixin
+from payments.coin_handlers.base import SettingsMixin, BaseManager
 from payments.coin_handlers.base.exceptions import NotEnoughBalance, AccountNotFound
 from payments.management import CronLoggerMixin
 from payments.models import Deposit, Coin, CoinPair, Conversion, AddressAccountMap
@@ -53,6 +58,212 @@ class ConvertInvalid(BaseException):
     pass
 
 
+class BalanceBudget:
+    """
+    Tracks the hot wallet balance of each destination coin during a conversion run, so that deposits which can't be
+    covered by the remaining balance are skipped without attempting a send (and failing with NotEnoughBalance).
+
+    Each coin's balance is only queried once per run (the first time it's needed). Every deposit which is going to be
+    sent then reserves it's amount against that balance, in deposit order. Deposits which don't fit are added to the
+    coin's shortfall, which is used by :py:meth:`.Command.apply_shortfalls` to update ``Coin.funds_low``.
+
+    Coins which we can issue (``can_issue``) are never limited by their balance.
+    """
+
+    def __init__(self):
+        self.balances = {}    # type: Dict[str, Decimal]
+        """Remaining (unreserved) balance per coin symbol. ``None`` if the balance couldn't be loaded."""
+        self.shortfall = {}   # type: Dict[str, Decimal]
+        """Total amount of each coin that we couldn't send due to low balance"""
+        self.pairs = {}       # type: Dict[str, CoinPair]
+        """The first CoinPair per coin that was skipped due to low balance, for notification emails"""
+        self._lock = Lock()
+        self._load_locks = {}  # type: Dict[str, Lock]
+
+    def _load_balance(self, sym: str, mgr: BaseManager):
+        """
+        Load the balance of ``sym`` into :py:attr:`.balances` if it isn't there yet.
+
+        The balance RPC call is made while holding a lock for that coin only, so it's only queried once per run,
+        without making reservations for other coins wait on it.
+        """
+        with self._lock:
+            lock = self._load_locks.setdefault(sym, Lock())
+        with lock:
+            if sym in self.balances:
+                return
+            try:
+                bal = Decimal(mgr.balance())
+                log.debug('Balance for %s at start of conversion run: %f', sym, bal)
+            except Exception:
+                log.exception('Could not load balance for %s. Not limiting conversions by balance.', sym)
+                bal = None
+            with self._lock:
+                # exhaust() may have already zeroed the balance while we were loading it
+                self.balances.setdefault(sym, bal)
+
+    def reserve(self, pair: CoinPair, mgr: BaseManager, amount: Decimal) -> bool:
+        """
+        Reserve ``amount`` of ``pair.to_coin`` from it's remaining balance.
+
+        :param CoinPair pair:   The CoinPair being converted, the destination coin is ``pair.to_coin``
+        :param BaseManager mgr: The manager for the destination coin, used to load it's balance
+        :param Decimal amount:  The amount that we want to send
+        :return bool: True if there's enough balance (or the balance is unknown / not limited), False if there isn't
+        """
+        tcoin = pair.to_coin
+        if tcoin.can_issue:
+            return True
+        sym = tcoin.symbol
+        if sym not in self.balances:
+            self._load_balance(sym, mgr)
+        with self._lock:
+            bal = self.balances[sym]
+            if bal is None:
+                return True
+            if amount > bal:
+                self.shortfall[sym] = self.shortfall.get(sym, Decimal(0)) + amount
+                self.pairs.setdefault(sym, pair)
+                return False
+            self.balances[sym] = bal - amount
+            return True
+
+    def release(self, pair: CoinPair, amount: Decimal):
+        """Return a reservation made by :meth:`.reserve` (e.g. when the send failed)"""
+        sym = pair.to_coin.symbol
+        with self._lock:
+            if self.balances.get(sym) is not None and not pair.to_coin.can_issue:
+                self.balances[sym] += amount
+
+    def exhaust(self, pair: CoinPair, amount: Decimal):
+        """Mark a coin as having no usable balance, e.g. the coin reported NotEnoughBalance despite our reservation"""
+        sym = pair.to_coin.symbol
+        with self._lock:
+            self.balances[sym] = Decimal(0)
+            self.shortfall[sym] = self.shortfall.get(sym, Decimal(0)) + amount
+            self.pairs.setdefault(sym, pair)
+
+
+class RoutingIndex:
+    """
+    An in-memory index of the routing tables used to validate deposits (:class:`payments.models.Coin`,
+    :class:`payments.models.CoinPair` and :class:`payments.models.AddressAccountMap`), so that validating a deposit
+    is a few dict lookups, instead of several queries per deposit.
+
+    The tables are loaded with one query each, the first time they're needed. The index is invalidated whenever a
+    coin or coin pair is saved or deleted in this process (via Django signals), and ``convert_coins`` /
+    ``run_converter`` invalidate it at the start of each run, to pick up changes made by other processes (e.g. the
+    admin panel). Saving or deleting an address map only re-loads the maps for the affected deposit address.
+
+    Lookups raise the same ``DoesNotExist`` exceptions as the equivalent ``.objects.get()`` query would.
+
+    The returned objects are shared between every caller (and thread), so they must be treated as read-only. Code
+    which writes to a coin should use an ``UPDATE`` query (e.g. ``Coin.objects.filter(symbol=...).update(...)``)
+    or load a fresh instance, so a stale cached copy never overwrites changes made elsewhere.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.coins = {}     # type: Dict[str, Coin]
+        self.pairs = {}     # type: Dict[Tuple[str, str], CoinPair]
+        self.maps = {}      # type: Dict[Tuple[str, str], List[AddressAccountMap]]
+        self.stale_maps = set()   # type: Set[Tuple[str, str]]
+        self._lock = Lock()
+
+    def invalidate(self, *args, **kwargs):
+        """Mark the index as stale, so it's re-loaded on next use. Accepts (and ignores) signal arguments."""
+        self.loaded = False
+
+    def invalidate_map(self, sender=None, instance: AddressAccountMap = None, **kwargs):
+        """
+        Signal handler for :class:`payments.models.AddressAccountMap` saves / deletes. Marks only the maps for the
+        instance's deposit address (and any address it was previously saved under) as stale, so they're re-loaded on
+        their next lookup, instead of re-loading the whole table.
+        """
+        if not self.loaded or instance is None:
+            return
+        with self._lock:
+            keys = {(instance.deposit_coin_id, instance.deposit_address)}
+            keys |= {k for k, maps in self.maps.items() if any(m.pk == instance.pk for m in maps)}
+            for k in keys:
+                self.maps.pop(k, None)
+            self.stale_maps |= keys
+
+    def _load_maps(self, coin: str, address: str):
+        """Re-loads the address maps for the deposit coin symbol ``coin`` and deposit address ``address``"""
+        with self._lock:
+            maps = list(AddressAccountMap.objects.filter(deposit_coin_id=coin, deposit_address=address).order_by('pk'))
+            for m in maps:
+                m.deposit_coin = self.coins.get(m.deposit_coin_id, m.deposit_coin)
+                m.destination_coin = self.coins.get(m.destination_coin_id, m.destination_coin)
+            if len(maps) > 0:
+                self.maps[(coin, address)] = maps
+            self.stale_maps.discard((coin, address))
+
+    def load(self):
+        """(Re-)load all coins, coin pairs, and address maps into memory"""
+        with self._lock:
+            coins = {c.symbol: c for c in Coin.objects.all()}
+            pairs = {}
+            for p in CoinPair.objects.all():
+                # Re-use the Coin objects loaded above, instead of querying them for every pair
+                p.from_coin, p.to_coin = coins[p.from_coin_id], coins[p.to_coin_id]
+                pairs[(p.from_coin_id, p.to_coin_id)] = p
+            maps = {}
+            for m in AddressAccountMap.objects.order_by('pk'):
+                m.deposit_coin, m.destination_coin = coins[m.deposit_coin_id], coins[m.destination_coin_id]
+                maps.setdefault((m.deposit_coin_id, m.deposit_address), []).append(m)
+            self.coins, self.pairs, self.maps = coins, pairs, maps
+            self.stale_maps = set()
+            self.loaded = True
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    def get_coin(self, symbol: str) -> Coin:
+        """Equivalent to ``Coin.objects.get(symbol=symbol)``"""
+        self._ensure_loaded()
+        if symbol not in self.coins:
+            raise Coin.DoesNotExist(f'Coin {symbol} does not exist')
+        return self.coins[symbol]
+
+    def get_pair(self, from_coin: str, to_coin: str) -> CoinPair:
+        """Equivalent to ``CoinPair.objects.get(from_coin=from_coin, to_coin=to_coin)`` (using coin symbols)"""
+        self._ensure_loaded()
+        if (from_coin, to_coin) not in self.pairs:
+            raise CoinPair.DoesNotExist(f'No coin pair exists for {from_coin} -> {to_coin}')
+        return self.pairs[(from_coin, to_coin)]
+
+    def has_pairs_from(self, from_coin: str) -> bool:
+        """Returns True if there are any coin pairs which convert from the coin symbol ``from_coin``"""
+        self._ensure_loaded()
+        return any(f == from_coin for f, _ in self.pairs.keys())
+
+    def find_map(self, coin: str, address: str, memo: str = None) -> Optional[AddressAccountMap]:
+        """
+        Returns the first :class:`payments.models.AddressAccountMap` for the deposit coin symbol ``coin`` and deposit
+        address ``address``, also matching the deposit memo ``memo`` if it isn't empty. Returns None if not found.
+        """
+        self._ensure_loaded()
+        if (coin, address) in self.stale_maps:
+            self._load_maps(coin, address)
+        for m in self.maps.get((coin, address), []):
+            if empty(memo) or m.deposit_memo == memo:
+                return m
+        return None
+
+
+routing = RoutingIndex()
+"""The shared :class:`.RoutingIndex` instance used by :class:`.ConvertCore` and :class:`.Command`"""
+
+for _model in [Coin, CoinPair]:
+    post_save.connect(routing.invalidate, sender=_model, dispatch_uid=f'routing_invalidate_save_{_model.__name__}')
+    post_delete.connect(routing.invalidate, sender=_model, dispatch_uid=f'routing_invalidate_del_{_model.__name__}')
+post_save.connect(routing.invalidate_map, sender=AddressAccountMap, dispatch_uid='routing_invalidate_save_map')
+post_delete.connect(routing.invalidate_map, sender=AddressAccountMap, dispatch_uid='routing_invalidate_del_map')
+
+
 class ConvertCore:
     """
     Various conversion logic is extracted to this class filled with static methods, so it can be used elsewhere
@@ -60,7 +271,7 @@ class ConvertCore:
     """
 
     @staticmethod
-    def validate_deposit(deposit: Deposit) -> Tuple[str, CoinPair, str]:
+    def validate_deposit(deposit: Deposit, converted: Set[int] = None) -> Tuple[str, CoinPair, str]:
         """
         Validates and identifies the destination CoinPair and account/address of a given Deposit.
 
@@ -68,6 +279,8 @@ class ConvertCore:
         the destination memo (if it has one, otherwise it will be blank or None).
 
         :param Deposit deposit: The Deposit object to validate and return destination details for
+        :param set converted:   (Optional) A pre-loaded set of Deposit IDs which already have a Conversion. If not
+                                specified, the database is queried for this deposit's conversion instead.
 
         :raises ConvertError: Raised when a serious error occurs that generally isn't the sender's fault.
         :raises ConvertInvalid: Raised when a Deposit fails validation, i.e. the sender ignored our instructions.
@@ -79,7 +292,8 @@ class ConvertCore:
         d = deposit
         # There's a OneToOne relation between a deposit and a conversion
         # If we try to insert a conversion when a deposit already has one, it'll throw an error...
-        if Conversion.objects.filter(deposit=d).count() > 0:
+        has_conversion = d.id in converted if converted is not None else Conversion.objects.filter(deposit=d).exists()
+        if has_conversion:
             log.warning('Error: A conversion already exists for deposit "%s". Aborting conversion.', d)
             raise ConvertError(
                 'A Conversion object already exists for this deposit. An admin should investigate the logs, '
@@ -87,7 +301,7 @@ class ConvertCore:
                 'conversion from the DB.'
             )
         # If you're not supposed to be able to convert from this coin, then we can't process it.
-        if d.coin.pairs_from.count() < 1:
+        if not routing.has_pairs_from(d.coin_id):
             raise ConvertInvalid('No coin pairs with from_coin = {}'.format(d.coin.symbol))
 
         memo = d.memo.strip() if d.memo is not None else None
@@ -102,16 +316,14 @@ class ConvertCore:
 
             symbol, address = (m[0].upper(), m[1])  # First item is dest symbol, second is address/account
             dest_memo = ' '.join(m[2:]) if len(m) >= 3 else ''  # 3+ items means there's a destination memo at the end
-            pair = CoinPair.objects.get(from_coin=d.coin, to_coin=Coin.objects.get(symbol=symbol))
+            pair = routing.get_pair(d.coin_id, routing.get_coin(symbol).symbol)
             return address, pair, dest_memo
         if not empty(d.address):
-            a_map = AddressAccountMap.objects.filter(deposit_coin=d.coin, deposit_address=d.address)
-            a_map = a_map.filter(deposit_memo=memo) if not empty(memo) else a_map
-            a_map = a_map.first()
+            a_map = routing.find_map(d.coin_id, d.address, memo)
             if a_map is None:
                 raise ConvertInvalid("Deposit address {} has no known coin destination mapped to it.".format(d.address))
 
-            pair = CoinPair.objects.get(from_coin=d.coin, to_coin=a_map.destination_coin)
+            pair = routing.get_pair(d.coin_id, a_map.destination_coin_id)
             address = a_map.destination_address
             dest_memo = a_map.destination_memo
             return address, pair, dest_memo
@@ -172,7 +384,57 @@ class ConvertCore:
         return d, txdata
 
     @staticmethod
-    def convert(deposit: Deposit, pair: CoinPair, address: str, dest_memo: str = None):
+    def retry_delay(attempts: int) -> timedelta:
+        """
+        Returns how long to wait before the next conversion attempt, after ``attempts`` consecutive failures.
+        The delay starts at ``settings.CONVERT_RETRY_DELAY``, and doubles each time up to ``settings.CONVERT_RETRY_MAX``
+
+        >>> ConvertCore.retry_delay(1), ConvertCore.retry_delay(3)
+        (datetime.timedelta(seconds=60), datetime.timedelta(seconds=240))
+
+        """
+        delay = settings.CONVERT_RETRY_DELAY * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=min(delay, settings.CONVERT_RETRY_MAX))
+
+    @staticmethod
+    def defer_deposit(deposit: Deposit):
+        """
+        Record a failed conversion attempt for ``deposit`` (e.g. not enough balance), and schedule it's next attempt
+        using :py:meth:`.retry_delay`. Saves the deposit.
+        """
+        now = timezone.now()
+        deposit.convert_attempts += 1
+        deposit.last_convert_attempt = now
+        deposit.next_convert_attempt = now + ConvertCore.retry_delay(deposit.convert_attempts)
+        log.info('Deposit %s failed conversion attempt #%d, next attempt after %s',
+                 deposit, deposit.convert_attempts, deposit.next_convert_attempt)
+        deposit.save()
+
+    @staticmethod
+    def defer_coin(coin: Coin):
+        """
+        Record a conversion failure for the destination coin ``coin`` (e.g. it's unhealthy). No deposits will be
+        sent with this coin until it's ``convert_retry_at``, which is scheduled using :py:meth:`.retry_delay`.
+
+        ``coin`` may be shared by the :class:`.RoutingIndex`, so it's left untouched. The failure count is incremented
+        in the database, and only the backoff columns are written.
+        """
+        q = Coin.objects.filter(symbol=coin.symbol)
+        with transaction.atomic():
+            q.update(convert_failures=F('convert_failures') + 1)
+            failures = q.values_list('convert_failures', flat=True).first() or 1
+            retry_at = timezone.now() + ConvertCore.retry_delay(failures)
+            q.update(convert_retry_at=retry_at)
+        log.warning('Pausing conversions to %s until %s (failure #%d)', coin, retry_at, failures)
+
+    @staticmethod
+    def reset_coin_failures(coin: Coin):
+        """Clears the backoff set by :py:meth:`.defer_coin` after a successful conversion, if there was one"""
+        Coin.objects.filter(Q(convert_failures__gt=0) | Q(convert_retry_at__isnull=False), symbol=coin.symbol) \
+            .update(convert_failures=0, convert_retry_at=None)
+
+    @staticmethod
+    def convert(deposit: Deposit, pair: CoinPair, address: str, dest_memo: str = None, budget: BalanceBudget = None):
         """
         After a Deposit has passed the validation checks of :py:meth:`.detect_deposit` , this method loads the
         appropriate coin handler, calculates fees, generates a memo, and sends the exchanged coins to
@@ -182,6 +444,8 @@ class ConvertCore:
         :param CoinPair pair:   A CoinPair object for getting the exchange rate + destination coin
         :param str address:     The destination crypto address, or account
         :param str dest_memo:   Optionally specify a memo for the coins to be sent with
+        :param BalanceBudget budget: (Optional) If specified, the deposit is only sent if it fits within the remaining
+                                     balance of the destination coin for this run
 
         :raises ConvertError:   Raised when a serious error occurs that generally isn't the sender's fault.
         :raises ConvertInvalid: Raised when a Deposit fails validation, i.e. the sender ignored our instructions.
@@ -207,10 +471,23 @@ class ConvertCore:
 
         send_amount, ex_fee = ConvertCore.amount_converted(deposit.amount, pair.exchange_rate, settings.EX_FEE)
 
+        if budget is not None and not budget.reserve(pair, mgr, send_amount):
+            log.warning('Not enough %s balance left this run to send %f. Will try again later...',
+                        dest_coin, send_amount)
+            ConvertCore.defer_deposit(deposit)
+            return None
+
         log.info('Attempting to send %f %s to address/account %s', send_amount, dest_coin, address)
         try:
-            if not mgr.health_test():
+            # Managers from privex.coin_handlers don't extend our BaseManager, so they don't have cached_health_test
+            healthy = mgr.cached_health_test() if isinstance(mgr, BaseManager) else mgr.health_test()
+            if not healthy:
                 log.warning("Coin %s health test has reported that it's down. Will try again later...", tcoin)
+                if budget is not None:
+                    budget.release(pair, send_amount)
+                # The whole coin is paused, rather than this deposit, so the other deposits for this coin don't
+                # each have to find out that it's down.
+                ConvertCore.defer_coin(tcoin)
                 deposit.last_convert_attempt = timezone.now()
                 deposit.save()
                 return None
@@ -224,6 +501,7 @@ class ConvertCore:
             else:
                 s = mgr.send(amount=send_amount, address=address, memo=dest_memo, trigger_data=metadata)
             log.info('Successfully sent %f %s to address/account %s', send_amount, dest_coin, address)
+            ConvertCore.reset_coin_failures(tcoin)
 
             deposit.status = 'conv'
             deposit.convert_to = tcoin
@@ -249,30 +527,45 @@ class ConvertCore:
             raise ConvertInvalid('Destination address "{}" appears to be invalid. Exc: AccountNotFound'.format(address))
         except NotEnoughBalance:
             log.error('Not enough balance to send %f %s. Will try again later...', send_amount, dest_coin)
+            if budget is not None:
+                # The shortfall is handled by Command.apply_shortfalls at the end of the run, instead of per deposit.
+                budget.exhaust(pair, send_amount)
+                ConvertCore.defer_deposit(deposit)
+                return None
             try:
-                deposit.last_convert_attempt = timezone.now()
-                deposit.save()
+                ConvertCore.defer_deposit(deposit)
                 ConvertCore.notify_low_bal(
                     pair=pair, send_amount=send_amount, balance=mgr.balance(), deposit_addr=mgr.get_deposit()[1]
                 )
             except:
                 log.exception('Failed to send ADMINS email notifications for low balance of coin %s', dest_coin)
             return None
+        except Exception:
+            if budget is not None:
+                budget.release(pair, send_amount)
+            # e.g. DeadAPIError - the coin may have gone down since it's health was last checked, so make sure
+            # it's health is re-checked before the next conversion attempt.
+            if isinstance(mgr, BaseManager):
+                mgr.invalidate_health()
+            # The coin's backoff is recorded by Command.process_mapped, as this deposit's transaction is rolled back
+            raise
 
     @staticmethod
     def notify_low_bal(pair: CoinPair, send_amount: Decimal, balance: Decimal, deposit_addr: str):
         """
         Send a "low hot wallet balance" notification email to the admins, with details of what caused the low
-        balance issue. Automatically updates the low balance fields on the ``pair.to_coin`` after sending.
+        balance issue. Automatically updates the low balance fields of the destination coin after sending.
 
-        Will only send the email if ``pair.to_coin.should_notify_low`` is True.
+        Will only send the email if ``should_notify_low`` is True for the destination coin. The coin is loaded fresh
+        from the database, as ``pair.to_coin`` may be a shared (and possibly stale) instance from the
+        :class:`.RoutingIndex`.
 
         :param pair: The coin pair object that triggered the low balance notification
         :param send_amount: The amount that we tried to send
         :param balance: The current balance of pair.to_coin
         :param deposit_addr: An address/account for admins to deposit for re-filling the hot wallet
         """
-        tcoin = pair.to_coin
+        tcoin = Coin.objects.get(symbol=pair.to_coin_id)
         log.debug('Checking if we should notify admins of low balance')
         if tcoin.should_notify_low:
             log.info('Sending emails to admins to let them know of %s low balance', tcoin.symbol)
@@ -289,9 +582,7 @@ class ConvertCore:
             mail_admins(subject, txt_body, html_message=html_body)
             log.info('Email sent successfully')
             log.debug('Setting funds_low to True, and updating last_notified')
-            tcoin.funds_low = True
-            tcoin.last_notified = timezone.now()
-            tcoin.save()
+            Coin.objects.filter(symbol=tcoin.symbol).update(funds_low=True, last_notified=timezone.now())
 
     @staticmethod
     def amount_converted(from_amount: Decimal, ex_rate: Decimal, fee_pct: Decimal = 0) -> Tuple[Decimal, Decimal]:
@@ -323,6 +614,10 @@ class Command(CronLoggerMixin, BaseCommand):
 
     def __init__(self):
         super(Command, self).__init__()
+        self.budget = None  # type: BalanceBudget
+        """The balance budget for the current run, see :class:`.BalanceBudget`"""
+        self.converted = None  # type: Set[int]
+        """IDs of ``new`` deposits which already have a Conversion, loaded by :py:meth:`.load_converted`"""
 
     def add_arguments(self, parser):
         # Named (optional) arguments
@@ -333,6 +628,8 @@ class Command(CronLoggerMixin, BaseCommand):
         )
 
         parser.add_argument('--coins', type=str, help='Comma separated list of symbols to run conversions for')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Send conversions for this many destination coins in parallel (default: 1)')
 
     def detect_deposit(self, deposit: Deposit):
         """
@@ -351,7 +648,7 @@ class Command(CronLoggerMixin, BaseCommand):
         try:
             log.debug('Validating deposit and getting dest details for deposit %s', d)
             # Validate the deposit, and grab the destination coin details
-            address, pair, dest_memo = ConvertCore.validate_deposit(d)
+            address, pair, dest_memo = ConvertCore.validate_deposit(d, converted=self.converted)
             # If no exception was thrown, we change the state to 'mapped' and save the destination details.
             log.debug('Deposit mapped to destination. pair: "%s", addr: "%s", memo: "%s"', pair, address, dest_memo)
             d.status = 'mapped'
@@ -381,7 +678,7 @@ class Command(CronLoggerMixin, BaseCommand):
         try:
             if empty(d.convert_to) or empty(d.convert_dest_address):
                 raise ConvertError('Deposit "convert_to" or "convert_dest_addr" is empty... Cannot convert!')
-            pair = CoinPair.objects.get(from_coin=d.coin, to_coin=d.convert_to)
+            pair = routing.get_pair(d.coin_id, d.convert_to_id)
             log.debug('Converting deposit ID %s from %s to %s, coin pair: %s', d.id, d.coin, d.convert_to, pair)
             # Convert() will send the coins, update the Deposit, and create the Conversion object in the DB,
             # as well as some additional validation such as balance checks.
@@ -390,103 +687,240 @@ class Command(CronLoggerMixin, BaseCommand):
                           f"dest_memo='{d.convert_dest_memo}')")
                 return True
             else:
-                return ConvertCore.convert(d, pair, d.convert_dest_address, dest_memo=d.convert_dest_memo)
+                return ConvertCore.convert(
+                    d, pair, d.convert_dest_address, dest_memo=d.convert_dest_memo, budget=self.budget
+                )
 
         except (CoinPair.DoesNotExist, Coin.DoesNotExist):
             raise ConvertInvalid('Deposit is for non-existent coin pair')
 
-    def handle(self, *args, **options):
-        # Load all "new" deposits, max of 200 in memory at a time to avoid memory leaks.
-        new_deposits = Deposit.objects.filter(status='new').iterator(200)
-        log.info('Coin converter and deposit validator started')
-        coins = None
-        if not empty(options['coins']):
-            coins = options['coins'].split(',')
-            log.info('Option --coins was specified. Only loading TXs for coins: %s', [str(c) for c in coins])
-        
-        # ----------------------------------------------------------------
-        # Validate deposits and map them to a destination coin / address
-        # ----------------------------------------------------------------
-        log.info('Validating deposits that are in state "new"')
-        for d in new_deposits:
-            try:
-                if coins is not None:
-                    if d.coin.symbol not in coins:
-                        log.debug('Skipping deposit %s as --coins was specified, and did not match.', d)
-                        continue
-                log.debug('Validating and mapping deposit %s', d)
-                with transaction.atomic():
+    def process_new(self, d: Deposit):
+        """
+        Validates and maps a single deposit in the ``new`` state using :py:meth:`.detect_deposit`, inside of
+        a DB transaction. Any errors are logged and stored onto the deposit, with it's status updated to ``err``
+        or ``inv`` (or refunded if ``auto_refund`` is enabled for the coin).
+
+        :param Deposit d: A :class:`payments.models.Deposit` in the ``new`` state
+        """
+        try:
+            log.debug('Validating and mapping deposit %s', d)
+            with transaction.atomic():
+                try:
+                    self.detect_deposit(d)
+                except ConvertError as e:
+                    # Something went very wrong while processing this deposit. Log the error, store the reason
+                    # onto the deposit, and then save it.
+                    log.error('ConvertError while validating deposit "%s" !!! Message: %s', d, str(e))
                     try:
-                        self.detect_deposit(d)
-                    except ConvertError as e:
-                        # Something went very wrong while processing this deposit. Log the error, store the reason
-                        # onto the deposit, and then save it.
-                        log.error('ConvertError while validating deposit "%s" !!! Message: %s', d, str(e))
-                        try:
-                            mgr = get_manager(d.coin.symbol) # type: SettingsMixin
-                            auto_refund = mgr.settings.get(d.coin.symbol, {}).get('auto_refund', False)
-                            if is_true(auto_refund):
-                                log.info(f'Auto refund is enabled for coin {d.coin}. Attempting return to sender.')
-                                ConvertCore.refund_sender(deposit=d)
-                            else:
-                                d.status = 'err'
-                                d.error_reason = str(e)
-                                d.save()
-                        except Exception as e:
-                            log.exception('An exception occurred while checking if auto_refund was enabled...')
+                        mgr = get_manager(d.coin.symbol) # type: SettingsMixin
+                        auto_refund = mgr.settings.get(d.coin.symbol, {}).get('auto_refund', False)
+                        if is_true(auto_refund):
+                            log.info(f'Auto refund is enabled for coin {d.coin}. Attempting return to sender.')
+                            ConvertCore.refund_sender(deposit=d)
+                        else:
                             d.status = 'err'
-                            d.error_reason = f'Auto refund failure: {str(e)}'
+                            d.error_reason = str(e)
                             d.save()
-                    except ConvertInvalid as e:
-                        # This exception usually means the sender didn't read the instructions properly, or simply
-                        # that the transaction wasn't intended to be exchanged.
-                        log.error('ConvertInvalid (user mistake) while validating deposit "%s" Message: %s', d, str(e))
-                        d.status = 'inv'
-                        d.error_reason = str(e)
+                    except Exception as e:
+                        log.exception('An exception occurred while checking if auto_refund was enabled...')
+                        d.status = 'err'
+                        d.error_reason = f'Auto refund failure: {str(e)}'
                         d.save()
-            except:
-                log.exception('UNHANDLED EXCEPTION. Deposit could not be validated/detected... %s', d)
-                d.status = 'err'
-                d.error_reason = 'Unknown error while validating deposit. An admin must manually check the error logs.'
-                d.save()
-        log.info('Finished validating new deposits for conversion')
+                except ConvertInvalid as e:
+                    # This exception usually means the sender didn't read the instructions properly, or simply
+                    # that the transaction wasn't intended to be exchanged.
+                    log.error('ConvertInvalid (user mistake) while validating deposit "%s" Message: %s', d, str(e))
+                    d.status = 'inv'
+                    d.error_reason = str(e)
+                    d.save()
+        except:
+            log.exception('UNHANDLED EXCEPTION. Deposit could not be validated/detected... %s', d)
+            d.status = 'err'
+            d.error_reason = 'Unknown error while validating deposit. An admin must manually check the error logs.'
+            d.save()
 
-        # ----------------------------------------------------------------
-        # Convert any validated deposits into their destination coin
-        # ----------------------------------------------------------------
-        conv_deposits = Deposit.objects.filter(status='mapped').iterator(200)
-        log.info('Converting deposits that are in state "mapped"...')
-        for d in conv_deposits:
+    def process_mapped(self, d: Deposit, dry=False):
+        """
+        Converts a single deposit in the ``mapped`` state using :py:meth:`.convert_deposit`, inside of a DB
+        transaction. Any errors are logged and stored onto the deposit, with it's status updated to ``err`` or ``inv``.
+
+        :param Deposit d: A :class:`payments.models.Deposit` in the ``mapped`` state
+        :param bool dry:  If True, don't actually send any coins, just log what would happen
+        """
+        try:
+            log.debug('Converting deposit %s', d)
+            with transaction.atomic():
+                try:
+                    self.convert_deposit(d, dry)
+                except ConvertError as e:
+                    # Something went very wrong while processing this deposit. Log the error, store the reason
+                    # onto the deposit, and then save it.
+                    log.error('ConvertError while converting deposit "%s" !!! Message: %s', d, str(e))
+                    d.status = 'err'
+                    d.error_reason = str(e)
+                    d.save()
+                except ConvertInvalid as e:
+                    # This exception usually means the sender didn't read the instructions properly, or simply
+                    # that the transaction wasn't intended to be exchanged.
+                    log.error('ConvertInvalid (user mistake) while converting deposit "%s" Message: %s', d, str(e))
+                    d.status = 'inv'
+                    d.error_reason = str(e)
+                    d.save()
+        except:
+            log.exception('UNHANDLED EXCEPTION. Conversion error for deposit... %s', d)
+            d.status = 'err'
+            d.error_reason = 'Unknown error while converting. An admin must manually check the error logs.'
+            d.save()
+            # Unhandled errors are usually the destination coin failing to send (e.g. DeadAPIError), so pause the
+            # coin. This must happen here, after the deposit's transaction has been rolled back, or it would be lost.
+            if d.convert_to_id is not None:
+                ConvertCore.defer_coin(d.convert_to)
+
+    @staticmethod
+    def new_deposits(coins: List[str] = None) -> QuerySet:
+        """
+        Returns a QuerySet of deposits in the ``new`` state, optionally only for the coin symbols in ``coins``.
+
+        The ``--coins`` filter is applied by the database (using the ``(status, coin)`` index), rather than loading
+        every new deposit and skipping the ones we don't want.
+        """
+        q = Deposit.objects.filter(status='new')
+        return q if coins is None else q.filter(coin__in=coins)
+
+    @staticmethod
+    def mapped_deposits() -> QuerySet:
+        """
+        Returns a QuerySet of deposits in the ``mapped`` state which are due for a conversion attempt, i.e. the deposit
+        isn't waiting for it's ``next_convert_attempt``, and it's destination coin isn't paused (``convert_retry_at``).
+        See :py:meth:`.ConvertCore.defer_deposit` and :py:meth:`.ConvertCore.defer_coin`.
+        """
+        now = timezone.now()
+        return Deposit.objects.filter(
+            Q(next_convert_attempt__isnull=True) | Q(next_convert_attempt__lte=now), status='mapped'
+        ).exclude(convert_to__convert_retry_at__gt=now)
+
+    @staticmethod
+    def is_due(d: Deposit) -> bool:
+        """
+        Returns True if the ``mapped`` deposit ``d`` is due for a conversion attempt, using the same rules as
+        :py:meth:`.mapped_deposits`. The destination coin is loaded fresh from the DB, so a coin which was paused
+        part way through a queue is respected.
+        """
+        now = timezone.now()
+        if d.next_convert_attempt is not None and d.next_convert_attempt > now:
+            return False
+        coin = d.convert_to
+        return coin is None or coin.convert_retry_at is None or coin.convert_retry_at <= now
+
+    def mapped_queues(self) -> Dict[str, List[int]]:
+        """
+        Returns the IDs of all deposits in the ``mapped`` state which are due for a conversion attempt, grouped by
+        their destination coin (``convert_to``), oldest deposit first.
+
+        :return dict queues: A dict mapping destination coin symbols to a list of deposit IDs
+        """
+        queues = {}
+        for dep_id, coin in self.mapped_deposits().order_by('id').values_list('id', 'convert_to'):
+            queues.setdefault(coin, []).append(dep_id)
+        return queues
+
+    def convert_queue(self, deposit_ids: List[int], dry=False):
+        """
+        Converts the ``mapped`` deposits in ``deposit_ids`` one by one, in order.
+
+        Each deposit is converted in it's own DB transaction, and the deposit row is locked with ``SELECT FOR UPDATE``
+        (skipping rows already locked by another worker / process where supported, see :py:meth:`.locked_deposits`).
+        The status is re-checked after locking, so a deposit can never be sent twice. Deposits which aren't due for a
+        retry yet (including all deposits for a coin which was paused part way through the queue) are skipped.
+
+        :param list deposit_ids: A list of :class:`payments.models.Deposit` IDs to convert
+        :param bool dry:         If True, don't actually send any coins, just log what would happen
+        """
+        for dep_id in deposit_ids:
+            with transaction.atomic():
+                d = self.locked_deposits().filter(id=dep_id, status='mapped').first()
+                if d is None:
+                    log.debug('Deposit ID %s is locked by another worker, or no longer mapped. Skipping.', dep_id)
+                    continue
+                if not self.is_due(d):
+                    log.debug('Deposit %s (or it\'s destination coin) is waiting to be retried. Skipping.', d)
+                    continue
+                self.process_mapped(d, dry)
+
+    @staticmethod
+    def locked_deposits() -> QuerySet:
+        """
+        Returns a Deposit QuerySet which locks the selected rows with ``SELECT FOR UPDATE``, skipping rows which are
+        already locked by another worker if the database supports ``SKIP LOCKED`` (PostgreSQL, MySQL 8.0.1+).
+
+        Older MySQL / MariaDB versions don't support ``SKIP LOCKED``, so a plain ``FOR UPDATE`` is used instead, which
+        waits for the other worker to finish with the row (the status re-check then skips it).
+        """
+        if connection.features.has_select_for_update_skip_locked:
+            return Deposit.objects.select_for_update(skip_locked=True)
+        return Deposit.objects.select_for_update()
+
+    def _convert_worker(self, deposit_ids: List[int], dry=False):
+        """Runs :py:meth:`.convert_queue` in a worker thread, with it's own database connection"""
+        close_old_connections()
+        try:
+            self.convert_queue(deposit_ids, dry)
+        finally:
+            connection.close()
+
+    def apply_shortfalls(self):
+        """
+        Updates ``funds_low`` (and notifies the admins, if enabled) for each destination coin which didn't have enough
+        balance to send all of it's deposits during this run, based on the shortfall computed by ``self.budget``
+        """
+        if self.budget is None:
+            return
+        for sym, shortfall in self.budget.shortfall.items():
+            pair = self.budget.pairs[sym]
+            tcoin = Coin.objects.get(symbol=sym)
+            log.warning('Coin %s is short by %f to convert all deposits this run', sym, shortfall)
             try:
-                log.debug('Converting deposit %s', d)
-                with transaction.atomic():
-                    try:
-                        self.convert_deposit(d, options['dry'])
-                    except ConvertError as e:
-                        # Something went very wrong while processing this deposit. Log the error, store the reason
-                        # onto the deposit, and then save it.
-                        log.error('ConvertError while converting deposit "%s" !!! Message: %s', d, str(e))
-                        d.status = 'err'
-                        d.error_reason = str(e)
-                        d.save()
-                    except ConvertInvalid as e:
-                        # This exception usually means the sender didn't read the instructions properly, or simply
-                        # that the transaction wasn't intended to be exchanged.
-                        log.error('ConvertInvalid (user mistake) while converting deposit "%s" Message: %s', d, str(e))
-                        d.status = 'inv'
-                        d.error_reason = str(e)
-                        d.save()
-            except:
-                log.exception('UNHANDLED EXCEPTION. Conversion error for deposit... %s', d)
-                d.status = 'err'
-                d.error_reason = 'Unknown error while converting. An admin must manually check the error logs.'
-                d.save()
-        log.info('Finished converting deposits.')
+                if tcoin.should_notify_low:
+                    mgr = get_manager(sym)
+                    ConvertCore.notify_low_bal(
+                        pair=pair, send_amount=shortfall, balance=mgr.balance(), deposit_addr=mgr.get_deposit()[1]
+                    )
+                elif not tcoin.funds_low:
+                    Coin.objects.filter(symbol=sym).update(funds_low=True)
+            except Exception:
+                log.exception('Failed to update low balance status / notify admins for coin %s', sym)
+
+    def load_converted(self):
+        """
+        Loads the IDs of all ``new`` deposits which already have a :class:`payments.models.Conversion` into
+        ``self.converted`` using a single query, so :py:meth:`.ConvertCore.validate_deposit` doesn't need to
+        query for each deposit.
+        """
+        self.converted = set(
+            Conversion.objects.filter(deposit__status='new').values_list('deposit_id', flat=True)
+        )
+
+    @staticmethod
+    def mapped_counts() -> Dict[str, int]:
+        """
+        Returns the number of deposits in the ``mapped`` state for each destination coin, using a single
+        grouped query.
 
+        >>> Command.mapped_counts()
+        {'STEEM': 3, 'BTC': 1}
+
+        :return dict counts: A dict mapping each destination coin symbol to it's amount of ``mapped`` deposits
+        """
+        q = Deposit.objects.filter(status='mapped').values('convert_to').annotate(total=Count('id'))
+        return {row['convert_to']: row['total'] for row in q}
+
+    def reset_funds_low(self):
+        """Resets ``funds_low`` to False on any :class:`payments.models.Coin` that no longer has "mapped" deposits"""
         log.debug('Resetting any Coins "funds_low" if they have no "mapped" deposits')
+        counts = self.mapped_counts()
         for c in Coin.objects.filter(funds_low=True):
             log.debug(' -> Coin %s currently has low funds', c)
-            map_deps = c.deposit_converts.filter(status='mapped').count()
+            map_deps = counts.get(c.symbol, 0)
             if map_deps == 0:
                 log.debug(' +++ Coin %s has no mapped deposits, resetting funds_low to false', c)
                 c.funds_low = False
@@ -495,7 +929,47 @@ class Command(CronLoggerMixin, BaseCommand):
                 log.debug(' !!! Coin %s still has %d mapped deposits. Ignoring.', c, map_deps)
         log.debug('Finished resetting coins with "funds_low" that have been resolved.')
 
+    def handle(self, *args, **options):
+        # Make sure we're using the latest coins / pairs / address maps for this run
+        routing.invalidate()
+        self.load_converted()
+        log.info('Coin converter and deposit validator started')
+        coins = None
+        if not empty(options['coins']):
+            coins = options['coins'].split(',')
+            log.info('Option --coins was specified. Only loading TXs for coins: %s', [str(c) for c in coins])
 
+        # ----------------------------------------------------------------
+        # Validate deposits and map them to a destination coin / address
+        # ----------------------------------------------------------------
+        log.info('Validating deposits that are in state "new"')
+        # Load all "new" deposits, max of 200 in memory at a time to avoid memory leaks.
+        for d in self.new_deposits(coins).iterator(200):
+            self.process_new(d)
+        log.info('Finished validating new deposits for conversion')
 
+        # ----------------------------------------------------------------
+        # Convert any validated deposits into their destination coin
+        # ----------------------------------------------------------------
+        log.info('Converting deposits that are in state "mapped"...')
+        self.budget = BalanceBudget()
+        queues = self.mapped_queues()
+        workers = int(options['workers'])
+        if workers <= 1:
+            for ids in queues.values():
+                self.convert_queue(ids, options['dry'])
+        else:
+            # Each destination coin is handled by one worker, so sends from the same hot wallet stay in order,
+            # while sends to different coins happen in parallel.
+            log.info('Converting deposits for %d destination coins using %d worker threads', len(queues), workers)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(self._convert_worker, ids, options['dry']): c for c, ids in queues.items()}
+                for f in as_completed(futures):
+                    try:
+                        f.result()
+                    except Exception:
+                        log.exception('Unhandled error in conversion worker for destination coin %s', futures[f])
+        log.info('Finished converting deposits.')
+        self.apply_shortfalls()
 
-
+        self.reset_funds_low()
@@ -1,11 +1,17 @@
 import logging
+import time
+from queue import Empty, Queue
+from threading import Thread
+from typing import Dict, List, Set, Tuple
 
 from django.core.management import BaseCommand
 from django.core.management.base import CommandParser
-from django.db import transaction
+from django.db import transaction, connection, close_old_connections
 
+from payments import coin_handlers
 from payments.coin_handlers import get_loaders, has_loader
 from payments.coin_handlers.base import BaseLoader
+from payments.coin_handlers.base.TxIndex import tx_index
 from payments.management import CronLoggerMixin
 from payments.models import Coin, Deposit
 from steemengine.helpers import empty
@@ -28,6 +34,11 @@ from steemengine.helpers import empty
 log = logging.getLogger(__name__)
 
 
+class LoadTimeout(Exception):
+    """Raised by :meth:`.Command.load_txs` when loading a coin's transactions took longer than ``--timeout``"""
+    pass
+
+
 class Command(CronLoggerMixin, BaseCommand):
     # Amount of coin transactions to save per DB transaction
     BATCH = 100
@@ -36,62 +47,248 @@ class Command(CronLoggerMixin, BaseCommand):
     def __init__(self):
         super(Command, self).__init__()
         self.coins = Coin.objects.filter(enabled=True)
+        self.coin_map = {}
+        self.running = set()   # type: Set[str]
+        """Symbols of coins which a worker thread from :meth:`.load_parallel` is still loading (even if abandoned)"""
+
+    def load_txs(self, symbol, deadline: float = None) -> int:
+        """
+        Loads and imports transactions for ``symbol`` using each of it's loaders.
 
-    def load_txs(self, symbol):
+        :param str symbol:     The symbol of the coin to load transactions for
+        :param float deadline: (Optional) A ``time.time()`` timestamp. If the import is still running after this time,
+                               it's aborted at the end of the current batch by raising :class:`LoadTimeout`
+        :raises LoadTimeout:   When ``deadline`` has passed before all transactions were imported
+        :return int:           The amount of new deposits that were stored
+        """
         log.info('Loading transactions for %s...', symbol)
         log.debug('%s has loader? %s', symbol, has_loader(symbol))
         if not has_loader(symbol):
             log.warning('Coin %s is enabled, but no Coin Handler has a loader setup for it. Skipping.', symbol)
-            return
+            return 0
         loaders = get_loaders(symbol)
+        stats = dict(saved=0, failed=set())
         for l in loaders:   # type: BaseLoader
             log.debug('Scanning using loader %s', type(l))
             finished = False
             l.load()
             txs = l.list_txs(self.BATCH)
             while not finished:
+                if deadline is not None and time.time() > deadline:
+                    raise LoadTimeout(f'Timed out while loading transactions for {symbol} using {type(l).__name__}')
                 log.debug('Loading batch of %s TXs for DB insert', self.BATCH)
                 with transaction.atomic():
-                    finished = self.import_batch(txs, self.BATCH)
+                    finished = self.import_batch(txs, self.BATCH, stats=stats)
+            # All TXs from this loader have been imported, so it's now safe to move the scan checkpoints forward,
+            # except for coins with TXs which failed to import - those are re-scanned from their old checkpoint.
+            l.save_checkpoints(skip=stats['failed'])
+        return stats['saved']
 
-    def import_batch(self, txs: iter, batch: int) -> bool:
+    def _load_worker(self, symbol, timeout: float = None) -> int:
+        """
+        Runs :meth:`.load_txs` for ``symbol`` inside of a worker thread, making sure the thread uses
+        a fresh database connection, and closes it once it's finished.
+        """
+        close_old_connections()
+        self.running.add(symbol)
+        try:
+            deadline = None if empty(timeout) else time.time() + timeout
+            return self.load_txs(symbol, deadline=deadline)
+        finally:
+            self.running.discard(symbol)
+            connection.close()
+
+    def import_batch(self, txs: iter, batch: int, stats: dict = None) -> bool:
         """
         Inserts up to `batch` amount of transactions from `txs` into the Deposit table per run
         Returns a boolean to determine if there are no more transactions to be loaded
 
+        Transactions are buffered, de-duplicated against existing deposits using a single ``IN`` query on
+        their ``(txid, coin, vout)`` keys, and then inserted using one ``bulk_create``. If the bulk insert fails
+        (e.g. a row fails validation, or a concurrent loader inserted the same TX), we fall back to saving
+        each new row individually so that one bad TX doesn't prevent the rest of the batch from being stored.
+
         :param txs:   A generator of transactions to import into Deposit()
         :param batch: Amount of transactions to import from the generator
+        :param stats: (Optional) A dict, the amount of deposits stored will be added to it's ``saved`` key, and the
+                      symbols of coins with TXs which couldn't be stored to the set in it's ``failed`` key
         :return bool: True if there are no more transactions to load
         :return bool: False if there may be more transactions to be loaded
         """
-        i = 0
         # var `tx` should be in this format:
         # May contain either (from_account, to_account, memo) or (address,)
         # {txid:str, coin:str (symbol), vout:int, tx_timestamp:datetime, address:str,
         #                 from_account:str, to_account:str, memo:str, amount:Decimal}
+        pending = []
+        failed = None if stats is None else stats.setdefault('failed', set())
+        i = 0
         for tx in txs:
+            i += 1
             try:
                 tx = dict(tx)
-                dupes = Deposit.objects.filter(txid=tx['txid']).count()
-                if dupes > 0:
-                    log.debug('Skipping TX %s as it already exists', tx['txid'])
-                    continue
-                log.debug('Storing TX %s', tx['txid'])
-                log.debug(f"From: '{tx.get('from_account', 'n/a')}' - Amount: {tx['amount']} {tx['coin']}")
-                log.debug(f"Memo: '{tx.get('memo', '--NO MEMO--')}' - Time: {tx['tx_timestamp']}")
-                tx['coin'] = Coin.objects.get(symbol=tx['coin'])
-                with transaction.atomic():
-                    Deposit(**tx).save()
+                tx['coin'] = self.get_coin(tx['coin'])
+                tx['vout'] = int(tx.get('vout', 0))
+                pending.append(tx)
             except:
-                log.exception('Error saving TX %s for coin %s, will skip.', tx['txid'], tx['coin'])
-            finally:
-                i += 1
-                if i >= batch:
-                    return False
+                log.exception('Error preparing TX %s for coin %s, will skip.', tx.get('txid'), tx.get('coin'))
+                if failed is not None:
+                    coin = tx.get('coin')
+                    failed.add(coin.symbol if isinstance(coin, Coin) else str(coin))
+            if i >= batch:
+                break
+
+        saved = self.save_deposits(pending, failed=failed)
+        if stats is not None:
+            stats['saved'] = stats.get('saved', 0) + saved
         return i < batch
 
+    def get_coin(self, symbol) -> Coin:
+        """
+        Returns the :class:`models.Coin` for ``symbol`` from an in-memory map, only querying the database the
+        first time a symbol is seen during this run.
+
+        :param symbol: The symbol of the coin, e.g. ``STEEM`` (a :class:`models.Coin` instance is returned as-is)
+        :raises Coin.DoesNotExist: When the symbol does not exist in the database
+        :return Coin: The Coin object matching ``symbol``
+        """
+        if isinstance(symbol, Coin):
+            return symbol
+        if symbol not in self.coin_map:
+            self.coin_map[symbol] = Coin.objects.get(symbol=symbol)
+        return self.coin_map[symbol]
+
+    def save_deposits(self, txs: List[dict], failed: Set[str] = None) -> int:
+        """
+        Bulk inserts a list of cleaned transaction dict's (with ``coin`` already resolved to a :class:`models.Coin`)
+        into the Deposit table, skipping any which already exist.
+
+        Existing deposits are found using the shared :class:`.KnownTxIndex`, which only queries the database for
+        transactions it hasn't seen before. Newly stored deposits are added to the index.
+
+        :param txs:    A list of transaction dict's, as prepared by :py:meth:`.import_batch`
+        :param failed: (Optional) The symbol of each coin with a transaction which couldn't be stored is added to this
+        :return int: The amount of new deposits which were stored
+        """
+        if len(txs) == 0:
+            return 0
+        by_coin = {}   # type: Dict[str, Set[tuple]]
+        for tx in txs:
+            by_coin.setdefault(tx['coin'].symbol, set()).add((tx['txid'], tx['vout']))
+        known = set(
+            (txid, symbol, vout) for symbol, keys in by_coin.items() for txid, vout in tx_index.known(symbol, keys)
+        )
+        new_deps = []
+        for tx in txs:
+            key = (tx['txid'], tx['coin'].symbol, tx['vout'])
+            if key in known:
+                log.debug('Skipping TX %s as it already exists', tx['txid'])
+                continue
+            known.add(key)
+            log.debug('Storing TX %s', tx['txid'])
+            log.debug(f"From: '{tx.get('from_account', 'n/a')}' - Amount: {tx['amount']} {tx['coin']}")
+            log.debug(f"Memo: '{tx.get('memo', '--NO MEMO--')}' - Time: {tx['tx_timestamp']}")
+            new_deps.append(Deposit(**tx))
+
+        if len(new_deps) == 0:
+            return 0
+        try:
+            with transaction.atomic():
+                Deposit.objects.bulk_create(new_deps)
+            self._index_deposits(new_deps)
+            return len(new_deps)
+        except:
+            log.warning('Bulk insert of %d deposits failed, falling back to saving individually.', len(new_deps))
+
+        saved = 0
+        for d in new_deps:
+            try:
+                with transaction.atomic():
+                    d.pk = None
+                    d.save()
+                saved += 1
+                self._index_deposits([d])
+            except:
+                log.exception('Error saving TX %s for coin %s, will skip.', d.txid, d.coin)
+                if failed is not None:
+                    failed.add(d.coin.symbol)
+        return saved
+
+    def load_parallel(self, symbols: List[str], workers: int, timeout: float = None) -> Tuple[dict, dict]:
+        """
+        Runs :meth:`.load_txs` for each coin in ``symbols`` using ``workers`` threads.
+
+        The ``timeout`` passed to each coin is cooperative (checked between batches), so a coin whose RPC call never
+        returns would never time out. Coins which are still running ``timeout`` seconds after they started are
+        reported as timed out and abandoned, and a replacement thread picks up the remaining coins. The threads are
+        daemon threads, so an abandoned thread can't keep the process alive once the command has finished. Their
+        scan checkpoints are never saved, so the next run resumes from the previous checkpoint.
+
+        :param list symbols:  The coin symbols to load transactions for
+        :param int workers:   The maximum amount of coins to load at once
+        :param float timeout: (Optional) Abandon a coin if it's still loading after this many seconds
+        :return tuple:        ``(results, errors)`` - dicts mapping symbols to the amount of deposits stored, and to
+                              an error message
+        """
+        jobs, done = Queue(), Queue()
+        for s in symbols:
+            jobs.put(s)
+        started = {}   # type: Dict[str, float]
+
+        def worker():
+            while True:
+                try:
+                    sym = jobs.get_nowait()
+                except Empty:
+                    return
+                started[sym] = time.time()
+                try:
+                    done.put((sym, self._load_worker(sym, timeout), None))
+                except Exception as e:
+                    log.exception('Error loading transactions for coin %s.', sym)
+                    done.put((sym, None, f'{type(e).__name__}: {str(e)}'))
+
+        def start_worker():
+            Thread(target=worker, name='load-txs-worker', daemon=True).start()
+
+        for _ in range(min(max(1, workers), len(symbols))):
+            start_worker()
+
+        results, errors, remaining = {}, {}, set(symbols)
+        while len(remaining) > 0:
+            try:
+                sym, saved, err = done.get(timeout=0.5)
+                if sym in remaining:
+                    remaining.discard(sym)
+                    if err is None:
+                        results[sym] = saved
+                    else:
+                        errors[sym] = err
+            except Empty:
+                pass
+            if empty(timeout):
+                continue
+            for sym in list(remaining):
+                if sym in started and time.time() - started[sym] > timeout:
+                    log.error('Coin %s is still loading after %d seconds, abandoning it.', sym, timeout)
+                    errors[sym] = f'LoadTimeout: Still loading after {timeout} seconds (abandoned)'
+                    remaining.discard(sym)
+                    if not jobs.empty():
+                        start_worker()
+        return results, errors
+
+    @staticmethod
+    def _index_deposits(deposits: List[Deposit]):
+        """Adds newly stored deposits to the shared known TX index"""
+        for d in deposits:
+            tx_index.add(d.coin_id, [(d.txid, d.vout)])
+
     def add_arguments(self, parser: CommandParser):
         parser.add_argument('--coins', type=str, help='Comma separated list of symbols to load TXs for')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Load TXs for this many coins in parallel, using a pool of threads (default: 1)')
+        parser.add_argument('--timeout', type=int, default=None,
+                            help='Abandon loading a coin if it takes longer than this many seconds. It resumes '
+                                 'from it\'s previous checkpoint on the next run (default: no limit)')
 
     def handle(self, *args, **options):
         coins = self.coins
@@ -100,9 +297,30 @@ class Command(CronLoggerMixin, BaseCommand):
             coins = self.coins.filter(symbol__in=[c.upper() for c in options['coins'].split(',')])
             log.info('Option --coins was specified. Only loading TXs for coins: %s', [str(c) for c in coins])
 
-        for c in coins:
-            try:
-                self.load_txs(c.symbol)
-            except:
-                log.exception('Error loading transactions for coin %s. Moving onto the next coin.', c)
+        workers, timeout = int(options['workers']), options['timeout']
+        # (symbol -> amount of deposits stored) and (symbol -> error message) for the end of run report
+        results, errors = {}, {}
+
+        if workers <= 1 and empty(timeout):
+            for c in coins:
+                try:
+                    results[c.symbol] = self.load_txs(c.symbol)
+                except Exception as e:
+                    log.exception('Error loading transactions for coin %s. Moving onto the next coin.', c)
+                    errors[c.symbol] = f'{type(e).__name__}: {str(e)}'
+        else:
+            # Coins are loaded in threads whenever there's a timeout, so a coin which hangs on an RPC call can be
+            # abandoned. Initialise the coin handlers before starting any threads, so they don't race to load them.
+            if not coin_handlers.handlers_loaded:
+                coin_handlers.reload_handlers()
+            symbols = [c.symbol for c in coins]
+            log.info('Loading TXs for %d coins using %d worker threads', len(symbols), max(1, workers))
+            results, errors = self.load_parallel(symbols, workers, timeout)
+
+        log.info('Finished loading transactions. Stored %d new deposits for %d coins. %d coins had errors.',
+                 sum(results.values()), len(results), len(errors))
+        for sym, saved in results.items():
+            log.info(' - %s: %d new deposits', sym, saved)
+        for sym, err in errors.items():
+            log.error(' - %s failed: %s', sym, err)
 
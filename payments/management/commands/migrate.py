@@ -0,0 +1,38 @@
+"""
+Copyright::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+"""
+from django.core.management.commands.migrate import Command as MigrateCommand
+
+from payments import coin_handlers
+
+
+class Command(MigrateCommand):
+    """
+    Django's ``migrate`` command, with the coin handlers disabled while it runs.
+
+    While migrations are being applied, the database may be half migrated, so the handlers must not be loaded
+    (e.g. by a data migration saving a :class:`payments.models.Coin`), and the memoized result of
+    :py:func:`payments.coin_handlers.is_database_synchronized` can't be trusted. Once finished, the memo is cleared
+    so the next check sees the new migration state.
+    """
+
+    def handle(self, *args, **options):
+        coin_handlers.migrating = True
+        try:
+            return super(Command, self).handle(*args, **options)
+        finally:
+            coin_handlers.migrating = False
+            coin_handlers.clear_sync_cache()
@@ -0,0 +1,89 @@
+"""
+Copyright::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+"""
+import logging
+import signal
+import time
+from threading import Event
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import close_old_connections
+
+from payments.coin_handlers.base.HealthMonitor import HealthMonitor
+from payments.management import CronLoggerMixin
+
+log = logging.getLogger(__name__)
+
+
+class Command(CronLoggerMixin, BaseCommand):
+    """
+    Keeps the coin health snapshot used by the admin Coin Health page (and it's JSON endpoint) up to date, so that
+    loading the page never has to wait for RPC calls.
+
+    Every ``--interval`` seconds, the health of all coins is checked concurrently (see :class:`.HealthMonitor`) and
+    stored in the Django cache. Use ``--once`` to refresh the snapshot a single time, e.g. from cron.
+
+    The refresher finishes it's current refresh and exits cleanly on SIGINT / SIGTERM.
+    """
+
+    help = 'Refreshes the coin health snapshot shown on the admin Coin Health page'
+
+    def __init__(self):
+        super(Command, self).__init__()
+        self._stop = Event()
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--interval', type=int, default=settings.HEALTH_REFRESH_INTERVAL,
+                            help='Seconds between each refresh of the health snapshot')
+        parser.add_argument('--timeout', type=float, default=settings.HEALTH_TIMEOUT,
+                            help='Seconds to wait for each coin before reporting it as timed out')
+        parser.add_argument('--workers', type=int, default=settings.HEALTH_WORKERS,
+                            help='Maximum amount of coins to check at the same time')
+        parser.add_argument('--once', action='store_true', help='Refresh the snapshot once, then exit')
+
+    def stop(self, signum=None, frame=None):
+        """Signal handler - asks the main loop to exit after the current refresh has finished"""
+        log.info('Received signal %s - refresh_health will shut down after the current refresh.', signum)
+        self._stop.set()
+
+    def handle(self, *args, **options):
+        monitor = HealthMonitor(timeout=options['timeout'], workers=options['workers'])
+        if options['once']:
+            snap = monitor.refresh()
+            log.info('Refreshed health of %d coins in %.2f seconds (%d failed)',
+                     len(snap['coins']), snap['duration'], len(snap['fails']))
+            return
+
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        interval = int(options['interval'])
+        log.info('refresh_health started (interval: %ds, timeout: %.0fs)', interval, monitor.timeout)
+        while not self._stop.is_set():
+            # Long running processes must not hold onto connections which the DB server may have closed.
+            close_old_connections()
+            started = time.time()
+            try:
+                snap = monitor.refresh()
+                log.debug('Refreshed health of %d coins in %.2f seconds (%d failed)',
+                          len(snap['coins']), snap['duration'], len(snap['fails']))
+            except Exception:
+                log.exception('Error while refreshing coin health')
+            # Wait until the next refresh is due, waking up early on shutdown.
+            self._stop.wait(timeout=max(interval - (time.time() - started), 1))
+
+        log.info('refresh_health has shut down cleanly.')
@@ -0,0 +1,222 @@
+"""
+Copyright::
+
+        +===================================================+
+        |                 © 2019 Privex Inc.                |
+        |               https://www.privex.io               |
+        +===================================================+
+        |                                                   |
+        |        CryptoToken Converter                      |
+        |                                                   |
+        |        Core Developer(s):                         |
+        |                                                   |
+        |          (+)  Chris (@someguy123) [Privex]        |
+        |                                                   |
+        +===================================================+
+"""
+import json
+import logging
+import os
+import signal
+import time
+from datetime import datetime
+from threading import Event
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import close_old_connections
+
+from payments import coin_handlers
+from payments.management import CronLoggerMixin
+from payments.management.commands import load_txs, convert_coins
+from payments.models import Coin
+from steemengine.helpers import empty
+
+log = logging.getLogger(__name__)
+
+
+class Command(CronLoggerMixin, BaseCommand):
+    """
+    A long running alternative to running ``load_txs`` and ``convert_coins`` from cron.
+
+    The loaders and managers from the coin handler registry stay loaded between iterations, each coin is polled
+    for new transactions on it's own schedule, and any new deposits are validated and converted straight away,
+    instead of waiting for the next ``convert_coins`` cron.
+
+    If a coin's loader fails, the delay before the next poll of that coin is doubled each time (up to
+    ``settings.CONVERTER_MAX_BACKOFF``), so a dead RPC node doesn't slow down the other coins. A coin which is still
+    loading after ``settings.CONVERTER_LOAD_TIMEOUT`` seconds (e.g. stuck on an RPC call) is abandoned and counted as
+    a failure, using the same per-coin deadline as ``load_txs --timeout``.
+
+    The daemon finishes it's current coin and exits cleanly on SIGINT / SIGTERM.
+    """
+
+    help = 'Runs the transaction loader and coin converter continuously as a daemon'
+
+    def __init__(self):
+        super(Command, self).__init__()
+        self.loader = load_txs.Command()
+        self.converter = convert_coins.Command()
+        self._stop = Event()
+        self.iteration = 0
+        self.last_sweep = 0.0
+        # symbol -> dict(next_poll:float, failures:int, last_poll:float, last_error:str, deposits:int)
+        self.coin_state = {}   # type: Dict[str, dict]
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument('--coins', type=str, help='Comma separated list of symbols to load and convert')
+        parser.add_argument('--interval', type=int, default=settings.CONVERTER_POLL_INTERVAL,
+                            help='Default seconds between polls of each coin (overridden by JSON "poll_interval")')
+        parser.add_argument('--sweep', type=int, default=300,
+                            help='Seconds between retrying ALL "mapped" deposits, e.g. ones stuck on low balance')
+        parser.add_argument('--timeout', type=int, default=settings.CONVERTER_LOAD_TIMEOUT,
+                            help='Abandon loading a coin if it takes longer than this many seconds (0 = no limit)')
+        parser.add_argument('--heartbeat', type=str, default=settings.CONVERTER_HEARTBEAT_FILE,
+                            help='Write a JSON heartbeat to this file after every iteration')
+        parser.add_argument('--dry', action='store_true',
+                            help="Dry run (don't actually send any coins, just print what would happen)")
+
+    def stop(self, signum=None, frame=None):
+        """Signal handler - asks the main loop to exit after the current coin has finished"""
+        log.info('Received signal %s - run_converter will shut down after the current task.', signum)
+        self._stop.set()
+
+    def poll_interval(self, coin: Coin, default: int) -> int:
+        """Returns the poll interval in seconds for ``coin``, from the JSON setting ``poll_interval`` if present"""
+        try:
+            return int(coin.settings['json'].get('poll_interval', default))
+        except (AttributeError, TypeError, ValueError):
+            return default
+
+    def load_coin(self, symbol: str, timeout: float = None) -> Tuple[int, Optional[str]]:
+        """
+        Loads new transactions for ``symbol``. If ``timeout`` is set, the coin is loaded by
+        :meth:`.load_txs.Command.load_parallel` in a worker thread, and abandoned if it's still loading after
+        ``timeout`` seconds.
+
+        :return tuple: ``(saved, error)`` - the amount of deposits stored, and an error message (None on success)
+        """
+        if empty(timeout):
+            try:
+                return self.loader.load_txs(symbol), None
+            except Exception as e:
+                log.exception('Error loading transactions for coin %s.', symbol)
+                return 0, f'{type(e).__name__}: {str(e)}'
+        results, errors = self.loader.load_parallel([symbol], workers=1, timeout=timeout)
+        return results.get(symbol, 0), errors.get(symbol)
+
+    def poll_coin(self, coin: Coin, interval: int, dry=False, timeout: float = None):
+        """
+        Loads new transactions for ``coin`` (see :meth:`.load_coin`), then validates and converts any new deposits
+        for it. Updates the coin's schedule in ``self.coin_state``, applying exponential backoff if loading failed.
+        """
+        st = self.coin_state.setdefault(coin.symbol, dict(next_poll=0.0, failures=0, deposits=0))
+        now = time.time()
+        st['last_poll'] = now
+        if coin.symbol in self.loader.running:
+            # The thread from an abandoned poll is still stuck, don't start a second one using the same loader.
+            err = 'LoadTimeout: Still loading from a previous poll'
+        else:
+            saved, err = self.load_coin(coin.symbol, timeout)
+            st['deposits'] += saved
+        if err is None:
+            st['failures'], st['last_error'] = 0, None
+            st['next_poll'] = now + interval
+        else:
+            st['failures'] += 1
+            st['last_error'] = err
+            delay = min(interval * (2 ** st['failures']), settings.CONVERTER_MAX_BACKOFF)
+            st['next_poll'] = now + delay
+            log.error('Error loading transactions for %s (failure #%d): %s. Next attempt in %d seconds.',
+                      coin, st['failures'], err, delay)
+
+        self.convert_new(coin, dry=dry)
+
+    def convert_new(self, coin: Coin, dry=False):
+        """Validates any ``new`` deposits for ``coin``, and immediately converts the ones which became ``mapped``"""
+        mapped = []   # type: List[int]
+        for d in self.converter.new_deposits([coin.symbol]).iterator(200):
+            self.converter.process_new(d)
+            if d.status == 'mapped':
+                mapped.append(d.id)
+        self.converter.convert_queue(mapped, dry)
+
+    def sweep_mapped(self, symbols: List[str], dry=False):
+        """Retries every ``mapped`` deposit which is due (for ``symbols`` only), as done by ``convert_coins``"""
+        log.info('Retrying conversion of all deposits in state "mapped"')
+        ids = self.converter.mapped_deposits().filter(coin__in=symbols).order_by('id').values_list('id', flat=True)
+        self.converter.convert_queue(list(ids), dry)
+        self.converter.reset_funds_low()
+        self.last_sweep = time.time()
+
+    def write_heartbeat(self, path: str):
+        """Atomically writes the current daemon state as JSON into the file ``path``"""
+        ts = lambda t: None if empty(t) else datetime.utcfromtimestamp(t).isoformat()
+        data = dict(
+            timestamp=ts(time.time()), pid=os.getpid(), iteration=self.iteration,
+            coins={
+                sym: dict(last_poll=ts(st.get('last_poll')), next_poll=ts(st.get('next_poll')),
+                          failures=st['failures'], deposits=st['deposits'], last_error=st.get('last_error'))
+                for sym, st in self.coin_state.items()
+            }
+        )
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+
+    def handle(self, *args, **options):
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        only = None
+        if not empty(options['coins']):
+            only = [c.upper() for c in options['coins'].split(',')]
+            log.info('Option --coins was specified. Only processing coins: %s', only)
+        interval, sweep, dry = int(options['interval']), int(options['sweep']), options['dry']
+        timeout = options.get('timeout') or None
+
+        log.info('run_converter started (default poll interval: %ds, mapped sweep: %ds)', interval, sweep)
+        while not self._stop.is_set():
+            self.iteration += 1
+            # Long running processes must not hold onto connections which the DB server may have closed.
+            close_old_connections()
+            # Coins, coin pairs and address maps may have been changed by another process (e.g. the admin panel)
+            coin_handlers.refresh_handlers()
+            convert_coins.routing.invalidate()
+            self.converter.load_converted()
+            # Balances are re-loaded once per iteration, see convert_coins.BalanceBudget
+            self.converter.budget = convert_coins.BalanceBudget()
+            coins = Coin.objects.filter(enabled=True)
+            if only is not None:
+                coins = coins.filter(symbol__in=only)
+            coins = list(coins)
+            # Don't let load_txs hold onto the Coin objects from previous iterations for the daemon's lifetime
+            self.loader.coin_map = {c.symbol: c for c in coins}
+
+            for c in coins:
+                if self._stop.is_set():
+                    break
+                if self.coin_state.get(c.symbol, {}).get('next_poll', 0) > time.time():
+                    continue
+                self.poll_coin(c, self.poll_interval(c, interval), dry=dry, timeout=timeout)
+
+            if not self._stop.is_set() and time.time() - self.last_sweep >= sweep:
+                self.sweep_mapped([c.symbol for c in coins], dry=dry)
+
+            # Any coins which ran short of balance during this iteration (including polls outside of a sweep) must be
+            # flagged / notified before the budget is replaced by the next iteration.
+            self.converter.apply_shortfalls()
+
+            if not empty(options['heartbeat']):
+                try:
+                    self.write_heartbeat(options['heartbeat'])
+                except Exception:
+                    log.exception('Failed to write heartbeat file %s', options['heartbeat'])
+
+            # Sleep until the next coin is due (at most one poll interval), waking up early on shutdown.
+            next_due = min([st['next_poll'] for st in self.coin_state.values()], default=time.time() + interval)
+            self._stop.wait(timeout=min(max(next_due - time.time(), 1), interval))
+
+        log.info('run_converter has shut down cleanly.')
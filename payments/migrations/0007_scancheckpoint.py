@@ -0,0 +1,33 @@
+# Generated by Django 2.1.13 on 2026-10-18 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_coin_symbol_id_20190706_1521'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('loader', models.CharField(max_length=100, verbose_name='Loader Name')),
+                ('last_index', models.BigIntegerField(blank=True, null=True,
+                                                      verbose_name='Last History Index / Sequence')),
+                ('last_block', models.BigIntegerField(blank=True, null=True, verbose_name='Last Block Number')),
+                ('last_txid', models.CharField(blank=True, max_length=255, null=True,
+                                               verbose_name='Last Transaction ID')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Last Update')),
+                ('coin', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints',
+                                           to='payments.Coin')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='scancheckpoint',
+            unique_together={('coin', 'loader')},
+        ),
+    ]
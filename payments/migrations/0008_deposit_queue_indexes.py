@@ -0,0 +1,21 @@
+# Generated by Django 2.1.13 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_scancheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['status', 'coin'], name='deposit_status_coin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['status', 'convert_to'], name='deposit_status_convto_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.1.13 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_deposit_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coin',
+            name='convert_failures',
+            field=models.IntegerField(default=0, verbose_name='Consecutive Conversion Failures'),
+        ),
+        migrations.AddField(
+            model_name='coin',
+            name='convert_retry_at',
+            field=models.DateTimeField(blank=True, default=None, null=True, verbose_name='Conversions Paused Until'),
+        ),
+        migrations.AddField(
+            model_name='deposit',
+            name='convert_attempts',
+            field=models.IntegerField(default=0, verbose_name='Conversion Attempts'),
+        ),
+        migrations.AddField(
+            model_name='deposit',
+            name='next_convert_attempt',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Next Conversion Attempt'),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['status', 'next_convert_attempt'], name='deposit_status_nextconv_idx'),
+        ),
+    ]
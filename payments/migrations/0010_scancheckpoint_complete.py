@@ -0,0 +1,18 @@
+# Generated by Django 2.1.13 on 2026-10-18 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_convert_retry_backoff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scancheckpoint',
+            name='complete',
+            field=models.BooleanField(default=False, verbose_name='Last Scan Completed'),
+        ),
+    ]
@@ -90,6 +90,11 @@ class Coin(models.Model):
     funds_low = models.BooleanField('Deposits are currently stuck due to low balance?', default=False)
     last_notified = models.DateTimeField('Last Email Notification', null=True, blank=True, default=None)
 
+    # When a coin is unhealthy during a conversion, the converter backs off from sending this coin (doubling the delay
+    # after each failure), so a dead RPC node is only probed once per backoff window.
+    convert_failures = models.IntegerField('Consecutive Conversion Failures', default=0)
+    convert_retry_at = models.DateTimeField('Conversions Paused Until', null=True, blank=True, default=None)
+
     @property
     def should_notify_low(self):
         """
@@ -109,7 +114,8 @@ class Coin(models.Model):
         """
         if not self.notify_low_funds:
             return False
-        if self.funds_low:     # If ``funds_low`` is True, we've previously notified admins of this event
+        if self.funds_low and self.last_notified is not None:
+            # If ``funds_low`` is True, we've previously notified admins of this event
             # true if last email was sent at least ``settings.LOWFUNDS_RENOTIFY`` hours ago.
             return (timezone.now() - self.last_notified) > timedelta(hours=settings.LOWFUNDS_RENOTIFY)
         return True
@@ -120,42 +126,110 @@ class Coin(models.Model):
         Small helper property for quickly accessing the setting_xxxx fields, while also decoding the custom json
         field into a dictionary/list
 
+        The result is cached on this instance until one of :py:attr:`.SETTINGS_FIELDS` changes, or the coin is saved,
+        so it's cheap to access repeatedly. The returned dict is shared between callers - don't modify it, copy it
+        (e.g. ``{**coin.settings, **coin.settings['json']}``) instead.
+
         :return: dict(host:str, port:str, user:str, password:str, json:dict/list)
         """
+        key = self.settings_key
+        if self._settings_cache is not None and self._settings_cache[0] == key:
+            return self._settings_cache[1]
+
         try:
             j = json.loads(self.setting_json)
         except:
             log.warning("Couldn't decode JSON for coin %s, falling back to {}", str(self))
             j = {}
 
-        return dict(
+        s = dict(
             host=self.setting_host,
             port=self.setting_port,
             user=self.setting_user,
             password=self.setting_pass,
             json=j
         )
+        self._settings_cache = (key, s)
+        return s
+
+    SETTINGS_FIELDS = ('setting_host', 'setting_port', 'setting_user', 'setting_pass', 'setting_json')
+    """Fields which make up :py:attr:`.settings`"""
+
+    @property
+    def settings_key(self) -> tuple:
+        """
+        The current values of :py:attr:`.SETTINGS_FIELDS`. Used to detect whether a cached copy of this coin's
+        :py:attr:`.settings` (or settings derived from them) is still valid.
+        """
+        return tuple(getattr(self, f) for f in self.SETTINGS_FIELDS)
 
     @property
     def pairs(self):
         return self.pairs_from | self.pairs_to
 
+    CONFIG_FIELDS = (
+        'symbol_id', 'display_name', 'coin_type', 'enabled', 'our_account', 'can_issue',
+        'setting_host', 'setting_port', 'setting_user', 'setting_pass', 'setting_json',
+    )
+    """
+    Fields which affect the coin handlers. Saving a coin only reloads it's handlers if one of these has changed,
+    so the converter updating e.g. ``funds_low`` doesn't rebuild the handler registry.
+    """
+
     def __init__(self, *args, **kwargs):
         super(Coin, self).__init__(*args, **kwargs)
         # To allow dynamic additions to settings.COIN_TYPES, we have to set it from the constructor
         # not from the model field itself.
         self._meta.get_field('coin_type').choices = settings.COIN_TYPES
+        # The handler config as it was loaded from the DB (None = not saved yet), see from_db() / save()
+        self._loaded_config = None
+        # (settings_key, settings) - the parsed settings, and the field values they were parsed from
+        self._settings_cache = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Coin, cls).from_db(db, field_names, values)
+        instance._loaded_config = instance._config_state()
+        return instance
+
+    def _config_state(self) -> tuple:
+        # Read from __dict__ so that deferred fields aren't loaded from the DB
+        return tuple(self.__dict__.get(f) for f in self.CONFIG_FIELDS)
 
     def save(self, *args, **kwargs):
-        """To avoid inconsistency, the symbol is automatically made uppercase"""
+        """
+        To avoid inconsistency, the symbol is automatically made uppercase.
+
+        If the coin is new, or any of :py:attr:`.CONFIG_FIELDS` have changed, the coin handlers for this coin are
+        reloaded (see :py:func:`payments.coin_handlers.reload_coin`).
+        """
         self.symbol = self.symbol.upper()
         if empty(self.symbol_id):
             self.symbol_id = self.symbol
+        update_fields = kwargs.get('update_fields')
+        state = self._config_state()
+        if update_fields is not None and self._loaded_config is not None:
+            # Only the listed fields are written, so changes to any other config fields are still unsaved
+            saved = set(update_fields)
+            state = tuple(
+                v if f in saved else old for f, v, old in zip(self.CONFIG_FIELDS, state, self._loaded_config)
+            )
+        changed = self._loaded_config != state
         super(Coin, self).save(*args, **kwargs)
-        # After a coin is updated in the DB, we should reload any coin_handlers to detect compatible loaders.
-        # We need to use in-line loading to prevent recursive loading from the coin handlers causing issues.
-        from payments.coin_handlers import reload_handlers
-        reload_handlers()
+        self._loaded_config = state
+        self._settings_cache = None
+        if changed:
+            # After a coin is updated in the DB, we should reload it's coin_handlers to detect compatible loaders.
+            # We need to use in-line loading to prevent recursive loading from the coin handlers causing issues.
+            from payments.coin_handlers import reload_coin
+            reload_coin(self.symbol)
+
+    def delete(self, *args, **kwargs):
+        symbol = self.symbol
+        res = super(Coin, self).delete(*args, **kwargs)
+        from payments.coin_handlers import reload_coin
+        reload_coin(symbol)
+        return res
 
     def __str__(self):
         return '{} ({})'.format(self.display_name, self.symbol)
@@ -367,6 +441,9 @@ class Deposit(models.Model):
     updated_at = models.DateTimeField('Last Update', auto_now=True)
 
     last_convert_attempt = models.DateTimeField('Last Conversion Attempt', blank=True, null=True)
+    # Deposits which couldn't be sent (e.g. low balance) are retried with an exponential backoff
+    convert_attempts = models.IntegerField('Conversion Attempts', default=0)
+    next_convert_attempt = models.DateTimeField('Next Conversion Attempt', blank=True, null=True)
     # When the token was converted into the paired crypto currency (if at all)
     processed_at = models.DateTimeField('Processed At', blank=True, null=True)
 
@@ -381,8 +458,17 @@ class Deposit(models.Model):
         """
         A transaction ID should only exist once within a particular coin. It may exist multiple times if each output
         has a unique `vout` number.
+
+        The composite indexes match the converter's work queues (``new`` deposits per coin, ``mapped`` deposits per
+        destination coin, and retries which are due by their next attempt), so scanning the queues stays fast no
+        matter how many deposits have reached a final state (``conv``, ``inv``, ``refund`` etc.)
         """
         unique_together = (('txid', 'coin', 'vout'),)
+        indexes = [
+            models.Index(fields=['status', 'coin'], name='deposit_status_coin_idx'),
+            models.Index(fields=['status', 'convert_to'], name='deposit_status_convto_idx'),
+            models.Index(fields=['status', 'next_convert_attempt'], name='deposit_status_nextconv_idx'),
+        ]
 
 
 class Conversion(models.Model):
@@ -440,5 +526,37 @@ class Conversion(models.Model):
         return f'Conversion ID {self.id} - From: {self.from_coin} to {self.to_coin} (Destination: {self.to_address})'
 
 
+class ScanCheckpoint(models.Model):
+    """
+    Records how far a transaction loader has scanned a coin's history, so that the next run of ``load_txs`` only
+    has to fetch operations which are newer than the checkpoint, instead of re-reading the whole tail of the history.
+
+    A checkpoint is unique per (coin, loader). Each loader only uses whichever of the position fields make sense for
+    its data source, e.g. :class:`coin_handlers.Steem.SteemLoader` stores the account history index in ``last_index``,
+    while :class:`coin_handlers.base.BatchLoader` stores a transaction ID in ``last_txid``.
+
+    Deleting a checkpoint is always safe - the loader will simply fall back to a full scan of ``tx_count``
+    transactions on its next run.
+    """
+    coin = models.ForeignKey(Coin, on_delete=models.CASCADE, related_name='checkpoints')
+    loader = models.CharField('Loader Name', max_length=100)
+    """The name of the loader class which created this checkpoint, e.g. ``SteemLoader``"""
+
+    last_index = models.BigIntegerField('Last History Index / Sequence', blank=True, null=True)
+    last_block = models.BigIntegerField('Last Block Number', blank=True, null=True)
+    last_txid = models.CharField('Last Transaction ID', max_length=255, blank=True, null=True)
+    complete = models.BooleanField('Last Scan Completed', default=False)
+    """
+    False while a scan which has imported transactions is in progress (or was interrupted), True once a scan has
+    finished. Used by :class:`coin_handlers.base.BatchLoader` to decide whether already imported transactions can
+    be trusted to stop paging early.
+    """
 
+    updated_at = models.DateTimeField('Last Update', auto_now=True)
 
+    def __str__(self):
+        return f'{self.loader} checkpoint for {self.coin_id} (index: {self.last_index}, block: {self.last_block}, ' \
+               f'txid: {self.last_txid})'
+
+    class Meta:
+        unique_together = (('coin', 'loader'),)
@@ -1,3 +1,1588 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from payments.coin_handlers.Bitcoin.BitcoinMixin import BitcoinMixin
+from payments.coin_handlers.MockHandler.handlers import MockLoader
+from payments.coin_handlers.base.AsyncBatchLoader import AsyncBatchLoader
+from payments.coin_handlers.base.HealthMonitor import HealthMonitor
+from payments.coin_handlers.base.RPCPool import RPCPool
+from payments.coin_handlers.base.SettingsMixin import SettingsMixin
+from payments.coin_handlers.base.TxIndex import KnownTxIndex, tx_index
+from payments.models import AddressAccountMap, Coin, CoinPair, Conversion, Deposit, ScanCheckpoint
+
+
+class PrefetchMockLoader(MockLoader):
+    """A :class:`.MockLoader` which records each ``load_batch`` call, and the most pages it ever held at once"""
+
+    delay = 0.0
+
+    def __init__(self, symbols):
+        super().__init__(symbols=symbols)
+        self.offsets = []
+        self.fetching = 0
+        self.held = 0
+        self.max_held = 0
+        self.lock = threading.Lock()
+
+    def load_batch(self, symbol, limit=10, offset=0, account=None):
+        with self.lock:
+            self.offsets.append(offset)
+            self.fetching += 1
+            self.max_held = max(self.max_held, self.held + self.fetching)
+        time.sleep(self.delay)
+        super().load_batch(symbol, limit=limit, offset=offset, account=account)
+        with self.lock:
+            self.fetching -= 1
+
+    def _load_pages(self, coin, batch, account=None):
+        for offset, transactions in super()._load_pages(coin, batch, account):
+            with self.lock:
+                self.held += 1
+            yield offset, transactions
+            with self.lock:
+                self.held -= 1
+
+
+def make_coins(*symbols: str, coin_type='mock', **fields) -> Dict[str, Coin]:
+    """
+    Creates a :class:`.Coin` for each of ``symbols`` (using the symbol as it's ``symbol_id`` and display name), and
+    returns them mapped by symbol. Any ``fields`` are set on every coin.
+
+    >>> coins = make_coins('MOCKTESTCOIN', 'FAKEDESTCOIN', our_account='someguy')
+    """
+    return {
+        sym: Coin.objects.create(symbol=sym, symbol_id=sym, display_name=sym, coin_type=coin_type, **fields)
+        for sym in symbols
+    }
+
+
+def make_deposit(coin: Coin, status='mapped', amount='1', **fields) -> Deposit:
+    """
+    Creates a :class:`.Deposit` into ``coin`` with a unique TXID. Any ``fields`` are set on the deposit.
+
+    >>> d = make_deposit(coins['MOCKTESTCOIN'], convert_to=coins['FAKEDESTCOIN'], convert_dest_address='someguy')
+    """
+    make_deposit.count += 1
+    return Deposit.objects.create(
+        coin=coin, txid='tx{}'.format(make_deposit.count), status=status, amount=Decimal(amount), **fields
+    )
+
+
+make_deposit.count = 0
+
+
+class AsyncMockLoader(AsyncBatchLoader, MockLoader):
+    """
+    A :class:`.MockLoader` using :class:`.AsyncBatchLoader` paging. Records the offset of each page requested, the
+    offsets of pages which were cancelled, and the most pages which were ever loading at once. Later pages take
+    longer to load, so prefetched pages are still loading when an earlier page is returned.
+    """
+
+    def __init__(self, symbols):
+        super().__init__(symbols=symbols)
+        self.offsets, self.cancelled = [], []
+        self.loading = self.max_loading = 0
+
+    async def load_batch(self, symbol, limit=10, offset=0, account=None):
+        self.offsets.append(offset)
+        self.loading += 1
+        self.max_loading = max(self.max_loading, self.loading)
+        try:
+            await asyncio.sleep(0.01 + offset / 1000)
+        except asyncio.CancelledError:
+            self.cancelled.append(offset)
+            raise
+        finally:
+            self.loading -= 1
+        return self.fake_txs[offset:offset + limit]
+
+
+class MockCoinTestCase(TestCase):
+    """
+    Base class for tests using the mock coin handler. Resets the fake transactions of :class:`.MockLoader` and the
+    shared known TX index, and creates the coins ``MOCKTESTCOIN`` and ``FAKEDESTCOIN`` as ``self.coin`` /
+    ``self.dest_coin``.
+    """
+
+    def setUp(self):
+        MockLoader.reset()
+        MockLoader.fake_all = False
+        tx_index.clear()
+        coins = make_coins('MOCKTESTCOIN', 'FAKEDESTCOIN')
+        self.coin, self.dest_coin = coins['MOCKTESTCOIN'], coins['FAKEDESTCOIN']
+
+    def tearDown(self):
+        MockLoader.reset()
+
+
+class BatchLoaderPrefetchTest(MockCoinTestCase):
+    """Tests for the double-buffered (``prefetch``) mode of :class:`.BatchLoader`, using the mock coin handler"""
+
+    def _loader(self, prefetch: bool, tx_count=100) -> PrefetchMockLoader:
+        loader = PrefetchMockLoader(symbols=['MOCKTESTCOIN'])
+        loader.prefetch = prefetch
+        loader.load(tx_count=tx_count)
+        return loader
+
+    def test_same_txs_as_sequential(self):
+        """Prefetch mode should yield exactly the same transactions, in the same order, as sequential mode"""
+        self._loader(False).add_fake_txs(95)
+        sequential = [tx['txid'] for tx in self._loader(False).list_txs(batch=10)]
+        loader = self._loader(True)
+        prefetched = [tx['txid'] for tx in loader.list_txs(batch=10)]
+        self.assertEqual(len(sequential), 95)
+        self.assertEqual(prefetched, sequential)
+        # The short page at offset 90 is the end of the results, so offset 100 must never be requested
+        self.assertEqual(loader.offsets, list(range(0, 100, 10)))
+
+    def test_holds_at_most_two_pages(self):
+        """While a page is being processed, at most one more page should be loading"""
+        self._loader(False).add_fake_txs(60)
+        loader = self._loader(True)
+        loader.delay = 0.01
+        for _ in loader.list_txs(batch=10):
+            time.sleep(0.002)
+        self.assertEqual(loader.max_held, 2)
+
+    def test_respects_tx_count(self):
+        """No pages should be requested past ``tx_count``"""
+        self._loader(False).add_fake_txs(95)
+        loader = self._loader(True, tx_count=30)
+        txs = list(loader.list_txs(batch=10))
+        self.assertEqual(len(txs), 30)
+        self.assertEqual(loader.offsets, [0, 10, 20])
+
+    def test_empty_results(self):
+        loader = self._loader(True)
+        self.assertEqual(list(loader.list_txs(batch=10)), [])
+        self.assertEqual(loader.offsets, [0])
+
+
+class AsyncBatchLoaderTest(MockCoinTestCase):
+    def setUp(self):
+        super().setUp()
+        self.loader = AsyncMockLoader(symbols=['MOCKTESTCOIN'])
+        self.loader.add_fake_txs(25)
+        self.loader.load(tx_count=100)
+
+    def test_short_page(self):
+        """No page is requested after a short page, and pages still loading are cancelled before it's yielded"""
+        pages = []
+        for offset, txs in self.loader._load_pages(self.coin, 10):
+            pages.append((offset, len(txs), self.loader.loading))
+        # Page 0 is loaded alone, then up to 3 pages ahead of the current page. Page 2 is the end of the results.
+        self.assertEqual(pages, [(0, 10, 0), (10, 10, 3), (20, 5, 0)])
+        self.assertEqual(self.loader.offsets, [0, 10, 20, 30, 40, 50])
+        self.assertEqual(sorted(self.loader.cancelled), [30, 40, 50])
+        self.assertEqual(len(list(self.loader.list_txs(batch=10))), 25)
+
+    def test_prefetch_disabled(self):
+        """With ``"prefetch": false`` in the coin's custom JSON, only one page is loaded at a time"""
+        self.coin.setting_json = '{"prefetch": false}'
+        self.coin.save()
+        self.loader = AsyncMockLoader(symbols=['MOCKTESTCOIN'])
+        self.loader.load(tx_count=100)
+        self.assertEqual(len(list(self.loader.list_txs(batch=10))), 25)
+        self.assertEqual(self.loader.offsets, [0, 10, 20])
+        self.assertEqual(self.loader.max_loading, 1)
+
+
+class BatchLoaderKnownTest(MockCoinTestCase):
+    """
+    Tests that :class:`.BatchLoader` stops paging on a full page of already imported deposits, unless the previous
+    scan was interrupted, so an interrupted run never leaves a gap
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.loader = PrefetchMockLoader(symbols=['MOCKTESTCOIN'])
+        self.loader.add_fake_txs(95)
+        self.loader.load(tx_count=100)
+        # Newest first, like a real history API
+        for i, tx in enumerate(MockLoader.fake_txs):
+            tx['tx_timestamp'] = datetime(2019, 6, 1) - timedelta(minutes=i)
+        self.txs = list(MockLoader.fake_txs)
+
+    def _import(self, txs):
+        for tx in txs:
+            Deposit.objects.create(
+                txid=tx['txid'], coin=self.coin, amount=tx['amount'], vout=0, tx_timestamp=tx['tx_timestamp']
+            )
+
+    def _checkpoint(self, tx=None, complete=True):
+        ScanCheckpoint.objects.create(
+            coin=self.coin, loader='PrefetchMockLoader', last_txid=None if tx is None else tx['txid'], complete=complete
+        )
+
+    def test_no_checkpoint(self):
+        """Without a completed scan, known pages don't prove anything, so the whole tail is scanned"""
+        self._import(self.txs)
+        self.assertEqual(list(self.loader.list_txs(batch=10)), [])
+        self.assertEqual(self.loader.offsets, list(range(0, 100, 10)))
+        self.assertEqual(self.loader._pending_checkpoints['MOCKTESTCOIN'],
+                         dict(complete=True, last_txid=self.txs[0]['txid']))
+
+    def test_stops_on_known_page(self):
+        """After a completed scan, paging stops at the first full known page, even if the checkpoint isn't found"""
+        self._import(self.txs[15:])
+        self._checkpoint()
+        txs = list(self.loader.list_txs(batch=10))
+        self.assertEqual([tx['txid'] for tx in txs], [tx['txid'] for tx in self.txs[:15]])
+        self.assertEqual(self.loader.offsets, [0, 10, 20])
+        # The scan is marked incomplete until it's checkpoint has been saved
+        self.assertFalse(ScanCheckpoint.objects.get(coin=self.coin).complete)
+        self.loader.save_checkpoints()
+        cp = ScanCheckpoint.objects.get(coin=self.coin)
+        self.assertEqual((cp.complete, cp.last_txid), (True, self.txs[0]['txid']))
+
+    def test_interrupted_run(self):
+        """
+        A previous run imported the newest page, then was interrupted before it reached the checkpoint. The next run
+        must not stop on the known newest page, and imports the gap down to the checkpoint.
+        """
+        self._import(self.txs[60:])
+        self._checkpoint(self.txs[60], complete=False)
+        self._import(self.txs[:10])
+        txs = list(self.loader.list_txs(batch=10))
+        self.assertEqual([tx['txid'] for tx in txs], [tx['txid'] for tx in self.txs[10:60]])
+        self.assertEqual(self.loader.offsets, list(range(0, 70, 10)))
+        self.assertEqual(self.loader._pending_checkpoints['MOCKTESTCOIN'],
+                         dict(complete=True, last_txid=self.txs[0]['txid']))
+
+    def test_disabled(self):
+        self._import(self.txs)
+        self._checkpoint()
+        self.loader.stop_on_known = False
+        self.assertEqual(list(self.loader.list_txs(batch=10)), [])
+        self.assertEqual(self.loader.offsets, list(range(0, 100, 10)))
+
+
+class KnownTxIndexTest(TestCase):
+    def setUp(self):
+        tx_index.clear()
+        self.coin = make_coins('MOCKTESTCOIN')['MOCKTESTCOIN']
+        for n in range(5):
+            Deposit.objects.create(txid=f'tx{n}', coin=self.coin, amount=Decimal('1'), vout=n % 2)
+
+    def test_warm_from_recent_deposits(self):
+        """Recent deposits are loaded into the index on first use, after which no queries are needed"""
+        self.assertEqual(tx_index.known(self.coin, [('tx1', 1), ('tx2', 1)]), {('tx1', 1)})
+        with self.assertNumQueries(0):
+            known = tx_index.known(self.coin, [('tx0', 0), ('tx3', 1)], check_db=False)
+        self.assertEqual(known, {('tx0', 0), ('tx3', 1)})
+
+    def test_lru_eviction(self):
+        """Keys evicted from the index are still found using the database"""
+        index = KnownTxIndex(size=2)
+        self.assertEqual(index.known(self.coin, [('tx0', 0)], check_db=False), set())
+        self.assertEqual(index.known(self.coin, [('tx0', 0)]), {('tx0', 0)})
+
+    def test_deleted_deposit(self):
+        tx_index.known(self.coin, [('tx4', 0)])
+        Deposit.objects.get(txid='tx4').delete()
+        self.assertEqual(tx_index.known(self.coin, [('tx4', 0)]), set())
+
+
+class SettingsCacheTest(TestCase):
+    """Tests for the cached :py:attr:`.Coin.settings`, and the per-instance cache in :class:`.SettingsMixin`"""
+
+    class Handler(SettingsMixin):
+        def __init__(self, coins):
+            self.coins = coins
+
+    def setUp(self):
+        coins = make_coins('MOCKTESTCOIN', setting_host='a.example.com', setting_json='{"confirms": 3}')
+        self.coin = coins['MOCKTESTCOIN']
+
+    def test_coin_settings_cached(self):
+        s = self.coin.settings
+        self.assertIs(self.coin.settings, s)
+        self.coin.setting_json = '{"confirms": 5}'
+        self.assertEqual(self.coin.settings['json'], {'confirms': 5})
+
+    def test_mixin_per_instance(self):
+        other = make_coins('OTHERCOIN', setting_host='b')['OTHERCOIN']
+        a, b = self.Handler({'MOCKTESTCOIN': self.coin}), self.Handler({'OTHERCOIN': other})
+        self.assertEqual(list(a.settings.keys()), ['MOCKTESTCOIN'])
+        self.assertEqual(list(b.settings.keys()), ['OTHERCOIN'])
+        self.assertIsNone(SettingsMixin._settings)
+
+    def test_mixin_changed_coin(self):
+        h = self.Handler({'MOCKTESTCOIN': self.coin})
+        self.assertEqual(h.settings['MOCKTESTCOIN']['confirms'], 3)
+        self.assertIs(h.settings, h.settings)
+        # A changed coin is re-loaded on the next access, without needing to invalidate it
+        self.coin.setting_json = '{"confirms": 7}'
+        self.assertEqual(h.settings['MOCKTESTCOIN']['confirms'], 7)
+        self.assertEqual(h.settings['MOCKTESTCOIN']['host'], 'a.example.com')
+        self.assertIs(h.settings, h.settings)
+
+    @override_settings(COIND_RPC={'MOCKTESTCOIN': {'host': 'rpc.example.com'}})
+    def test_mixin_invalidation(self):
+        h = self.Handler({'MOCKTESTCOIN': self.coin})
+        self.assertEqual(h.settings['MOCKTESTCOIN']['host'], 'rpc.example.com')
+        # COIND_RPC isn't part of the coin's settings key, so changes to it need an invalidation
+        with override_settings(COIND_RPC={'MOCKTESTCOIN': {'host': 'rpc2.example.com'}}):
+            self.assertEqual(h.settings['MOCKTESTCOIN']['host'], 'rpc.example.com')
+            h.invalidate_settings('MOCKTESTCOIN')
+            self.assertEqual(h.settings['MOCKTESTCOIN']['host'], 'rpc2.example.com')
+
+    def test_bitcoin_mixin(self):
+        class BtcHandler(BitcoinMixin):
+            def __init__(self, coins):
+                self.coins = coins
+
+        with override_settings(COIND_RPC={'EXTRACOIN': {'host': 'rpc.example.com', 'port': '1234'}}):
+            h = BtcHandler({'MOCKTESTCOIN': self.coin})
+            self.assertEqual(h._prep_settings()['EXTRACOIN']['port'], 1234)
+            self.assertEqual(h._prep_settings()['MOCKTESTCOIN']['confirms_needed'], 0)
+            self.coin.setting_json = '{"confirms_needed": "2"}'
+            self.assertEqual(h._prep_settings()['MOCKTESTCOIN']['confirms_needed'], 2)
+            self.assertEqual(h._prep_settings()['MOCKTESTCOIN']['port'], 8332)
+
+
+class FakeHealthMonitor(HealthMonitor):
+    """A :class:`.HealthMonitor` which returns fake health data instead of calling the coin managers"""
+
+    @staticmethod
+    def _probe(symbol):
+        if symbol == 'SLOWCOIN':
+            time.sleep(1.5)
+        if symbol == 'BADCOIN':
+            raise ConnectionError('RPC is down')
+        return 'FakeManager', ('Symbol', 'Status'), (symbol, 'Online')
+
+
+@patch('payments.coin_handlers.has_manager', lambda symbol: symbol != 'NOMGRCOIN')
+@patch('payments.coin_handlers.refresh_handlers', lambda: None)
+class HealthMonitorTest(TestCase):
+    def setUp(self):
+        cache.delete(HealthMonitor.cache_key)
+        make_coins('OKCOIN', 'SLOWCOIN', 'BADCOIN', 'NOMGRCOIN', 'OKCOIN2')
+        self.monitor = FakeHealthMonitor(timeout=0.5, workers=5)
+
+    def test_refresh(self):
+        """Coins are probed concurrently, and a slow coin times out without holding up the others"""
+        start = time.time()
+        self.monitor.refresh(Coin.objects.order_by('symbol'))
+        self.assertLess(time.time() - start, 1.4)
+
+        snap = self.monitor.snapshot()
+        states = {sym: c['status'] for sym, c in snap['coins'].items()}
+        self.assertEqual(states, dict(
+            OKCOIN='ok', OKCOIN2='ok', SLOWCOIN='timeout', BADCOIN='error', NOMGRCOIN='no_manager'
+        ))
+        self.assertEqual(snap['handlers']['FakeManager']['results'], [['OKCOIN', 'Online'], ['OKCOIN2', 'Online']])
+        self.assertEqual(len(snap['fails']), 3)
+        self.assertFalse(snap['stale'])
+
+    def test_queued_timeout(self):
+        """Coins waiting for a free worker behind a hung probe also time out, instead of holding up the snapshot"""
+        coins = [Coin.objects.get(symbol='SLOWCOIN'), Coin.objects.get(symbol='OKCOIN')]
+        start = time.time()
+        snap = FakeHealthMonitor(timeout=0.5, workers=1).collect(coins)
+        self.assertLess(time.time() - start, 1.2)
+        states = {sym: c['status'] for sym, c in snap['coins'].items()}
+        self.assertEqual(states, dict(SLOWCOIN='timeout', OKCOIN='timeout'))
+        self.assertEqual(snap['coins']['SLOWCOIN']['error'], 'Timed out after 0.5 seconds')
+        self.assertIn('waiting for a free worker', snap['coins']['OKCOIN']['error'])
+
+    def test_no_snapshot(self):
+        self.assertIsNone(self.monitor.snapshot())
+
+
+def steem_transfer(amount, to='someguy', frm='alice', trx_id='abc123', **extra) -> dict:
+    """Returns a Steem/Hive transfer op in account history format, with either a legacy or NAI ``amount``"""
+    return dict(
+        type='transfer', trx_id=trx_id, op_in_trx=0, to=to, memo='', timestamp='2019-06-01T10:00:00',
+        amount=amount, **{'from': frm}, **extra
+    )
+
+
+@patch('payments.coin_handlers.MockHandler.handlers.MockManager.health_test', return_value=True)
+class HealthCacheTest(MockCoinTestCase):
+    """Tests for the cached health checks of :class:`.BaseManager`"""
+
+    def setUp(self):
+        from payments.coin_handlers.MockHandler.handlers import MockManager
+        super().setUp()
+        self.mgr = MockManager('FAKEDESTCOIN')
+        self.mgr.invalidate_health()
+
+    def tearDown(self):
+        self.mgr.invalidate_health()
+        super().tearDown()
+
+    def test_cached(self, health_test):
+        """The health test is only run again once the cached result has been invalidated"""
+        self.assertTrue(self.mgr.cached_health_test())
+        self.assertTrue(self.mgr.cached_health_test())
+        self.assertEqual(health_test.call_count, 1)
+        self.mgr.invalidate_health()
+        self.mgr.cached_health_test()
+        self.assertEqual(health_test.call_count, 2)
+
+    def test_ttl(self, health_test):
+        """The cached result expires after ``ttl`` seconds"""
+        self.mgr.cached_health_test(ttl=1)
+        time.sleep(1.1)
+        self.mgr.cached_health_test(ttl=1)
+        self.assertEqual(health_test.call_count, 2)
+
+    def test_send_failure(self, health_test):
+        """A failed send during a conversion clears the cached result, so the next conversion re-checks the coin"""
+        from payments.management.commands.convert_coins import ConvertCore
+        pair = CoinPair.objects.create(from_coin=self.coin, to_coin=self.dest_coin, exchange_rate=Decimal('1'))
+        with patch('payments.management.commands.convert_coins.get_manager', return_value=self.mgr), \
+                patch.object(self.mgr, 'send', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                ConvertCore.convert(make_deposit(self.coin), pair, 'someguy')
+        self.assertEqual(health_test.call_count, 1)
+        self.mgr.cached_health_test()
+        self.assertEqual(health_test.call_count, 2)
+
+
+class BalanceBudgetTest(MockCoinTestCase):
+    """Tests for the per-run destination coin balance tracking of ``convert_coins`` (:class:`.BalanceBudget`)"""
+
+    def setUp(self):
+        from payments.coin_handlers.MockHandler.handlers import MockManager
+        from payments.management.commands.convert_coins import BalanceBudget
+        super().setUp()
+        self.pair = CoinPair.objects.create(from_coin=self.coin, to_coin=self.dest_coin, exchange_rate=Decimal('1'))
+        self.mgr = MockManager('FAKEDESTCOIN')
+        self.budget = BalanceBudget()
+
+    def test_reserve(self):
+        """The balance is loaded once, deposits which don't fit add to the shortfall, and releases are returned"""
+        with patch.object(self.mgr, 'balance', return_value=Decimal('10')) as balance:
+            self.assertTrue(self.budget.reserve(self.pair, self.mgr, Decimal('4')))
+            self.assertTrue(self.budget.reserve(self.pair, self.mgr, Decimal('4')))
+            self.assertFalse(self.budget.reserve(self.pair, self.mgr, Decimal('4')))
+            self.assertEqual(self.budget.shortfall, {'FAKEDESTCOIN': Decimal('4')})
+            self.assertEqual(self.budget.pairs['FAKEDESTCOIN'], self.pair)
+
+            self.budget.release(self.pair, Decimal('4'))
+            self.assertTrue(self.budget.reserve(self.pair, self.mgr, Decimal('4')))
+        self.assertEqual(balance.call_count, 1)
+
+    def test_balance_outside_lock(self):
+        """A slow balance query for one coin doesn't hold up reservations for other coins"""
+        from payments.coin_handlers.MockHandler.handlers import MockManager
+        other = make_coins('OTHERDESTCOIN')['OTHERDESTCOIN']
+        pair = CoinPair.objects.create(from_coin=self.coin, to_coin=other, exchange_rate=Decimal('1'))
+        slow_mgr, started, release = MockManager('OTHERDESTCOIN'), threading.Event(), threading.Event()
+
+        def slow_balance():
+            started.set()
+            release.wait(5)
+            return Decimal('10')
+
+        with patch.object(slow_mgr, 'balance', side_effect=slow_balance), \
+                patch.object(self.mgr, 'balance', return_value=Decimal('10')):
+            t = threading.Thread(target=self.budget.reserve, args=(pair, slow_mgr, Decimal('1')))
+            t.start()
+            self.assertTrue(started.wait(5))
+            try:
+                start = time.time()
+                self.assertTrue(self.budget.reserve(self.pair, self.mgr, Decimal('1')))
+                self.assertLess(time.time() - start, 1)
+            finally:
+                release.set()
+                t.join(5)
+        self.assertEqual(self.budget.balances['OTHERDESTCOIN'], Decimal('9'))
+
+    def test_unlimited(self):
+        """Coins which can be issued, or whose balance can't be loaded, aren't limited"""
+        with patch.object(self.mgr, 'balance', side_effect=RuntimeError):
+            self.assertTrue(self.budget.reserve(self.pair, self.mgr, Decimal('1000')))
+        self.assertEqual(self.budget.shortfall, {})
+
+        budget = type(self.budget)()
+        self.pair.to_coin.can_issue = True
+        with patch.object(self.mgr, 'balance') as balance:
+            self.assertTrue(budget.reserve(self.pair, self.mgr, Decimal('1000')))
+        balance.assert_not_called()
+
+    def test_convert(self):
+        """Deposits which don't fit the budget are deferred without a send, and NotEnoughBalance empties the budget"""
+        from payments.coin_handlers.base.exceptions import NotEnoughBalance
+        from payments.management.commands.convert_coins import ConvertCore
+        d1, d2 = make_deposit(self.coin, amount='6'), make_deposit(self.coin, amount='6')
+        with patch('payments.management.commands.convert_coins.get_manager', return_value=self.mgr), \
+                patch.object(self.mgr, 'cached_health_test', return_value=True), \
+                patch.object(self.mgr, 'balance', return_value=Decimal('10')), \
+                patch.object(self.mgr, 'send', side_effect=NotEnoughBalance) as send:
+            self.assertIsNone(ConvertCore.convert(d1, self.pair, 'someguy', budget=self.budget))
+            self.assertEqual(self.budget.balances['FAKEDESTCOIN'], Decimal(0))
+            self.assertIsNone(ConvertCore.convert(d2, self.pair, 'someguy', budget=self.budget))
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(self.budget.shortfall['FAKEDESTCOIN'], Decimal('12'))
+        for d in (d1, d2):
+            d.refresh_from_db()
+            self.assertEqual((d.status, d.convert_attempts), ('mapped', 1))
+
+
+class ConvertPreloadTest(MockCoinTestCase):
+    """Tests for the data ``convert_coins`` pre-loads once per run, instead of querying per deposit / coin"""
+
+    def setUp(self):
+        from payments.management.commands.convert_coins import Command
+        super().setUp()
+        self.cmd = Command()
+
+    def convert(self, deposit: Deposit) -> Conversion:
+        return Conversion.objects.create(
+            deposit=deposit, from_coin=self.coin, to_coin=self.dest_coin, to_address='someguy', to_amount=Decimal(1),
+            tx_fee=Decimal(0), ex_fee=Decimal(0)
+        )
+
+    def test_load_converted(self):
+        """Only new deposits with a conversion are loaded, and validate_deposit rejects them without a query"""
+        from payments.management.commands.convert_coins import ConvertCore, ConvertError
+        d1, d2, d3 = make_deposit(self.coin, 'new'), make_deposit(self.coin, 'new'), make_deposit(self.coin)
+        self.convert(d1)
+        self.convert(d3)
+        self.cmd.load_converted()
+        self.assertEqual(self.cmd.converted, {d1.id})
+        with self.assertNumQueries(0), self.assertRaises(ConvertError):
+            ConvertCore.validate_deposit(d1, converted=self.cmd.converted)
+
+    def test_mapped_counts(self):
+        """Mapped deposits are counted per destination coin, and funds_low is only reset for coins without any"""
+        make_deposit(self.coin, convert_to=self.dest_coin)
+        make_deposit(self.coin, convert_to=self.dest_coin)
+        make_deposit(self.dest_coin, convert_to=self.coin, status='new')
+        self.assertEqual(self.cmd.mapped_counts(), {'FAKEDESTCOIN': 2})
+
+        Coin.objects.update(funds_low=True)
+        self.cmd.reset_funds_low()
+        self.assertEqual(dict(Coin.objects.values_list('symbol', 'funds_low')),
+                         {'MOCKTESTCOIN': False, 'FAKEDESTCOIN': True})
+
+
+@override_settings(CONVERT_RETRY_DELAY=60, CONVERT_RETRY_MAX=300)
+class RetryBackoffTest(MockCoinTestCase):
+    """Tests for the conversion retry backoff of deposits and destination coins"""
+
+    def setUp(self):
+        from payments.management.commands.convert_coins import Command, ConvertCore
+        super().setUp()
+        self.cmd, self.core = Command(), ConvertCore
+        self.dep = make_deposit(self.coin, convert_to=self.dest_coin, convert_dest_address='someguy')
+
+    def due(self) -> List[int]:
+        return list(self.cmd.mapped_deposits().values_list('id', flat=True))
+
+    def test_retry_delay(self):
+        """The delay doubles after each failure, up to CONVERT_RETRY_MAX"""
+        delays = [self.core.retry_delay(n).total_seconds() for n in range(1, 6)]
+        self.assertEqual(delays, [60, 120, 240, 300, 300])
+
+    def test_defer_deposit(self):
+        """A deferred deposit isn't due until it's next attempt"""
+        self.core.defer_deposit(self.dep)
+        self.core.defer_deposit(self.dep)
+        self.dep.refresh_from_db()
+        self.assertEqual(self.dep.convert_attempts, 2)
+        self.assertAlmostEqual((self.dep.next_convert_attempt - timezone.now()).total_seconds(), 120, delta=5)
+        self.assertEqual(self.due(), [])
+        self.assertFalse(self.cmd.is_due(self.dep))
+
+        Deposit.objects.filter(id=self.dep.id).update(next_convert_attempt=timezone.now() - timedelta(seconds=1))
+        self.dep.refresh_from_db()
+        self.assertEqual(self.due(), [self.dep.id])
+        self.assertTrue(self.cmd.is_due(self.dep))
+
+    def test_paused_coin(self):
+        """Deposits to a paused destination coin aren't due until the coin's failures are reset"""
+        self.core.defer_coin(self.dest_coin)
+        self.assertEqual(self.due(), [])
+        self.assertFalse(self.cmd.is_due(Deposit.objects.get(id=self.dep.id)))
+
+        self.core.reset_coin_failures(self.dest_coin)
+        self.assertEqual(Coin.objects.get(symbol='FAKEDESTCOIN').convert_failures, 0)
+        self.assertEqual(self.due(), [self.dep.id])
+        self.assertTrue(self.cmd.is_due(Deposit.objects.get(id=self.dep.id)))
+
+    def test_send_failure(self):
+        """A failed send pauses the destination coin, even though the deposit's transaction is rolled back"""
+        from payments.coin_handlers.MockHandler.handlers import MockManager
+        from payments.management.commands.convert_coins import routing
+        CoinPair.objects.create(from_coin=self.coin, to_coin=self.dest_coin, exchange_rate=Decimal('1'))
+        routing.invalidate()
+        mgr = MockManager('FAKEDESTCOIN')
+        with patch('payments.management.commands.convert_coins.get_manager', return_value=mgr), \
+                patch.object(mgr, 'cached_health_test', return_value=True), \
+                patch.object(mgr, 'send', side_effect=RuntimeError('DeadAPIError')):
+            self.cmd.convert_queue([self.dep.id])
+        self.assertEqual(Deposit.objects.get(id=self.dep.id).status, 'err')
+        coin = Coin.objects.get(symbol='FAKEDESTCOIN')
+        self.assertEqual(coin.convert_failures, 1)
+        self.assertIsNotNone(coin.convert_retry_at)
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Responds with HTTP 503 to the first ``FlakyHandler.failures`` requests, then with HTTP 200"""
+
+    failures = 0
+    requests = 0
+
+    def do_GET(self):
+        FlakyHandler.requests += 1
+        code = 503 if FlakyHandler.requests <= FlakyHandler.failures else 200
+        self.send_response(code)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(HTTP_RETRIES=2, HTTP_BACKOFF=0, HTTP_TIMEOUT=30, HTTP_CONNECT_TIMEOUT=5)
+class HttpSessionTest(TestCase):
+    """Tests for the shared HTTP sessions in :mod:`payments.coin_handlers.base.http`"""
+
+    def setUp(self):
+        FlakyHandler.failures = FlakyHandler.requests = 0
+        self.server = HTTPServer(('127.0.0.1', 0), FlakyHandler)
+        self.url = 'http://127.0.0.1:{}/'.format(self.server.server_port)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_default_timeout(self):
+        """Requests without a timeout use the HTTP_* timeouts, and an explicit timeout is kept"""
+        from payments.coin_handlers.base.http import make_session
+        with patch('requests.Session.request') as request:
+            s = make_session()
+            s.get(self.url)
+            s.get(self.url, timeout=3)
+        self.assertEqual([c[1]['timeout'] for c in request.call_args_list], [(5, 30), 3])
+
+    def test_retries(self):
+        """Server errors are retried up to HTTP_RETRIES times"""
+        from payments.coin_handlers.base.http import make_session
+        FlakyHandler.failures = 2
+        self.assertEqual(make_session().get(self.url).status_code, 200)
+        self.assertEqual(FlakyHandler.requests, 3)
+
+        FlakyHandler.failures, FlakyHandler.requests = 3, 0
+        self.assertEqual(make_session().get(self.url).status_code, 503)
+        self.assertEqual(FlakyHandler.requests, 3)
+
+    def test_per_thread(self):
+        """Each thread re-uses it's own session"""
+        from payments.coin_handlers.base.http import http_session
+        other = []
+        t = threading.Thread(target=lambda: other.append(http_session()))
+        t.start()
+        t.join()
+        self.assertIs(http_session(), http_session())
+        self.assertIsNot(http_session(), other[0])
+
+
+class CoinReloadTest(TestCase):
+    """Tests for reloading only the changed coin's handlers (:func:`payments.coin_handlers.reload_coin`)"""
+
+    @patch('payments.coin_handlers.reload_coin')
+    def test_save(self, reload_coin):
+        """Coins only reload their handlers when they're created, deleted, or their handler config changes"""
+        make_coins('MOCKTESTCOIN')
+        reload_coin.assert_called_once_with('MOCKTESTCOIN')
+
+        c = Coin.objects.get(symbol='MOCKTESTCOIN')
+        c.funds_low = True
+        c.save()
+        c.display_name = 'Renamed'
+        c.save(update_fields=['funds_low'])
+        self.assertEqual(reload_coin.call_count, 1)
+
+        c.save()
+        c.delete()
+        self.assertEqual(reload_coin.call_count, 3)
+
+    @patch('payments.coin_handlers.reload_handlers')
+    @patch('payments.coin_handlers.reload_coin')
+    def test_refresh(self, reload_coin, reload_handlers):
+        """Changes made by other processes are picked up from the shared generation counter"""
+        from payments import coin_handlers as ch
+        key = ch.GENERATION_KEY
+        with patch.object(ch, 'handlers_loaded', True), patch.object(ch, 'generation', 5):
+            cache.set_many({key: 7, f'{key}:6': ['MOCKTESTCOIN'], f'{key}:7': ['FAKEDESTCOIN']})
+            self.assertTrue(ch.refresh_handlers())
+            self.assertEqual(set(reload_coin.call_args[0]), {'MOCKTESTCOIN', 'FAKEDESTCOIN'})
+            self.assertEqual(ch.generation, 7)
+            self.assertFalse(ch.refresh_handlers())
+
+            # The list of changes has expired, so the whole registry is reloaded
+            cache.set(key, 9)
+            cache.delete(f'{key}:8')
+            self.assertTrue(ch.refresh_handlers())
+            reload_handlers.assert_called_once_with()
+        cache.delete_many([key] + [f'{key}:{g}' for g in range(6, 10)])
+
+
+@patch('payments.coin_handlers.MigrationExecutor')
+@patch('payments.coin_handlers.MigrationRecorder')
+class SyncCacheTest(TestCase):
+    """Tests for the memoized migration check (:func:`payments.coin_handlers.is_database_synchronized`)"""
+
+    def setUp(self):
+        from payments import coin_handlers
+        self.ch = coin_handlers
+        self.ch.clear_sync_cache()
+
+    def tearDown(self):
+        self.ch.clear_sync_cache()
+
+    def check(self, recorder, applied) -> bool:
+        recorder.return_value.applied_migrations.return_value = set(applied)
+        return self.ch.is_database_synchronized('default')
+
+    def test_memo(self, recorder, executor):
+        """The migration plan is only re-built when the applied migrations change, or the memo is cleared"""
+        executor.return_value.migration_plan.return_value = []
+        self.assertTrue(self.check(recorder, [('payments', '0001')]))
+        self.assertTrue(self.check(recorder, [('payments', '0001')]))
+        self.assertEqual(executor.call_count, 1)
+
+        executor.return_value.migration_plan.return_value = ['0002']
+        self.assertFalse(self.check(recorder, [('payments', '0001'), ('auth', '0001')]))
+        self.assertEqual(executor.call_count, 2)
+
+        self.ch.clear_sync_cache()
+        self.check(recorder, [('payments', '0001'), ('auth', '0001')])
+        self.assertEqual(executor.call_count, 3)
+
+    def test_migrating(self, recorder, executor):
+        """The memo isn't used or stored while migrations are running"""
+        executor.return_value.migration_plan.return_value = []
+        with patch.object(self.ch, 'migrating', True):
+            self.check(recorder, [('payments', '0001')])
+            self.check(recorder, [('payments', '0001')])
+        self.assertEqual(executor.call_count, 2)
+        self.check(recorder, [('payments', '0001')])
+        self.assertEqual(executor.call_count, 3)
+
+    def test_migrate_command(self, recorder, executor):
+        """``migrate`` sets ``migrating`` while it runs, then clears the memo"""
+        from payments.management.commands.migrate import Command
+        self.ch._sync_state['default'] = (frozenset(), True)
+        seen = []
+        with patch('django.core.management.commands.migrate.Command.handle',
+                   side_effect=lambda *a, **kw: seen.append(self.ch.migrating)):
+            Command().handle()
+        self.assertEqual(seen, [True])
+        self.assertFalse(self.ch.migrating)
+        self.assertEqual(self.ch._sync_state, {})
+
+
+class CountingLoader:
+    """A stand-in loader class, which records each instantiation in ``CountingLoader.created``"""
+
+    provides = ['MOCKTESTCOIN', 'FAKEDESTCOIN']
+    created = []
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        CountingLoader.created.append(symbols)
+
+
+class HandlerEntryTest(TestCase):
+    """Tests for the lazily instantiated coin handler registry (:class:`payments.coin_handlers.HandlerEntry`)"""
+
+    def setUp(self):
+        CountingLoader.created = []
+
+    def test_lazy(self):
+        """Handlers are counted and named without being created, then created once on first access"""
+        from payments.coin_handlers import HandlerEntry
+        entry = HandlerEntry()
+        entry.add('loaders', 'CountingLoader', lambda: CountingLoader(symbols=['MOCKTESTCOIN']))
+        self.assertEqual((entry.count('loaders'), entry.names('loaders')), (1, ['CountingLoader']))
+        self.assertEqual(CountingLoader.created, [])
+
+        self.assertEqual(len(entry['loaders']), 1)
+        self.assertIs(entry.get('loaders')[0], entry['loaders'][0])
+        self.assertEqual(CountingLoader.created, [['MOCKTESTCOIN']])
+        self.assertEqual(entry.count('loaders'), 1)
+
+    def test_failed_factory(self):
+        """A handler which fails to instantiate is logged and dropped, without affecting the others"""
+        from payments.coin_handlers import HandlerEntry
+        entry = HandlerEntry()
+        entry.add('managers', 'Broken', lambda: 1 / 0)
+        entry.add('managers', 'CountingLoader', lambda: CountingLoader(symbols=['MOCKTESTCOIN']))
+        self.assertEqual([type(h).__name__ for h in entry['managers']], ['CountingLoader'])
+        self.assertEqual(entry.count('managers'), 1)
+
+    def test_failed_get(self):
+        """get_loader raises a clear error for a loader which failed to initialise, and has_loader then says no"""
+        from payments import coin_handlers as ch
+        from payments.coin_handlers.base.exceptions import CoinHandlerException
+        entry = ch.HandlerEntry()
+        entry.add('loaders', 'Broken', lambda: 1 / 0)
+        with patch.object(ch, 'handlers', {'MOCKTESTCOIN': entry}), patch.object(ch, 'handlers_loaded', True):
+            self.assertTrue(ch.has_loader('MOCKTESTCOIN'))
+            with self.assertRaises(CoinHandlerException):
+                ch.get_loader('MOCKTESTCOIN')
+            self.assertFalse(ch.has_loader('MOCKTESTCOIN'))
+
+    def test_lock_per_entry(self):
+        """A stuck handler constructor only blocks it's own coin, not the handlers of other coins"""
+        from payments.coin_handlers import HandlerEntry
+        release = threading.Event()
+        stuck, other = HandlerEntry(), HandlerEntry()
+        stuck.add('loaders', 'Stuck', lambda: release.wait(10))
+        other.add('loaders', 'CountingLoader', lambda: CountingLoader(symbols=['FAKEDESTCOIN']))
+        t = threading.Thread(target=lambda: stuck['loaders'], daemon=True)
+        t.start()
+        try:
+            done = threading.Event()
+            threading.Thread(target=lambda: (other['loaders'], done.set()), daemon=True).start()
+            self.assertTrue(done.wait(2))
+            self.assertEqual(CountingLoader.created, [['FAKEDESTCOIN']])
+        finally:
+            release.set()
+            t.join()
+
+    def test_add_handler(self):
+        """add_handler registers only the requested symbols, and get_loader creates the handler on first use"""
+        from payments import coin_handlers as ch
+        with patch.object(ch, 'handlers', {}), patch.object(ch, 'handlers_loaded', True):
+            ch.add_handler(CountingLoader, 'loaders', symbols={'MOCKTESTCOIN'})
+            self.assertEqual(list(ch.handlers.keys()), ['MOCKTESTCOIN'])
+            self.assertTrue(ch.has_loader('MOCKTESTCOIN'))
+            self.assertEqual(CountingLoader.created, [])
+            self.assertEqual(ch.get_loader('MOCKTESTCOIN').symbols, ['MOCKTESTCOIN'])
+            ch.get_loader('MOCKTESTCOIN')
+        self.assertEqual(CountingLoader.created, [['MOCKTESTCOIN']])
+
+
+class SteemAssetTest(TestCase):
+    """Tests that Steem transfers are only imported for the coin matching their asset, using the asset cache"""
+
+    def setUp(self):
+        from payments.coin_handlers.Steem.SteemLoader import SteemLoader
+        make_coins('STEEM', 'SBD', coin_type='steembase', our_account='someguy')
+        self.loader = SteemLoader(symbols=['STEEM', 'SBD'])
+
+    def test_legacy_amount_other_asset(self):
+        """A legacy "1.000 SBD" transfer to an account shared by STEEM and SBD is only imported as SBD"""
+        tx = steem_transfer('1.000 SBD')
+        self.assertIsNone(self.loader.clean_tx(tx, 'STEEM', 'someguy'))
+        self.assertEqual(self.loader.clean_tx(tx, 'SBD', 'someguy')['amount'], Decimal('1.000'))
+
+    def test_nai_amount(self):
+        tx = steem_transfer(dict(amount='1500', precision=3, nai='@@000000021'))
+        self.assertIsNone(self.loader.clean_tx(tx, 'SBD', 'someguy'))
+        self.assertEqual(self.loader.clean_tx(tx, 'STEEM', 'someguy')['amount'], Decimal('1.5'))
+
+    def test_cache_lookups(self):
+        """Seeded assets never touch the RPC, and unknown assets are only looked up once"""
+        from payments.coin_handlers.Steem.AssetCache import AssetCache
+        cache = AssetCache('test', [dict(asset='@@000000021', symbol='STEEM', precision=3)])
+        no_rpc = lambda: self.fail('RPC should not be used for a cached asset')
+        self.assertEqual(cache.by_nai('@@000000021', no_rpc), ('STEEM', 3))
+        self.assertEqual(cache.precision('STEEM', no_rpc), 3)
+        with patch('payments.coin_handlers.Steem.AssetCache.Asset') as asset:
+            asset.return_value.configure_mock(asset='@@000000099', symbol='ABC', precision=4)
+            self.assertEqual(cache.precision('ABC', lambda: None), 4)
+            self.assertEqual(cache.by_nai('@@000000099', no_rpc), ('ABC', 4))
+            self.assertEqual(asset.call_count, 1)
+
+
+class FakeBlock(dict):
+    """A minimal stand-in for a Beem :class:`beem.block.Block`, as used by :class:`.SteemStreamMixin`"""
+
+    def __init__(self, block_num: int, ops: list):
+        super().__init__(timestamp='2019-06-01T10:00:00')
+        self.block_num = block_num
+        self.transactions = [dict(transaction_id=f'tx{block_num}_{n}', operations=[op]) for n, op in enumerate(ops)]
+
+
+class FakeBlockchain:
+    """A stand-in for :class:`beem.blockchain.Blockchain`, serving ``FakeBlockchain.blocks_by_num``"""
+
+    head = 100
+    blocks_by_num = {}   # type: Dict[int, FakeBlock]
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_current_block_num(self):
+        return self.head
+
+    def blocks(self, start, stop, max_batch_size=None):
+        for num in range(start, stop + 1):
+            yield self.blocks_by_num.get(num, FakeBlock(num, []))
+
+
+@patch('payments.coin_handlers.Steem.SteemStreamMixin.Blockchain', FakeBlockchain)
+class SteemStreamTest(TestCase):
+    """Tests for the irreversible block streaming mode of the Steem loader (``"load_mode": "blocks"``)"""
+
+    def setUp(self):
+        from payments.coin_handlers.Steem.SteemLoader import SteemLoader
+        from payments.coin_handlers.Steem.SteemStreamMixin import SteemStreamMixin
+        SteemStreamMixin._block_cache = {}
+        js = '{"load_mode": "blocks", "stream_start_blocks": 5}'
+        self.coins = make_coins('STEEM', 'SBD', coin_type='steembase', our_account='someguy', setting_json=js)
+        FakeBlockchain.blocks_by_num = {
+            97: FakeBlock(97, [
+                ['transfer', {'from': 'alice', 'to': 'someguy', 'amount': '1.000 SBD', 'memo': 'x'}],
+                ['transfer', {'from': 'bob', 'to': 'someguy', 'amount': '2.000 STEEM', 'memo': 'y'}],
+                ['transfer', {'from': 'bob', 'to': 'someoneelse', 'amount': '3.000 STEEM', 'memo': 'z'}],
+            ]),
+        }
+        self.loader = SteemLoader(symbols=['STEEM', 'SBD'])
+        self.loader.get_rpc = lambda symbol: None
+
+    def test_shared_account_assets(self):
+        """Each transfer to an account shared by STEEM and SBD is only yielded for the coin of it's asset"""
+        txs = list(self.loader.list_txs())
+        self.assertEqual(sorted((t['coin'], t['amount'], t['from_account']) for t in txs), [
+            ('SBD', Decimal('1.000'), 'alice'), ('STEEM', Decimal('2.000'), 'bob'),
+        ])
+
+    def test_checkpoint(self):
+        """The checkpoint moves to the last block read, and the next run only reads newer blocks"""
+        list(self.loader.list_txs())
+        self.loader.save_checkpoints()
+        self.assertEqual(self.loader.get_checkpoint(self.coins['STEEM']).last_block, 100)
+        self.assertEqual(list(self.loader.list_txs()), [])
+
+
+class CheckpointTest(MockCoinTestCase):
+    """Tests for the scan checkpoint methods of :class:`.BaseLoader`"""
+
+    def test_round_trip(self):
+        """Positions are only written by save_checkpoints, and a new loader resumes from them"""
+        loader = MockLoader(symbols=['MOCKTESTCOIN'])
+        self.assertIsNone(loader.get_checkpoint(self.coin).last_index)
+        loader.set_checkpoint(self.coin, last_block=10)
+        loader.set_checkpoint(self.coin, last_index=5)
+        self.assertIsNone(ScanCheckpoint.objects.get(coin=self.coin, loader='MockLoader').last_index)
+
+        loader.save_checkpoints()
+        cp = MockLoader(symbols=['MOCKTESTCOIN']).get_checkpoint(self.coin)
+        self.assertEqual((cp.last_index, cp.last_block), (5, 10))
+
+    def test_skip(self):
+        """Pending positions of skipped coins are discarded"""
+        loader = MockLoader(symbols=['MOCKTESTCOIN'])
+        loader.set_checkpoint(self.coin, last_index=5)
+        loader.save_checkpoints(skip=['MOCKTESTCOIN'])
+        loader.save_checkpoints()
+        self.assertIsNone(MockLoader(symbols=['MOCKTESTCOIN']).get_checkpoint(self.coin).last_index)
+
+
+class FakeSteemAccount:
+    """A stand-in for :class:`beem.account.Account`, serving the transfers in ``FakeSteemAccount.history``"""
+
+    history = []    # type: List[dict]
+    stops = []      # type: List[int]
+
+    def __init__(self, name, steem_instance=None):
+        self.name = name
+
+    def get_account_history(self, index, limit, only_ops=None):
+        return iter(self.history[-limit:])
+
+    def history_reverse(self, stop=None, use_block_num=True, only_ops=None):
+        self.stops.append(stop)
+        return (tx for tx in reversed(self.history) if tx['index'] >= stop)
+
+    @classmethod
+    def add_transfers(cls, count: int, asset='STEEM'):
+        for _ in range(count):
+            idx = len(cls.history)
+            cls.history.append(dict(
+                type='transfer', index=idx, trx_id=f'steemtx{idx}', timestamp='2019-06-01T10:00:00',
+                amount=f'1.000 {asset}', memo='', to='someguy', **{'from': 'alice'}
+            ))
+
+
+@patch('payments.coin_handlers.Steem.SteemLoader.Account', FakeSteemAccount)
+class SteemCheckpointTest(TestCase):
+    """Tests for the account history checkpoints of the Steem loader"""
+
+    def setUp(self):
+        FakeSteemAccount.history, FakeSteemAccount.stops = [], []
+        self.coin = make_coins('STEEM', coin_type='steembase', our_account='someguy')['STEEM']
+
+    def _run(self) -> list:
+        from payments.coin_handlers.Steem.SteemLoader import SteemLoader
+        loader = SteemLoader(symbols=['STEEM'])
+        loader.get_rpc = lambda symbol: None
+        txs = [t['txid'] for t in loader.list_txs()]
+        loader.save_checkpoints()
+        return txs
+
+    def test_resume(self):
+        """The checkpoint holds the highest history index, and the next run only walks back to it"""
+        FakeSteemAccount.add_transfers(5)
+        self.assertEqual(len(self._run()), 5)
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='SteemLoader').last_index, 4)
+
+        FakeSteemAccount.add_transfers(3)
+        self.assertEqual(self._run(), ['steemtx7', 'steemtx6', 'steemtx5'])
+        self.assertEqual(FakeSteemAccount.stops, [5])
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='SteemLoader').last_index, 7)
+
+    def test_interrupted(self):
+        """A scan which stops part way through doesn't move the checkpoint"""
+        from payments.coin_handlers.Steem.SteemLoader import SteemLoader
+        FakeSteemAccount.add_transfers(5)
+        loader = SteemLoader(symbols=['STEEM'])
+        loader.get_rpc = lambda symbol: None
+        txs = loader.list_txs()
+        next(txs)
+        txs.close()
+        loader.save_checkpoints()
+        self.assertIsNone(loader.get_checkpoint(self.coin).last_index)
+
+
+@patch('payments.coin_handlers.Hive.HiveLoader.Account', FakeSteemAccount)
+class HiveCheckpointTest(TestCase):
+    """Tests for the account history checkpoints of the Hive loader"""
+
+    def setUp(self):
+        FakeSteemAccount.history, FakeSteemAccount.stops = [], []
+        self.coin = make_coins('HIVE', coin_type='hivebase', our_account='someguy')['HIVE']
+
+    def _run(self) -> list:
+        from payments.coin_handlers.Hive.HiveLoader import HiveLoader
+        loader = HiveLoader(symbols=['HIVE'])
+        loader.get_rpc = lambda symbol: None
+        txs = [t['txid'] for t in loader.list_txs()]
+        loader.save_checkpoints()
+        return txs
+
+    def test_resume(self):
+        """The checkpoint holds the highest history index, and the next run only walks back to it"""
+        FakeSteemAccount.add_transfers(5, asset='HIVE')
+        self.assertEqual(len(self._run()), 5)
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='HiveLoader').last_index, 4)
+
+        FakeSteemAccount.add_transfers(3, asset='HIVE')
+        self.assertEqual(self._run(), ['steemtx7', 'steemtx6', 'steemtx5'])
+        self.assertEqual(FakeSteemAccount.stops, [5])
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='HiveLoader').last_index, 7)
+
+
+class FakeBtsAccount(dict):
+    """A stand-in for :class:`bitshares.account.Account`, serving the transfers in ``FakeBtsAccount.ops``"""
+
+    ops = []     # type: List[dict]
+    lasts = []   # type: List[int]
+
+    def __init__(self, name):
+        super().__init__(id='1.2.100')
+        self.name = name
+
+    def history(self, only_ops=None, limit=100, last=0):
+        self.lasts.append(last)
+        return (op for op in reversed(self.ops) if int(op['id'].split('.')[2]) > last)
+
+    @classmethod
+    def add_transfers(cls, count: int):
+        for _ in range(count):
+            seq = len(cls.ops) + 1
+            cls.ops.append(dict(id=f'1.11.{seq}', block_num=1000 + seq, op=[0, {
+                'from': '1.2.5', 'to': '1.2.100', 'amount': {'asset_id': '1.3.0', 'amount': 100000}
+            }]))
+
+
+class BitsharesCheckpointTest(TestCase):
+    """Tests for the account history sequence checkpoints of the Bitshares loader"""
+
+    def setUp(self):
+        FakeBtsAccount.ops, FakeBtsAccount.lasts = [], []
+        self.coin = make_coins('BTS', coin_type='bitshares', our_account='someguy')['BTS']
+        cache.set('btsasset:1.3.0', dict(symbol='BTS', precision=5))
+        cache.set('btsacc:1.2.5', 'alice')
+
+    def tearDown(self):
+        cache.delete_many(['btsasset:1.3.0', 'btsacc:1.2.5'])
+
+    def _run(self, missing=()) -> list:
+        from payments.coin_handlers.Bitshares.BitsharesLoader import BitsharesLoader
+        loader = BitsharesLoader(symbols=['BTS'])
+        loader.get_account_obj = FakeBtsAccount
+        loader.get_block_timestamps = lambda nums: {n: 1559383200 for n in nums if n not in missing}
+        txs = [t['txid'] for t in loader.list_txs()]
+        loader.save_checkpoints()
+        return txs
+
+    def test_resume(self):
+        """The checkpoint holds the highest operation sequence, and the next run only loads newer operations"""
+        FakeBtsAccount.add_transfers(3)
+        self.assertEqual(len(self._run()), 3)
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='BitsharesLoader').last_index, 3)
+
+        FakeBtsAccount.add_transfers(2)
+        self.assertEqual(self._run(), ['1.11.5', '1.11.4'])
+        self.assertEqual(FakeBtsAccount.lasts, [0, 3])
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='BitsharesLoader').last_index, 5)
+
+    def test_missing_block_time(self):
+        """A deposit whose block timestamp can't be loaded is skipped, and the checkpoint is held below it"""
+        FakeBtsAccount.add_transfers(4)
+        self.assertEqual(self._run(missing={1002, 1003}), ['1.11.4', '1.11.1'])
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='BitsharesLoader').last_index, 1)
+
+        self.assertEqual(self._run(), ['1.11.4', '1.11.3', '1.11.2'])
+        self.assertEqual(FakeBtsAccount.lasts, [0, 1])
+        self.assertEqual(ScanCheckpoint.objects.get(coin=self.coin, loader='BitsharesLoader').last_index, 4)
+
+
+class FakeBtsRPC:
+    """A stand-in for the Bitshares RPC, serving a block header for every block except those in ``missing``"""
+
+    def __init__(self, batches=True, missing=()):
+        self.batches, self.missing = batches, set(missing)
+        self.calls = []
+
+    def header(self, n: int):
+        return None if n in self.missing else {'timestamp': '2019-06-01T10:00:00'}
+
+    def get_block_header_batch(self, nums):
+        self.calls.append(('batch', list(nums)))
+        if not self.batches:
+            raise RuntimeError('get_block_header_batch is not supported')
+        return [[n, self.header(n)] for n in nums]
+
+    def get_block_header(self, n):
+        self.calls.append(('single', n))
+        return self.header(n)
+
+
+class BitsharesBlockTimeTest(TestCase):
+    """Tests for the cached, batched Bitshares block timestamp lookups of :class:`.BitsharesMixin`"""
+
+    def setUp(self):
+        from graphenecommon.utils import parse_time
+        from payments.coin_handlers.Bitshares.BitsharesMixin import BitsharesMixin
+        BitsharesMixin._block_times.clear()
+        self.mixin = BitsharesMixin()
+        self.ts = int(parse_time('2019-06-01T10:00:00').timestamp())
+
+    def tearDown(self):
+        self.mixin._block_times.clear()
+        cache.clear()
+
+    def use_rpc(self, rpc: FakeBtsRPC) -> FakeBtsRPC:
+        self.mixin._bitshares = type('FakeBitShares', (), {'rpc': rpc})()
+        return rpc
+
+    def test_batches(self):
+        """Headers are loaded in batches, then served from memory, then from the Django cache"""
+        rpc = self.use_rpc(FakeBtsRPC())
+        nums = list(range(1, 251))
+        self.assertEqual(self.mixin.get_block_timestamps(nums), {n: self.ts for n in nums})
+        self.assertEqual([len(c[1]) for c in rpc.calls], [100, 100, 50])
+
+        rpc.calls = []
+        self.mixin.get_block_timestamps(nums)
+        self.mixin._block_times.clear()
+        self.assertEqual(self.mixin.get_block_timestamps(nums), {n: self.ts for n in nums})
+        self.assertEqual(rpc.calls, [])
+
+    def test_fallback(self):
+        """Nodes without batch support are queried per block, and missing blocks are left out"""
+        rpc = self.use_rpc(FakeBtsRPC(batches=False, missing=[2]))
+        self.assertEqual(self.mixin.get_block_timestamps([1, 2, 3]), {1: self.ts, 3: self.ts})
+        self.assertEqual(rpc.calls, [('batch', [1, 2, 3]), ('single', 1), ('single', 2), ('single', 3)])
+
+    @override_settings(BITSHARES_BLOCK_CACHE_SIZE=5)
+    def test_lru_size(self):
+        """The in-memory cache only keeps the most recently used BITSHARES_BLOCK_CACHE_SIZE blocks"""
+        self.use_rpc(FakeBtsRPC())
+        self.mixin.get_block_timestamps(range(1, 9))
+        self.mixin.get_block_timestamps([1])
+        self.assertEqual(list(self.mixin._block_times.keys()), [5, 6, 7, 8, 1])
+
+
+class ConvertQueueTest(MockCoinTestCase):
+    def setUp(self):
+        from payments.management.commands.convert_coins import Command
+        super().setUp()
+        self.cmd = Command()
+        self.dep = make_deposit(self.coin, convert_to=self.dest_coin, convert_dest_address='someguy')
+
+    def test_skip_locked(self):
+        """SKIP LOCKED is only used where the database supports it"""
+        with patch.object(connection.features, 'has_select_for_update_skip_locked', True):
+            self.assertTrue(self.cmd.locked_deposits().query.select_for_update_skip_locked)
+        with patch.object(connection.features, 'has_select_for_update_skip_locked', False):
+            q = self.cmd.locked_deposits().query
+            self.assertTrue(q.select_for_update)
+            self.assertFalse(q.select_for_update_skip_locked)
+
+    def test_convert_queue(self):
+        """Only deposits which are still mapped, and due for a conversion attempt are converted"""
+        later = timezone.now() + timedelta(hours=1)
+        waiting = make_deposit(self.coin, convert_to=self.dest_coin, next_convert_attempt=later)
+        done = make_deposit(self.coin, status='conv', convert_to=self.dest_coin)
+        for feature in (True, False):
+            with patch.object(connection.features, 'has_select_for_update_skip_locked', feature), \
+                    patch.object(self.cmd, 'process_mapped') as process:
+                self.cmd.convert_queue([self.dep.id, waiting.id, done.id])
+                self.assertEqual([c[0][0].id for c in process.call_args_list], [self.dep.id])
+
+
+class ConvertWorkersTest(TransactionTestCase):
+    def test_workers(self):
+        """With multiple workers, each destination coin's deposits are converted in order by one worker thread"""
+        from payments.management.commands.convert_coins import Command
+        coins = make_coins('MOCKTESTCOIN', 'FAKEDESTCOIN', 'OTHERDESTCOIN')
+        deps = {
+            sym: [make_deposit(coins['MOCKTESTCOIN'], convert_to=coins[sym]).id for _ in range(3)]
+            for sym in ('FAKEDESTCOIN', 'OTHERDESTCOIN')
+        }
+        cmd, converted, lock = Command(), {}, threading.Lock()
+
+        def process_mapped(d, dry=False):
+            with lock:
+                converted.setdefault(d.convert_to_id, []).append((d.id, threading.current_thread().name))
+
+        with patch.object(cmd, 'process_mapped', process_mapped), patch.object(cmd, 'reset_funds_low'):
+            cmd.handle(coins=None, dry=True, workers=2)
+
+        for sym, ids in deps.items():
+            self.assertEqual([i for i, _ in converted[sym]], ids)
+            self.assertEqual(len({t for _, t in converted[sym]}), 1)
+            self.assertNotEqual(converted[sym][0][1], threading.current_thread().name)
+
+
+class FakeClient:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class RPCPoolTest(TestCase):
+    def setUp(self):
+        RPCPool.clear_pools()
+        self.nodes = ['https://a.example.com', 'https://b.example.com', 'https://c.example.com']
+        self.pool = RPCPool.get_pool(
+            'test:NODES', self.nodes, FakeClient, probe=None, min_calls=3, max_error_rate=0.5, eject_time=60
+        )
+
+    def tearDown(self):
+        RPCPool.clear_pools()
+
+    def test_ranking(self):
+        """Nodes are ranked by their average latency, and the fastest node's client is returned"""
+        for url, latency in zip(self.nodes, (0.5, 0.1, 0.3)):
+            self.pool.record(url, latency=latency)
+        self.assertEqual([n.url for n in self.pool.ranked()], [self.nodes[1], self.nodes[2], self.nodes[0]])
+        self.assertEqual(self.pool.get().url, self.nodes[1])
+
+    def test_ejection(self):
+        """A node is ejected once it's error rate is too high, and ejected again for twice as long"""
+        a = self.pool.nodes[0]
+        for _ in range(3):
+            self.pool.record(a.url, error=True)
+        self.assertTrue(a.ejected)
+        self.assertNotIn(a, self.pool.ranked())
+        self.assertAlmostEqual(a.ejected_until - time.time(), 60, delta=2)
+        # Re-admitted with a clean error history once the ejection has passed
+        a.ejected_until = time.time() - 1
+        self.assertIn(a, self.pool.ranked())
+        self.assertEqual(a.error_rate, 0)
+        for _ in range(3):
+            self.pool.record(a.url, error=True)
+        self.assertAlmostEqual(a.ejected_until - time.time(), 120, delta=2)
+
+    def test_all_ejected(self):
+        """If every node is ejected, the node which will be re-admitted soonest is used"""
+        for n, t in zip(self.pool.nodes, (300, 100, 200)):
+            n.ejected_until = time.time() + t
+        self.assertEqual(self.pool.best_url(), self.nodes[1])
+
+    def test_call_failover(self):
+        """call() records the error, and retries the call on the next node"""
+        def fn(c: FakeClient):
+            if c.url == self.nodes[0]:
+                raise ConnectionError('node is down')
+            return c.url
+        self.assertEqual(self.pool.call(fn), self.nodes[1])
+        self.assertEqual(self.pool.nodes[0].error_rate, 1)
+
+    def test_tracked(self):
+        """Errors from calls made with a client from get() are recorded, except for ignored exceptions"""
+        client = self.pool.get()
+        with self.assertRaises(KeyError), RPCPool.tracked(client, ignore=(KeyError,)):
+            raise KeyError('account not found')
+        with self.assertRaises(ConnectionError), RPCPool.tracked(client):
+            raise ConnectionError('node is down')
+        with RPCPool.tracked(client):
+            pass
+        node = self.pool.nodes[0]
+        self.assertEqual(list(node.errors), [False, True, False])
+        with self.assertRaises(ConnectionError):
+            list(RPCPool.tracked_iter(client, self._failing_iter()))
+        # 2 of the 4 calls failed, so the node is ejected
+        self.assertTrue(node.ejected)
+        # Clients which don't belong to a pool are ignored
+        with RPCPool.tracked(FakeClient('https://other.example.com')):
+            pass
+
+    @staticmethod
+    def _failing_iter():
+        yield 1
+        raise ConnectionError('node is down')
+
+    def test_probe_background(self):
+        """Probes run in the background, and a node which doesn't answer in time counts as an error"""
+        release = threading.Event()
+
+        def probe(c: FakeClient):
+            if c.url == self.nodes[0]:
+                release.wait(5)
+
+        pool = RPCPool(self.nodes, FakeClient, probe=probe, probe_timeout=0.2, min_calls=1)
+        start = time.time()
+        self.assertEqual(pool.get().url, self.nodes[0])
+        self.assertLess(time.time() - start, 0.1)
+        self.assertFalse(pool.probe_async())    # Already running, or done
+        for _ in range(50):
+            if not pool._probing:
+                break
+            time.sleep(0.05)
+        release.set()
+        self.assertTrue(pool.nodes[0].ejected)
+        self.assertEqual(sorted(n.url for n in pool.ranked()), self.nodes[1:])
+
+
+class RunConverterTest(MockCoinTestCase):
+    def setUp(self):
+        from payments.management.commands.run_converter import Command
+        super().setUp()
+        self.cmd = Command()
+
+    def run_daemon(self, iterations: int, **options):
+        """Runs the daemon's main loop for ``iterations`` iterations, without sleeping between them"""
+        def wait(timeout=None):
+            if self.cmd.iteration >= iterations:
+                self.cmd._stop.set()
+
+        opts = dict(coins=None, interval=60, sweep=3600, heartbeat=None, dry=True, **options)
+        with patch.object(self.cmd._stop, 'wait', wait), patch('signal.signal'):
+            self.cmd.handle(**opts)
+
+    def test_shortfalls(self):
+        """Shortfalls from the polls of every iteration are applied before the budget is replaced, not only on sweeps"""
+        applied = []
+
+        def poll_coin(coin, interval, dry=False, timeout=None):
+            self.cmd.converter.budget.shortfall[coin.symbol] = Decimal('1')
+
+        def apply_shortfalls():
+            budget = self.cmd.converter.budget
+            applied.append((self.cmd.iteration, budget, dict(budget.shortfall)))
+
+        self.cmd.last_sweep = time.time()
+        with patch.object(self.cmd, 'poll_coin', poll_coin), \
+                patch.object(self.cmd.converter, 'apply_shortfalls', apply_shortfalls):
+            self.run_daemon(2)
+
+        self.assertEqual([a[0] for a in applied], [1, 2])
+        self.assertIsNot(applied[0][1], applied[1][1])
+        self.assertEqual(applied[0][2], {'MOCKTESTCOIN': Decimal('1'), 'FAKEDESTCOIN': Decimal('1')})
+
+    def test_load_timeout(self):
+        """A coin stuck loading is abandoned at the timeout, and isn't loaded again until the stuck thread finishes"""
+        release, calls = threading.Event(), []
+
+        def load_txs(symbol, deadline=None):
+            calls.append(symbol)
+            release.wait(10)
+            return 0
+
+        try:
+            with patch.object(self.cmd.loader, 'load_txs', load_txs):
+                start = time.time()
+                self.cmd.poll_coin(self.coin, 60, dry=True, timeout=0.2)
+                self.assertLess(time.time() - start, 3)
+                self.cmd.poll_coin(self.coin, 60, dry=True, timeout=0.2)
+        finally:
+            release.set()
+        st = self.cmd.coin_state['MOCKTESTCOIN']
+        self.assertEqual(calls, ['MOCKTESTCOIN'])
+        self.assertEqual(st['failures'], 2)
+        self.assertIn('LoadTimeout', st['last_error'])
+
+    def test_coin_map_refresh(self):
+        """The loader's coin map is replaced every iteration, so it never serves stale coins"""
+        stale = Coin.objects.get(symbol='MOCKTESTCOIN')
+        self.cmd.loader.coin_map = {'MOCKTESTCOIN': stale}
+        Coin.objects.filter(symbol='MOCKTESTCOIN').update(our_account='newaccount')
+        self.cmd.last_sweep = time.time()
+        with patch.object(self.cmd, 'poll_coin'):
+            self.run_daemon(1)
+        self.assertEqual(self.cmd.loader.get_coin('MOCKTESTCOIN').our_account, 'newaccount')
+
+
+class LoadTxsTest(MockCoinTestCase):
+    def setUp(self):
+        from payments.management.commands.load_txs import Command
+        super().setUp()
+        self.loader = PrefetchMockLoader(symbols=['MOCKTESTCOIN'])
+        self.loader.add_fake_txs(25)
+        for i, tx in enumerate(MockLoader.fake_txs):
+            tx['tx_timestamp'] = timezone.make_aware(datetime(2019, 6, 1) - timedelta(minutes=i))
+        self.txs = list(MockLoader.fake_txs)
+        self.cmd = Command()
+        self.cmd.BATCH = 10
+
+    def load(self) -> int:
+        """Runs ``load_txs`` for the mock coin, using only ``self.loader``"""
+        with patch('payments.management.commands.load_txs.has_loader', return_value=True), \
+                patch('payments.management.commands.load_txs.get_loaders', return_value=[self.loader]):
+            return self.cmd.load_txs('MOCKTESTCOIN')
+
+    def checkpoint(self) -> ScanCheckpoint:
+        return ScanCheckpoint.objects.filter(coin=self.coin, loader='PrefetchMockLoader').first()
+
+    def test_import(self):
+        """All transactions are stored, and the checkpoint moves to the newest TX"""
+        self.assertEqual(self.load(), 25)
+        self.assertEqual(Deposit.objects.filter(coin=self.coin).count(), 25)
+        self.assertEqual(self.checkpoint().last_txid, self.txs[0]['txid'])
+
+    def test_failed_row(self):
+        """If a row fails to save, the coin's checkpoint is held, and the next run stores the missing TX"""
+        bad, save = self.txs[12]['txid'], Deposit.save
+
+        def fail_bad(dep, *args, **kwargs):
+            if dep.txid == bad:
+                raise ValueError('bad row')
+            return save(dep, *args, **kwargs)
+
+        with patch.object(Deposit.objects, 'bulk_create', side_effect=ValueError('bulk insert failed')), \
+                patch.object(Deposit, 'save', fail_bad):
+            self.assertEqual(self.load(), 24)
+        self.assertFalse(Deposit.objects.filter(txid=bad).exists())
+        self.assertIsNone(self.checkpoint().last_txid)
+
+        self.loader = PrefetchMockLoader(symbols=['MOCKTESTCOIN'])
+        self.assertEqual(self.load(), 1)
+        self.assertTrue(Deposit.objects.filter(txid=bad).exists())
+        self.assertEqual(self.checkpoint().last_txid, self.txs[0]['txid'])
+
+    def test_resume_after_timeout(self):
+        """A run which times out part way through doesn't move the checkpoint, and the next run imports the rest"""
+        from payments.management.commands.load_txs import LoadTimeout
+        self.loader.delay = 0.1
+        with self.assertRaises(LoadTimeout), \
+                patch('payments.management.commands.load_txs.has_loader', return_value=True), \
+                patch('payments.management.commands.load_txs.get_loaders', return_value=[self.loader]):
+            self.cmd.load_txs('MOCKTESTCOIN', deadline=time.time() + 0.05)
+        self.assertEqual(Deposit.objects.filter(coin=self.coin).count(), 10)
+        cp = self.checkpoint()
+        self.assertEqual((cp.last_txid, cp.complete), (None, False))
+
+        self.loader = PrefetchMockLoader(symbols=['MOCKTESTCOIN'])
+        self.assertEqual(self.load(), 15)
+        self.assertEqual(Deposit.objects.filter(coin=self.coin).count(), 25)
+        self.assertEqual(self.checkpoint().last_txid, self.txs[0]['txid'])
+
+    def test_hung_coin(self):
+        """A coin stuck on an RPC call is abandoned at it's timeout, without holding up the other coins"""
+        release = threading.Event()
+
+        def load_worker(symbol, timeout=None):
+            if symbol == 'MOCKTESTCOIN':
+                release.wait(10)
+            return 3
+
+        start = time.time()
+        try:
+            with patch.object(self.cmd, '_load_worker', load_worker):
+                results, errors = self.cmd.load_parallel(['MOCKTESTCOIN', 'FAKEDESTCOIN'], workers=1, timeout=0.2)
+        finally:
+            release.set()
+        self.assertLess(time.time() - start, 3)
+        self.assertEqual(results, {'FAKEDESTCOIN': 3})
+        self.assertIn('LoadTimeout', errors['MOCKTESTCOIN'])
+
+
+class RoutingIndexTest(MockCoinTestCase):
+    def setUp(self):
+        from payments.management.commands.convert_coins import ConvertCore, routing
+        super().setUp()
+        self.core, self.routing = ConvertCore, routing
+        CoinPair.objects.create(from_coin=self.coin, to_coin=self.dest_coin, exchange_rate=Decimal('1'))
+        self.routing.invalidate()
+
+    def edit_coin(self, symbol: str, **fields):
+        """Saves ``fields`` onto a fresh instance of the coin, like the admin panel would"""
+        c = Coin.objects.get(symbol=symbol)
+        for k, v in fields.items():
+            setattr(c, k, v)
+        c.save()
+
+    def test_defer_coin(self):
+        """Deferring a cached coin doesn't modify it, and doesn't overwrite changes made elsewhere"""
+        cached = self.routing.get_coin('FAKEDESTCOIN')
+        self.edit_coin('FAKEDESTCOIN', display_name='Edited')
+        self.core.defer_coin(cached)
+        self.core.defer_coin(cached)
+        c = Coin.objects.get(symbol='FAKEDESTCOIN')
+        self.assertEqual((c.display_name, c.convert_failures), ('Edited', 2))
+        self.assertGreater(c.convert_retry_at, timezone.now())
+        self.assertEqual((cached.convert_failures, cached.convert_retry_at), (0, None))
+        self.core.reset_coin_failures(cached)
+        c = Coin.objects.get(symbol='FAKEDESTCOIN')
+        self.assertEqual((c.display_name, c.convert_failures, c.convert_retry_at), ('Edited', 0, None))
+
+    @patch('payments.management.commands.convert_coins.render_to_string', return_value='')
+    @patch('payments.management.commands.convert_coins.mail_admins')
+    def test_notify_low_bal(self, mail_admins, render):
+        """Low balance notifications use the coin's current state, and only write the low balance fields"""
+        pair = self.routing.get_pair('MOCKTESTCOIN', 'FAKEDESTCOIN')
+        self.edit_coin('FAKEDESTCOIN', display_name='Edited', notify_low_funds=True)
+        for _ in range(2):
+            self.core.notify_low_bal(pair=pair, send_amount=Decimal('1'), balance=Decimal('0'), deposit_addr='x')
+        self.assertEqual(mail_admins.call_count, 1)
+        c = Coin.objects.get(symbol='FAKEDESTCOIN')
+        self.assertTrue(c.funds_low)
+        self.assertIsNotNone(c.last_notified)
+        self.assertEqual(c.display_name, 'Edited')
+        self.assertFalse(pair.to_coin.funds_low)
+
+    def test_map_invalidation(self):
+        """Saving an address map only re-loads the maps for it's deposit address(es)"""
+        kw = dict(deposit_coin=self.coin, destination_coin=self.dest_coin, destination_address='dest')
+        other = AddressAccountMap.objects.create(deposit_address='other', **kw)
+        self.assertEqual(self.routing.find_map('MOCKTESTCOIN', 'other').pk, other.pk)
+        cached_other = self.routing.maps[('MOCKTESTCOIN', 'other')]
+
+        with patch.object(self.routing, 'load', side_effect=AssertionError('full reload')):
+            m = AddressAccountMap.objects.create(deposit_address='addr1', **kw)
+            self.assertEqual(self.routing.find_map('MOCKTESTCOIN', 'addr1').pk, m.pk)
+            m.deposit_address = 'addr2'
+            m.save()
+            self.assertIsNone(self.routing.find_map('MOCKTESTCOIN', 'addr1'))
+            self.assertEqual(self.routing.find_map('MOCKTESTCOIN', 'addr2').pk, m.pk)
+            m.delete()
+            self.assertIsNone(self.routing.find_map('MOCKTESTCOIN', 'addr2'))
+        self.assertIs(self.routing.maps[('MOCKTESTCOIN', 'other')], cached_other)
+        self.assertIs(self.routing.find_map('MOCKTESTCOIN', 'addr2'), None)
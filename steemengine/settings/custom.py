@@ -81,6 +81,15 @@ SENG_NETWORK = env('SENG_NETWORK', 'steem')
 
 BITSHARES_RPC_NODE = env('BITSHARES_RPC_NODE', 'wss://eu.nodes.bitshares.ws')
 
+BITSHARES_BLOCK_CACHE_SIZE = int(env('BITSHARES_BLOCK_CACHE_SIZE', 10000))
+"""Maximum amount of block timestamps kept in memory by the Bitshares handler (Default: 10000)"""
+
+BITSHARES_BLOCK_CACHE_TIME = int(env('BITSHARES_BLOCK_CACHE_TIME', 604800))
+"""
+Block timestamps never change, so they're also stored in the Django cache (``CACHE_BACKEND``) for this many seconds,
+letting them persist between runs if a shared cache such as memcached or redis is used. (Default: 604800 = 7 days)
+"""
+
 #########
 # General CryptoToken Converter settings
 ####
@@ -136,6 +145,122 @@ After the first email to inform admins a wallet is low, how long before we send
 (in hours) (Default: 12 hrs)
 """
 
+HEALTH_CACHE_TTL = int(env('HEALTH_CACHE_TTL', 30))
+"""
+How long (in seconds) a coin's health data / health test result is cached for. Used by ``convert_coins`` to avoid
+checking a coin's health before every single conversion. (Default: 30 seconds)
+"""
+
+HEALTH_REFRESH_INTERVAL = int(env('HEALTH_REFRESH_INTERVAL', HEALTH_CACHE_TTL))
+"""
+Seconds between each refresh of the coin health snapshot shown on the admin Coin Health page, by
+``./manage.py refresh_health``. (Default: same as HEALTH_CACHE_TTL)
+"""
+
+HEALTH_TIMEOUT = float(env('HEALTH_TIMEOUT', 15))
+"""Seconds to wait for a single coin's health data, before reporting it as timed out. (Default: 15 seconds)"""
+
+HEALTH_WORKERS = int(env('HEALTH_WORKERS', 8))
+"""
+Maximum amount of coins whose health is checked at the same time. Coins still waiting for a free worker when
+:py:attr:`.HEALTH_TIMEOUT` runs out are reported as timed out, so this should be at least your amount of coins.
+(Default: 8)
+"""
+
+HTTP_TIMEOUT = float(env('HTTP_TIMEOUT', 30))
+"""
+Default read timeout (in seconds) for HTTP requests made by coin handlers through
+:py:mod:`payments.coin_handlers.base.http`, e.g. REST history APIs. (Default: 30 seconds)
+"""
+
+HTTP_CONNECT_TIMEOUT = float(env('HTTP_CONNECT_TIMEOUT', 5))
+"""Default connect timeout (in seconds) for coin handler HTTP requests. (Default: 5 seconds)"""
+
+HTTP_RETRIES = int(env('HTTP_RETRIES', 3))
+"""
+How many times a coin handler HTTP request is retried after a connection error / reset, or a 5xx response
+(5xx responses are only retried for idempotent requests such as GET). (Default: 3)
+"""
+
+HTTP_BACKOFF = float(env('HTTP_BACKOFF', 0.5))
+"""
+Backoff factor for HTTP retries - the delay before each retry is ``HTTP_BACKOFF * (2 ** (retry - 1))`` seconds.
+(Default: 0.5 = 0.5s, 1s, 2s...)
+"""
+
+HTTP_POOL_SIZE = int(env('HTTP_POOL_SIZE', 10))
+"""Maximum amount of keep-alive connections per host, per thread, for coin handler HTTP requests. (Default: 10)"""
+
+RPC_POOL_WINDOW = int(env('RPC_POOL_WINDOW', 20))
+"""
+The amount of recent calls / health probes per RPC node which are used to calculate it's average latency and error
+rate, for coins with multiple RPC nodes (see :class:`payments.coin_handlers.base.RPCPool`). (Default: 20)
+"""
+
+RPC_POOL_MAX_ERROR_RATE = float(env('RPC_POOL_MAX_ERROR_RATE', 0.5))
+"""
+An RPC node is ejected from it's pool once this fraction of it's recent calls have failed. (Default: 0.5 = 50%)
+"""
+
+RPC_POOL_EJECT_TIME = int(env('RPC_POOL_EJECT_TIME', 60))
+"""
+How long (in seconds) an ejected RPC node is left out of it's pool before being re-admitted. Doubles each time the
+same node is ejected again. (Default: 60 seconds)
+"""
+
+RPC_POOL_PROBE_INTERVAL = int(env('RPC_POOL_PROBE_INTERVAL', 60))
+"""
+How often (in seconds) each node in an RPC pool is probed to measure it's latency. (Default: 60 seconds)
+"""
+
+RPC_POOL_PROBE_TIMEOUT = float(env('RPC_POOL_PROBE_TIMEOUT', 10))
+"""
+Nodes in an RPC pool are probed in the background. A node which doesn't answer it's probe within this many seconds
+is counted as a failed call. (Default: 10 seconds)
+"""
+
+CONVERT_RETRY_DELAY = int(env('CONVERT_RETRY_DELAY', 60))
+"""
+When a deposit can't be converted (e.g. not enough balance), or it's destination coin is unhealthy, the converter
+waits this many seconds before trying that deposit / coin again. The delay doubles after each consecutive failure,
+up to :py:attr:`.CONVERT_RETRY_MAX`. (Default: 60 seconds)
+"""
+
+CONVERT_RETRY_MAX = int(env('CONVERT_RETRY_MAX', 3600))
+"""
+The maximum delay (in seconds) between conversion attempts for a deposit or coin. (Default: 3600 seconds = 1 hour)
+"""
+
+CONVERTER_POLL_INTERVAL = int(env('CONVERTER_POLL_INTERVAL', 15))
+"""
+How often (in seconds) the ``run_converter`` daemon polls each coin for new transactions. Can be overridden per coin
+with the key ``poll_interval`` in the coin's Custom JSON settings. (Default: 15 seconds)
+"""
+
+CONVERTER_MAX_BACKOFF = int(env('CONVERTER_MAX_BACKOFF', 600))
+"""
+When a coin's loader keeps failing, ``run_converter`` doubles the delay between polls for that coin,
+up to this many seconds. (Default: 600 seconds)
+"""
+
+CONVERTER_LOAD_TIMEOUT = int(env('CONVERTER_LOAD_TIMEOUT', 300))
+"""
+``run_converter`` abandons loading a coin's transactions if it's still running after this many seconds (e.g. stuck
+on an RPC call), and retries it with the usual backoff. Set to 0 to disable. (Default: 300 seconds)
+"""
+
+CONVERTER_HEARTBEAT_FILE = env('CONVERTER_HEARTBEAT_FILE', None)
+"""
+If set, ``run_converter`` writes a JSON heartbeat (timestamp, pid, per-coin status) to this file after every
+iteration, for use by monitoring / health checks. (Default: None - disabled)
+"""
+
+KNOWN_TX_INDEX_SIZE = int(env('KNOWN_TX_INDEX_SIZE', 5000))
+"""
+The maximum amount of ``(txid, vout)`` keys per coin kept in the in-process index of already imported deposits,
+which lets the loaders skip duplicate transactions without querying the database. (Default: 5000)
+"""
+
 #########
 # Defaults for pre-installed Coin Handlers, to avoid potential exceptions when accessing their settings.
 ####